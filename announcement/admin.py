@@ -1,5 +1,8 @@
 from django.contrib import admin
-from .models import Announcement, AnnouncementNew
+from .models import (
+    AICallLog, Announcement, AnnouncementNew, AnnouncementSyncRun, PipelineJob, SavedSearch, SavedSearchMatch,
+)
+from .utils.saved_searches import reset_saved_search
 
 @admin.register(Announcement)
 class AnnouncementAdmin(admin.ModelAdmin):
@@ -47,4 +50,63 @@ class AnnouncementNewAdmin(admin.ModelAdmin):
         ('Metadata', {
             'fields': ('created_at', 'updated_at')
         }),
-    ) 
\ No newline at end of file
+    ) 
+
+@admin.register(AICallLog)
+class AICallLogAdmin(admin.ModelAdmin):
+    list_display = ('created_at', 'provider', 'model_name', 'chunk_size', 'prompt_tokens', 'completion_tokens',
+                    'latency_ms', 'retries', 'outcome', 'matches')
+    list_filter = ('provider', 'model_name', 'outcome')
+    date_hierarchy = 'created_at'
+    
+    # Append-only: records are written by the filtering code only
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+@admin.register(PipelineJob)
+class PipelineJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'status', 'stage', 'ai_choice', 'total_count', 'new_count', 'filtered_count',
+                    'worker', 'attempts', 'created_at', 'finished_at')
+    list_filter = ('status', 'stage')
+    search_fields = ('user_condition',)
+    readonly_fields = ('created_at', 'updated_at', 'started_at', 'finished_at')
+
+@admin.register(AnnouncementSyncRun)
+class AnnouncementSyncRunAdmin(admin.ModelAdmin):
+    list_display = ('started_at', 'status', 'pages_fetched', 'fetched_count', 'created_count', 'updated_count',
+                    'unchanged_count', 'deactivated_count', 'high_water_serial', 'finished_at')
+    list_filter = ('status',)
+    readonly_fields = ('started_at', 'finished_at')
+
+class SavedSearchMatchInline(admin.TabularInline):
+    model = SavedSearchMatch
+    fields = ('announcement', 'matched_at')
+    readonly_fields = ('announcement', 'matched_at')
+    extra = 0
+    can_delete = False
+    
+    def has_add_permission(self, request, obj=None):
+        return False
+    
+    def get_queryset(self, request):
+        # Announcements no longer on the portal are hidden
+        return super().get_queryset(request).filter(announcement__is_active=True)
+
+@admin.register(SavedSearch)
+class SavedSearchAdmin(admin.ModelAdmin):
+    list_display = ('name', 'ai_choice', 'region', 'startup_period', 'target_age', 'is_active',
+                    'last_run_at', 'last_evaluated_count', 'last_match_count')
+    list_filter = ('is_active', 'ai_choice')
+    search_fields = ('name', 'user_condition')
+    readonly_fields = ('last_evaluated_at', 'last_run_at', 'last_evaluated_count', 'last_match_count', 'last_error',
+                       'created_at', 'updated_at')
+    inlines = (SavedSearchMatchInline,)
+    
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        # Matches of the old condition or filters no longer apply
+        if change and set(form.changed_data) & {'user_condition', 'ai_choice', 'region', 'startup_period', 'target_age'}:
+            reset_saved_search(obj)
\ No newline at end of file
@@ -0,0 +1,63 @@
+import math
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from announcement.models import AICallLog
+
+
+def _percentile(sorted_values, percent):
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(percent / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class Command(BaseCommand):
+    help = (
+        "Aggregate the recorded AI provider calls per provider and model: success rate, "
+        "p50/p95 latency, tokens per announcement and matches"
+    )
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=float, default=7, help="Only include calls of the last N days")
+        parser.add_argument('--condition-hash', help="Only include calls for this condition hash")
+    
+    def handle(self, *args, **options):
+        calls = AICallLog.objects.filter(created_at__gte=timezone.now() - timedelta(days=options['days']))
+        if options['condition_hash']:
+            calls = calls.filter(condition_hash=options['condition_hash'])
+        
+        groups = {}
+        for call in calls.values_list('provider', 'model_name', 'chunk_size', 'prompt_tokens',
+                                      'completion_tokens', 'latency_ms', 'retries', 'outcome', 'matches').iterator():
+            groups.setdefault((call[0], call[1]), []).append(call)
+        
+        if not groups:
+            self.stdout.write(f"No AI calls recorded in the last {options['days']:g} days")
+            return
+        
+        self.stdout.write(
+            f"{'provider/model':<32} {'calls':>6} {'ok':>6} {'trunc':>6} {'retry':>6} {'p50 ms':>8} {'p95 ms':>8} "
+            f"{'in tok/ann':>10} {'out tok/call':>12} {'matches':>8}"
+        )
+        for (provider, model_name), rows in sorted(groups.items()):
+            latencies = sorted(row[5] for row in rows)
+            successes = [row for row in rows if row[7] == 'success']
+            with_usage = [row for row in rows if row[3] is not None]
+            announcements_with_usage = sum(row[2] for row in with_usage)
+            prompt_tokens_per_announcement = (
+                sum(row[3] for row in with_usage) / announcements_with_usage if announcements_with_usage else 0
+            )
+            completion_tokens = [row[4] for row in with_usage if row[4] is not None]
+            completion_tokens_per_call = sum(completion_tokens) / len(completion_tokens) if completion_tokens else 0
+            
+            self.stdout.write(
+                f"{provider + '/' + model_name:<32} {len(rows):>6} {len(successes) / len(rows):>6.0%} "
+                f"{sum(1 for row in rows if row[7] == 'truncated'):>6} {sum(1 for row in rows if row[6]):>6} "
+                f"{_percentile(latencies, 50):>8.0f} {_percentile(latencies, 95):>8.0f} "
+                f"{prompt_tokens_per_announcement:>10.1f} {completion_tokens_per_call:>12.1f} "
+                f"{sum(row[8] for row in successes):>8}"
+            )
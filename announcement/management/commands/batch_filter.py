@@ -0,0 +1,112 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from announcement.models import AIBatchJob, AnnouncementNew
+from announcement.utils import verdict_cache
+from announcement.utils.ai_utils import resolve_ai_choice, _content_hash
+from announcement.utils.batch_filter import BatchJobError, ingest_batch_job, poll_batch_job, submit_batch_job
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-filter stored announcements offline with the provider batch APIs. "
+        "'submit' creates a batch job, 'poll' checks pending jobs and ingests the finished ones "
+        "into the AI verdict cache, 'ingest' re-ingests a job and 'list' shows recent jobs."
+    )
+
+    def add_arguments(self, parser):
+        subparsers = parser.add_subparsers(dest='action', required=True)
+        
+        submit = subparsers.add_parser('submit', help="Submit a batch job for one condition")
+        submit.add_argument('--condition', required=True, help="Filtering condition in natural language")
+        submit.add_argument('--ai', default='openai-gpt-4o-mini', help="AI choice, e.g. gemini-2.0-flash-lite")
+        submit.add_argument('--limit', type=int, default=0, help="Evaluate at most this many announcements")
+        submit.add_argument('--include-cached', action='store_true',
+                            help="Also send announcements that already have a cached verdict")
+        
+        poll = subparsers.add_parser('poll', help="Poll pending jobs and ingest completed ones")
+        poll.add_argument('--job-id', type=int, help="Only poll this job")
+        poll.add_argument('--wait', type=float, default=0,
+                          help="Keep polling every N seconds until no job is pending")
+        
+        ingest = subparsers.add_parser('ingest', help="Ingest the results of a completed job again")
+        ingest.add_argument('job_id', type=int)
+        
+        subparsers.add_parser('list', help="List recent jobs")
+
+    def handle(self, *args, **options):
+        try:
+            getattr(self, f"_{options['action']}")(options)
+        except BatchJobError as e:
+            raise CommandError(str(e))
+
+    def _submit(self, options):
+        try:
+            _, model_name = resolve_ai_choice(options['ai'])
+        except ValueError as e:
+            raise CommandError(str(e))
+        
+        announcements = AnnouncementNew.objects.order_by('-pbanc_sn')
+        if options['limit']:
+            announcements = announcements[:options['limit']]
+        announcements = list(announcements)
+        
+        if not options['include_cached']:
+            cached = verdict_cache.lookup_verdicts(
+                options['condition'], model_name,
+                [(ann.pbanc_sn, _content_hash(ann)) for ann in announcements],
+            )
+            announcements = [ann for ann in announcements if (ann.pbanc_sn, _content_hash(ann)) not in cached]
+        
+        if not announcements:
+            self.stdout.write("No announcements to evaluate")
+            return
+        
+        job = submit_batch_job(announcements, options['condition'], options['ai'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Submitted job {job.pk} ({job.provider} batch {job.provider_job_id}): "
+            f"{len(announcements)} announcements in {len(job.chunks)} chunks"
+        ))
+
+    def _poll(self, options):
+        while True:
+            jobs = AIBatchJob.objects.filter(status__in=['submitted', 'completed'])
+            if options['job_id']:
+                jobs = jobs.filter(pk=options['job_id'])
+            
+            pending = 0
+            for job in jobs:
+                if job.status == 'submitted':
+                    job = poll_batch_job(job)
+                if job.status == 'completed':
+                    count = ingest_batch_job(job)
+                    self.stdout.write(self.style.SUCCESS(f"Job {job.pk}: ingested {count} verdicts"))
+                elif job.status == 'failed':
+                    self.stdout.write(self.style.ERROR(f"Job {job.pk}: {job.error}"))
+                else:
+                    pending += 1
+                    self.stdout.write(f"Job {job.pk}: still running")
+            
+            if not pending or not options['wait']:
+                return
+            time.sleep(options['wait'])
+
+    def _ingest(self, options):
+        try:
+            job = AIBatchJob.objects.get(pk=options['job_id'])
+        except AIBatchJob.DoesNotExist:
+            raise CommandError(f"Job {options['job_id']} does not exist")
+        if job.status not in ('completed', 'ingested'):
+            raise CommandError(f"Job {job.pk} has no results yet (status: {job.status})")
+        
+        count = ingest_batch_job(job)
+        self.stdout.write(self.style.SUCCESS(f"Job {job.pk}: ingested {count} verdicts"))
+
+    def _list(self, options):
+        for job in AIBatchJob.objects.all()[:20]:
+            answered = len(job.results or {})
+            self.stdout.write(
+                f"{job.pk:>5} {job.created_at:%Y-%m-%d %H:%M} {job.status:<10} {job.provider}/{job.model_name} "
+                f"{answered}/{len(job.chunks)} chunks  \"{job.user_condition[:40]}\""
+            )
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from announcement.utils.rate_limiter import get_portal_rate_limiter
+
+
+class Command(BaseCommand):
+    help = "Show how much of the public data portal daily call quota has been used"
+
+    def handle(self, *args, **options):
+        rate_limiter = get_portal_rate_limiter()
+        if not rate_limiter:
+            self.stdout.write("Rate limiting is disabled (API_RATE_LIMIT_PER_SECOND=0)")
+            return
+        
+        snapshot = rate_limiter.snapshot()
+        if snapshot['quota']:
+            self.stdout.write(
+                f"{snapshot['date']}: {snapshot['calls']}/{snapshot['quota']} calls "
+                f"({snapshot['usage_ratio']:.1%}), {snapshot['remaining']} remaining"
+            )
+        else:
+            self.stdout.write(f"{snapshot['date']}: {snapshot['calls']} calls (no daily quota)")
+        self.stdout.write(
+            f"Token bucket: {snapshot['tokens']:.2f}/{snapshot['burst']} tokens, "
+            f"{snapshot['rate_per_second']} calls/s"
+        )
+        
+        # Today's usage is shown above; list the previous days, newest first
+        past_days = sorted(
+            ((day, calls) for day, calls in snapshot['history'].items() if day != snapshot['date']), reverse=True
+        )
+        for day, calls in past_days[:7]:
+            self.stdout.write(f"  {day}: {calls} calls")
@@ -0,0 +1,74 @@
+import json
+import time
+import statistics
+
+from django.core.management.base import BaseCommand, CommandError
+
+from announcement.utils.ai_utils import _create_announcement_text
+from announcement.utils.prefilter import DOCUMENT_FIELDS, bm25_scores, select_candidates
+from announcement.utils.records import AnnouncementRecord
+
+
+class Command(BaseCommand):
+    help = (
+        "Report recall and latency of the lexical pre-filter on a labeled fixture. "
+        "The fixture is a JSON list of {\"condition\": str, \"announcements\": [portal items], "
+        "\"relevant\": [pbanc_sn, ...]} cases."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('fixture', help="Path to the labeled fixture JSON file")
+        parser.add_argument('--top-k', default='10,20,30,50,0',
+                            help="Comma separated top-K values to evaluate (0 means no limit)")
+        parser.add_argument('--min-score', type=float, default=0.0,
+                            help="Minimum score applied together with every top-K value")
+        parser.add_argument('--repeat', type=int, default=5,
+                            help="Number of scoring runs per case for the latency measurement")
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['fixture'], encoding='utf-8') as f:
+                cases = json.load(f)
+            top_k_values = [int(value) for value in options['top_k'].split(',') if value.strip()]
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Cannot load fixture: {str(e)}")
+        if not isinstance(cases, list) or not cases:
+            raise CommandError(f"Fixture {options['fixture']} contains no cases; expected a non-empty JSON list")
+        
+        # Score every case once and time the scoring separately
+        scored_cases = []
+        latencies_ms = []
+        for case in cases:
+            records = [AnnouncementRecord.from_api_item(item) for item in case['announcements']]
+            documents = [
+                ' '.join(str(text.get(field) or '') for field in DOCUMENT_FIELDS)
+                for text in map(_create_announcement_text, records)
+            ]
+            for _ in range(max(1, options['repeat'])):
+                started_at = time.perf_counter()
+                scores = bm25_scores(documents, case['condition'])
+                latencies_ms.append((time.perf_counter() - started_at) * 1000)
+            
+            relevant = {str(serial_number) for serial_number in case.get('relevant', [])}
+            scored_cases.append(([record.pbanc_sn for record in records], scores, relevant))
+        
+        total_announcements = sum(len(serial_numbers) for serial_numbers, _, _ in scored_cases)
+        self.stdout.write(
+            f"{len(cases)} cases, {total_announcements} announcements; scoring latency per case: "
+            f"p50 {statistics.median(latencies_ms):.2f} ms, max {max(latencies_ms, default=0):.2f} ms"
+        )
+        self.stdout.write(f"{'top_k':>6} {'recall':>8} {'sent':>8} {'missed':>7}")
+        
+        for top_k in top_k_values:
+            found = relevant_total = sent = 0
+            for serial_numbers, scores, relevant in scored_cases:
+                kept = {serial_numbers[i] for i in select_candidates(scores, top_k, options['min_score'])}
+                found += len(kept & relevant)
+                relevant_total += len(relevant)
+                sent += len(kept)
+            
+            recall = found / relevant_total if relevant_total else 1.0
+            sent_ratio = sent / total_announcements if total_announcements else 0.0
+            self.stdout.write(
+                f"{top_k or 'all':>6} {recall:>8.1%} {sent_ratio:>8.1%} {relevant_total - found:>7}"
+            )
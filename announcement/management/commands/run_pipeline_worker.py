@@ -0,0 +1,49 @@
+import os
+import socket
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from announcement.utils.pipeline import claim_next_job, prune_job_events, requeue_stale_jobs, run_pipeline_job
+
+# Seconds between deletions of old job events
+PRUNE_INTERVAL = 300
+
+
+class Command(BaseCommand):
+    help = (
+        "Run queued fetch/filter/save pipeline jobs from the new announcement page. "
+        "Several workers can run at the same time; each job is claimed by exactly one of them."
+    )
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Exit once the queue is empty")
+        parser.add_argument('--poll-interval', type=float, default=2.0,
+                            help="Seconds to wait before checking an empty queue again")
+        parser.add_argument('--name', default=f"{socket.gethostname()}:{os.getpid()}",
+                            help="Worker name recorded on the claimed jobs")
+    
+    def handle(self, *args, **options):
+        self.stdout.write(f"Pipeline worker {options['name']} started")
+        last_pruned_at = None
+        try:
+            while True:
+                close_old_connections()
+                requeue_stale_jobs()
+                if last_pruned_at is None or time.monotonic() - last_pruned_at >= PRUNE_INTERVAL:
+                    prune_job_events()
+                    last_pruned_at = time.monotonic()
+                
+                job = claim_next_job(options['name'])
+                if job is None:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+                
+                self.stdout.write(f"Running pipeline job {job.pk}")
+                job = run_pipeline_job(job)
+                self.stdout.write(f"Pipeline job {job.pk} {job.status}: {job.filtered_count} announcements saved")
+        except KeyboardInterrupt:
+            self.stdout.write("Pipeline worker stopped")
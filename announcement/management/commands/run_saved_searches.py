@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from announcement.models import SavedSearch
+from announcement.utils.saved_searches import active_matches, reset_saved_search, run_saved_search
+
+
+class Command(BaseCommand):
+    help = (
+        "Evaluate saved searches against the announcements of the local store that changed since "
+        "their last run. Run it after sync_announcements."
+    )
+    
+    def add_arguments(self, parser):
+        parser.add_argument('ids', nargs='*', type=int, help="Saved search IDs (default: all active ones)")
+        parser.add_argument('--reset', action='store_true',
+                            help="Forget the matches and evaluate all stored announcements again")
+    
+    def handle(self, *args, **options):
+        saved_searches = SavedSearch.objects.all()
+        if options['ids']:
+            saved_searches = saved_searches.filter(pk__in=options['ids'])
+            missing = set(options['ids']) - set(saved_searches.values_list('pk', flat=True))
+            if missing:
+                raise CommandError(f"Saved searches not found: {', '.join(map(str, sorted(missing)))}")
+        else:
+            saved_searches = saved_searches.filter(is_active=True)
+        
+        for saved_search in saved_searches:
+            if options['reset']:
+                reset_saved_search(saved_search)
+            stats = run_saved_search(saved_search)
+            summary = (f"{saved_search.name} ({saved_search.pk}): {stats['evaluated']} evaluated, "
+                       f"{stats['matched']} matched, {active_matches(saved_search).count()} active matches in total")
+            if saved_search.last_error:
+                self.stdout.write(self.style.WARNING(f"{summary} - {saved_search.last_error}"))
+            else:
+                self.stdout.write(self.style.SUCCESS(summary))
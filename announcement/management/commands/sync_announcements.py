@@ -0,0 +1,52 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from announcement.models import AnnouncementSyncRun
+from announcement.utils.announcement_store import sync_announcements
+from announcement.utils.saved_searches import run_saved_searches
+
+
+class Command(BaseCommand):
+    help = (
+        "Crawl every active announcement on the public data portal into the local store. "
+        "Meant to run from cron; searches read the store while the last complete sync is recent "
+        "(ANNOUNCEMENT_STORE_MAX_AGE_MINUTES)."
+    )
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true',
+                            help="Run even if another sync started less than --lock-minutes ago")
+        parser.add_argument('--lock-minutes', type=float, default=60,
+                            help="Treat a running sync younger than this as still in progress")
+        parser.add_argument('--run-saved-searches', action='store_true',
+                            help="Evaluate active saved searches against the changed announcements afterwards")
+    
+    def handle(self, *args, **options):
+        running = AnnouncementSyncRun.objects.filter(
+            status='running', started_at__gte=timezone.now() - timedelta(minutes=options['lock_minutes'])
+        ).first()
+        if running and not options['force']:
+            self.stdout.write(f"Sync {running.pk} is still running (started {running.started_at:%Y-%m-%d %H:%M}), skipping")
+            return
+        
+        sync_run = sync_announcements()
+        summary = (
+            f"Sync {sync_run.pk} {sync_run.status}: {sync_run.pages_fetched} pages, {sync_run.fetched_count} fetched, "
+            f"{sync_run.created_count} created, {sync_run.updated_count} updated, "
+            f"{sync_run.unchanged_count} unchanged, {sync_run.deactivated_count} deactivated, "
+            f"high water {sync_run.high_water_serial or '-'} "
+            f"({(sync_run.finished_at - sync_run.started_at).total_seconds():.1f}s)"
+        )
+        if sync_run.status == 'failed':
+            raise CommandError(f"{summary}: {sync_run.error}")
+        if sync_run.status == 'partial':
+            self.stdout.write(self.style.WARNING(f"{summary}, failed pages {sync_run.failed_pages}"))
+        else:
+            self.stdout.write(self.style.SUCCESS(summary))
+        
+        if options['run_saved_searches']:
+            for saved_search_id, stats in run_saved_searches().items():
+                self.stdout.write(f"Saved search {saved_search_id}: {stats['evaluated']} evaluated, "
+                                  f"{stats['matched']} matched, {stats['unanswered']} unanswered")
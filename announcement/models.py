@@ -66,4 +66,324 @@ class AnnouncementNew(models.Model):
         ordering = ['-created_at']
         
     def __str__(self):
-        return self.biz_pbanc_nm 
\ No newline at end of file
+        return self.biz_pbanc_nm 
+
+class PortalSyncState(models.Model):
+    """
+    Incremental crawl state of the public data portal per query signature
+    (hash of the region/startup period/target age filters)
+    """
+    query_signature = models.CharField(max_length=64, primary_key=True)
+    high_water_serial = models.CharField(max_length=100, blank=True)  # 가장 최근에 확인한 공고일련번호
+    last_full_sync_at = models.DateTimeField(null=True, blank=True)  # 마지막 전체 조회 시각
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.query_signature[:12]} ({self.high_water_serial})"
+
+
+class AIVerdictCache(models.Model):
+    """
+    Cached AI filtering verdict for one announcement under a normalized user condition and model
+    """
+    condition_hash = models.CharField(max_length=64)  # 정규화된 사용자 조건의 해시
+    model_name = models.CharField(max_length=100)  # AI 모델명
+    pbanc_sn = models.CharField(max_length=100)  # 공고일련번호
+    content_hash = models.CharField(max_length=64)  # AI에 전달된 공고 내용의 해시
+    is_match = models.BooleanField()  # 조건 일치 여부
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        unique_together = ('condition_hash', 'model_name', 'pbanc_sn', 'content_hash')
+        indexes = [
+            models.Index(fields=['condition_hash', 'model_name', 'pbanc_sn']),
+            models.Index(fields=['last_used_at']),
+        ]
+        
+    def __str__(self):
+        return f"{self.pbanc_sn} ({self.model_name}): {'match' if self.is_match else 'no match'}"
+
+
+class AIBatchJob(models.Model):
+    """
+    Provider batch job re-evaluating stored announcements against one user condition
+    """
+    STATUS_CHOICES = [
+        ('submitted', '제출됨'),
+        ('completed', '완료'),
+        ('failed', '실패'),
+        ('ingested', '반영됨'),
+    ]
+    
+    provider = models.CharField(max_length=20)  # AI 플랫폼 (openai, gemini)
+    model_name = models.CharField(max_length=100)  # AI 모델명
+    user_condition = models.TextField()  # 필터링 조건
+    provider_job_id = models.CharField(max_length=255, blank=True)  # 플랫폼의 배치 작업 ID
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='submitted')  # 작업 상태
+    
+    # Chunk composition: [{"id": chunk id, "items": [[pbanc_sn, content_hash], ...]}, ...]
+    chunks = models.JSONField(default=list)
+    # Matching serial numbers per chunk id, filled when the job completes
+    results = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)  # 실패 사유
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    ingested_at = models.DateTimeField(null=True, blank=True)  # 판정 캐시에 반영된 시각
+    
+    class Meta:
+        ordering = ['-created_at']
+        
+    def __str__(self):
+        return f"{self.provider}/{self.model_name} batch {self.provider_job_id or self.pk} ({self.status})"
+
+
+class AICallLog(models.Model):
+    """
+    Append-only record of one AI provider call made while filtering announcements
+    """
+    OUTCOME_CHOICES = [
+        ('success', '성공'),
+        ('truncated', '응답 잘림'),
+        ('error', '오류'),
+        ('unavailable', '차단됨'),
+    ]
+    
+    provider = models.CharField(max_length=20)  # AI 플랫폼
+    model_name = models.CharField(max_length=100)  # AI 모델명
+    condition_hash = models.CharField(max_length=64, blank=True)  # 정규화된 사용자 조건의 해시
+    chunk_size = models.PositiveIntegerField()  # 청크의 공고 수
+    prompt_tokens = models.PositiveIntegerField(null=True, blank=True)  # 입력 토큰 수 (제공자 보고값)
+    completion_tokens = models.PositiveIntegerField(null=True, blank=True)  # 출력 토큰 수 (제공자 보고값)
+    latency_ms = models.FloatField()  # 호출 소요 시간(ms)
+    retries = models.PositiveIntegerField(default=0)  # 같은 공고에 대한 앞선 시도 횟수 (청크 분할 단계 + 대체 경로 순번)
+    outcome = models.CharField(max_length=20, choices=OUTCOME_CHOICES)  # 결과
+    matches = models.PositiveIntegerField(default=0)  # 반환된 일치 공고 수
+    error = models.TextField(blank=True)  # 오류 메시지
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at']),
+            models.Index(fields=['provider', 'model_name', 'created_at']),
+        ]
+        
+    def __str__(self):
+        return f"{self.provider}/{self.model_name} {self.chunk_size} items: {self.outcome} ({self.latency_ms:.0f} ms)"
+
+
+class PipelineJob(models.Model):
+    """
+    Queued run of the fetch → AI filter → save pipeline for one search from the new announcement page
+    
+    Jobs are claimed by the run_pipeline_worker command, so the request only enqueues them.
+    """
+    STATUS_CHOICES = [
+        ('queued', '대기 중'),
+        ('running', '실행 중'),
+        ('completed', '완료'),
+        ('failed', '실패'),
+    ]
+    STAGE_CHOICES = [
+        ('queued', '대기 중'),
+        ('fetching', '공고 조회 중'),
+        ('filtering', 'AI 필터링 중'),
+        ('saving', '저장 중'),
+        ('done', '완료'),
+    ]
+    
+    # Search parameters
+    user_condition = models.TextField(blank=True)  # 필터링 조건
+    ai_choice = models.CharField(max_length=100)  # 선택한 AI 모델
+    region = models.CharField(max_length=100, blank=True)  # 지역
+    startup_period = models.CharField(max_length=100, blank=True)  # 창업기간
+    target_age = models.CharField(max_length=100, blank=True)  # 대상연령
+    
+    # Execution state
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')  # 작업 상태
+    stage = models.CharField(max_length=20, choices=STAGE_CHOICES, default='queued')  # 현재 단계
+    worker = models.CharField(max_length=255, blank=True)  # 작업을 가져간 워커
+    attempts = models.PositiveIntegerField(default=0)  # 실행 시도 횟수
+    
+    # Progress
+    pages_fetched = models.PositiveIntegerField(default=0)  # 조회한 페이지 수
+    total_count = models.PositiveIntegerField(default=0)  # API에서 받은 공고 수
+    new_count = models.PositiveIntegerField(default=0)  # DB에 없던 새 공고 수
+    processed_count = models.PositiveIntegerField(default=0)  # 필터링을 마친 새 공고 수
+    filtered_count = models.PositiveIntegerField(default=0)  # 조건과 일치하여 저장된 공고 수
+    saved_serial_numbers = models.JSONField(default=list)  # 저장된 공고일련번호 (저장 순서)
+    warnings = models.JSONField(default=list)  # 사용자에게 보여줄 경고 메시지
+    error = models.TextField(blank=True)  # 실패 사유
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)  # 진행 상황이 저장될 때마다 갱신 (워커 생존 확인용)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+        
+    def __str__(self):
+        return f"Pipeline job {self.pk} ({self.status}, {self.stage})"
+    
+    @property
+    def is_finished(self) -> bool:
+        return self.status in ('completed', 'failed')
+
+
+class PipelineJobEvent(models.Model):
+    """
+    Progress event of a pipeline job, streamed to the browser by the job's event stream
+    """
+    KIND_CHOICES = [
+        ('started', '시작'),
+        ('page', '페이지 조회'),
+        ('filtering', 'AI 필터링 시작'),
+        ('chunk', '청크 필터링 완료'),
+        ('saved', '저장'),
+        ('finished', '종료'),
+    ]
+    
+    job = models.ForeignKey(PipelineJob, on_delete=models.CASCADE, related_name='events')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)  # 이벤트 종류
+    data = models.JSONField(default=dict)  # 이벤트 내용 (진행 수치, 일치한 공고 등)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['id']
+        
+    def __str__(self):
+        return f"Pipeline job {self.job_id} {self.kind} event {self.pk}"
+
+
+class AnnouncementRaw(models.Model):
+    """
+    Local copy of every active announcement on the public data portal, kept up to date by sync_announcements
+    
+    Searches read new announcements from here instead of crawling the portal while the last
+    sync is recent enough.
+    """
+    pbanc_sn = models.CharField(max_length=100, primary_key=True)  # 공고일련번호
+    
+    # API data fields (same as AnnouncementNew)
+    biz_pbanc_nm = models.CharField(max_length=255)  # 사업공고명
+    pbanc_ctnt = models.TextField(blank=True)  # 공고내용
+    supt_biz_clsfc = models.CharField(max_length=255, blank=True)  # 지원사업분류
+    pbanc_rcpt_bgng_dt = models.DateField(null=True, blank=True)  # 공고접수시작일시
+    pbanc_rcpt_end_dt = models.DateField(null=True, blank=True)  # 공고접수종료일시
+    aply_trgt_ctnt = models.TextField(blank=True)  # 신청대상내용
+    aply_excl_trgt_ctnt = models.TextField(blank=True)  # 신청제외대상내용
+    supt_regin = models.CharField(max_length=255, blank=True)  # 지원지역
+    pbanc_ntrp_nm = models.CharField(max_length=255, blank=True)  # 공고기업명
+    sprv_inst = models.CharField(max_length=255, blank=True)  # 주관기관
+    detl_pg_url = models.URLField(max_length=512, blank=True)  # 상세페이지 URL
+    aply_trgt = models.TextField(blank=True)  # 신청대상
+    biz_enyy = models.CharField(max_length=100, blank=True)  # 사업업력
+    biz_trgt_age = models.CharField(max_length=100, blank=True)  # 사업대상연령
+    rcrt_prgs_yn = models.CharField(max_length=50, blank=True)  # 모집진행여부
+    intg_pbanc_biz_nm = models.CharField(max_length=255, blank=True)  # 통합공고사업명
+    
+    # Sync state
+    content_hash = models.CharField(max_length=64)  # 공고 내용의 해시 (변경 감지용)
+    is_active = models.BooleanField(default=True)  # 마지막 전체 동기화에서 포털에 있었는지 여부
+    first_seen_at = models.DateTimeField()  # 처음 가져온 시각
+    last_seen_at = models.DateTimeField()  # 마지막으로 포털에서 확인한 시각
+    content_updated_at = models.DateTimeField()  # 내용이 마지막으로 바뀐 시각
+    
+    class Meta:
+        ordering = ['-pbanc_sn']
+        indexes = [
+            models.Index(fields=['is_active', 'pbanc_sn']),
+            models.Index(fields=['content_updated_at']),
+        ]
+        
+    def __str__(self):
+        return self.biz_pbanc_nm
+
+
+class AnnouncementSyncRun(models.Model):
+    """
+    One run of the sync_announcements command with its watermark and statistics
+    """
+    STATUS_CHOICES = [
+        ('running', '실행 중'),
+        ('completed', '완료'),
+        ('partial', '일부 페이지 실패'),
+        ('failed', '실패'),
+    ]
+    
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='running')  # 실행 상태
+    pages_fetched = models.PositiveIntegerField(default=0)  # 조회한 페이지 수
+    failed_pages = models.JSONField(default=list)  # 가져오지 못한 페이지 번호
+    fetched_count = models.PositiveIntegerField(default=0)  # 포털에서 받은 공고 수
+    created_count = models.PositiveIntegerField(default=0)  # 새로 저장한 공고 수
+    updated_count = models.PositiveIntegerField(default=0)  # 내용이 바뀌어 갱신한 공고 수
+    unchanged_count = models.PositiveIntegerField(default=0)  # 변경 없는 공고 수
+    deactivated_count = models.PositiveIntegerField(default=0)  # 포털에서 사라져 비활성화한 공고 수
+    high_water_serial = models.CharField(max_length=100, blank=True)  # 이번 동기화에서 확인한 가장 큰 공고일련번호
+    error = models.TextField(blank=True)  # 실패 사유
+    
+    started_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-started_at']
+        
+    def __str__(self):
+        return f"Sync {self.started_at:%Y-%m-%d %H:%M} ({self.status})"
+
+
+class SavedSearch(models.Model):
+    """
+    Standing search evaluated by the run_saved_searches command
+    
+    Each run only evaluates announcements of the local store whose content changed after
+    last_evaluated_at, so repeated searches do not send the full set to the AI model again.
+    """
+    name = models.CharField(max_length=255)  # 검색 이름
+    user_condition = models.TextField(blank=True)  # 필터링 조건
+    ai_choice = models.CharField(max_length=100, default='openai-gpt-4o-mini')  # 선택한 AI 모델
+    region = models.CharField(max_length=100, blank=True)  # 지역
+    startup_period = models.CharField(max_length=100, blank=True)  # 창업기간
+    target_age = models.CharField(max_length=100, blank=True)  # 대상연령
+    is_active = models.BooleanField(default=True)  # 정기 실행 여부
+    
+    # Last run
+    last_evaluated_at = models.DateTimeField(null=True, blank=True)  # 판정을 마친 공고의 마지막 내용 변경 시각 (다음 실행은 이후 변경된 공고만 판정)
+    last_run_at = models.DateTimeField(null=True, blank=True)  # 마지막 실행 시각
+    last_evaluated_count = models.PositiveIntegerField(default=0)  # 마지막 실행에서 판정한 공고 수
+    last_match_count = models.PositiveIntegerField(default=0)  # 마지막 실행에서 일치한 공고 수
+    last_error = models.TextField(blank=True)  # 마지막 실행의 실패 사유
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['name']
+        verbose_name_plural = 'saved searches'
+        
+    def __str__(self):
+        return self.name
+
+
+class SavedSearchMatch(models.Model):
+    """
+    Announcement of the local store that matched a saved search
+    """
+    saved_search = models.ForeignKey(SavedSearch, on_delete=models.CASCADE, related_name='matches')
+    announcement = models.ForeignKey(AnnouncementRaw, on_delete=models.CASCADE, related_name='saved_search_matches')
+    matched_at = models.DateTimeField(auto_now_add=True)  # 일치로 판정된 시각
+    
+    class Meta:
+        ordering = ['-matched_at']
+        unique_together = ('saved_search', 'announcement')
+        
+    def __str__(self):
+        return f"{self.saved_search} - {self.announcement}"
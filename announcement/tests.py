@@ -0,0 +1,462 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
+
+from django.test import SimpleTestCase, TestCase
+
+from announcement.models import AIBatchJob, AnnouncementNew
+from announcement.utils import ai_utils, verdict_cache
+from announcement.utils.api_client import AsyncPublicDataAPIClient, PublicDataAPIClient, get_shared_session
+from announcement.utils.batch_filter import BatchJobError, ingest_batch_job, poll_batch_job, submit_batch_job
+from announcement.utils.ingestion import save_announcements
+from announcement.utils.provider_router import ProviderRoute
+from announcement.utils.records import AnnouncementRecord
+
+
+class StubPortalHandler(BaseHTTPRequestHandler):
+    """Answers portal requests as scripted by the StubPortalServer"""
+    
+    # Keep-alive, so connection reuse by the client is visible from the server side
+    protocol_version = 'HTTP/1.1'
+    
+    def do_GET(self):
+        query = {name: values[0] for name, values in parse_qs(urlparse(self.path).query).items()}
+        status, body, delay = self.server.respond(self.client_address, query)
+        if delay:
+            time.sleep(delay)
+        
+        payload = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+    
+    def log_message(self, format, *args):
+        pass
+
+
+class StubPortalServer(ThreadingHTTPServer):
+    """
+    Local stand-in for the public data portal
+    
+    It serves total_items announcements, newest serial number first, in pages of the
+    requested perPage. Responses can be scripted per request (status, delay) or per page.
+    """
+    
+    daemon_threads = True
+    
+    def __init__(self, total_items: int = 50):
+        super().__init__(('127.0.0.1', 0), StubPortalHandler)
+        self.total_items = total_items
+        self.requests = []
+        self.script = deque()
+        self.failing_pages = set()
+        self.page_delays = {}
+        self._lock = threading.Lock()
+    
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_port}/"
+    
+    def respond(self, client_address, query):
+        with self._lock:
+            self.requests.append((client_address[1], query))
+            status, delay = self.script.popleft() if self.script else (200, 0)
+        
+        page = int(query.get('page', 1))
+        if status != 200 or page in self.failing_pages:
+            return status if status != 200 else 500, {'error': 'stub failure'}, delay
+        
+        per_page = int(query.get('perPage', 10))
+        first = (page - 1) * per_page
+        data = [{'pbanc_sn': str(100000 - index), 'biz_pbanc_nm': f"공고 {index}"}
+                for index in range(first, min(first + per_page, self.total_items))]
+        body = {'currentCount': len(data), 'matchCount': self.total_items, 'page': page,
+                'perPage': per_page, 'totalCount': self.total_items, 'data': data}
+        return 200, body, delay or self.page_delays.get(page, 0)
+    
+    def handle_error(self, request, client_address):
+        # The client gives up on timed-out requests, so writing their response fails
+        pass
+
+
+class RecordingResponseCache:
+    """In-memory stand-in for PortalResponseCache recording the threads it is called from"""
+    
+    def __init__(self):
+        self.entries = {}
+        self.threads = set()
+    
+    def get(self, params, allow_stale=False):
+        self.threads.add(threading.get_ident())
+        return self.entries.get(params['page'])
+    
+    def set(self, params, value):
+        self.threads.add(threading.get_ident())
+        self.entries[params['page']] = value
+
+
+class PublicDataAPIClientTests(SimpleTestCase):
+    """PublicDataAPIClient against a local stub of the portal"""
+    
+    def setUp(self):
+        env = mock.patch.dict(os.environ, {
+            'PUBLIC_DATA_API_KEY': 'test-key',
+            'DEBUG': 'false',
+            'PER_PAGE_FOR_API': '10',
+            'API_FETCH_CONCURRENCY': '4',
+            'API_RATE_LIMIT_PER_SECOND': '0',
+            'API_MAX_RETRIES': '2',
+            'API_RETRY_BACKOFF': '0',
+            'API_READ_TIMEOUT': '0.5',
+        })
+        env.start()
+        self.addCleanup(env.stop)
+        
+        self.server = StubPortalServer()
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        
+        self.client = self._make_client()
+    
+    def _make_client(self) -> PublicDataAPIClient:
+        client = PublicDataAPIClient(use_cache=False, sync_mode='full')
+        client.base_url = self.server.url
+        return client
+    
+    def _serials(self, pages):
+        return [item.pbanc_sn for page_items in pages for item in page_items]
+    
+    def test_clients_reuse_pooled_connection(self):
+        other_client = self._make_client()
+        self.assertIs(self.client.session, get_shared_session())
+        self.assertIs(other_client.session, self.client.session)
+        
+        params = self.client._build_params(1, 10)
+        for client in (self.client, other_client, self.client):
+            self.assertIsNotNone(client._get_page_data(params, 1))
+        
+        ports = {port for port, _ in self.server.requests}
+        self.assertEqual(len(self.server.requests), 3)
+        self.assertEqual(len(ports), 1)
+    
+    def test_server_errors_are_retried(self):
+        self.server.script.extend([(503, 0), (502, 0)])
+        
+        data = self.client._get_page_data(self.client._build_params(1, 10), 1)
+        
+        self.assertEqual(len(data['data']), 10)
+        self.assertEqual(len(self.server.requests), 3)
+    
+    def test_server_errors_give_up_after_max_retries(self):
+        self.server.script.extend([(503, 0)] * 3)
+        
+        self.assertIsNone(self.client._get_page_data(self.client._build_params(1, 10), 1))
+        self.assertEqual(len(self.server.requests), 3)
+    
+    def test_timeouts_are_retried(self):
+        self.server.script.append((200, 1.5))
+        
+        data = self.client._get_page_data(self.client._build_params(1, 10), 1)
+        
+        self.assertEqual(len(data['data']), 10)
+        self.assertEqual(len(self.server.requests), 2)
+    
+    def test_prefetched_pages_keep_page_order(self):
+        # Later pages answer first, so the prefetcher receives them out of order
+        self.server.page_delays = {2: 0.4, 3: 0.3, 4: 0.2, 5: 0.1}
+        
+        pages = list(self.client.iter_announcement_pages())
+        
+        self.assertEqual([len(page_items) for page_items in pages], [10] * 5)
+        self.assertEqual(self._serials(pages), [str(100000 - index) for index in range(50)])
+        self.assertEqual(self.client.failed_pages, [])
+    
+    def test_failed_page_is_skipped_without_dropping_later_pages(self):
+        self.server.failing_pages = {3}
+        
+        pages = list(self.client.iter_announcement_pages())
+        
+        expected = [str(100000 - index) for index in range(50) if not 20 <= index < 30]
+        self.assertEqual(self._serials(pages), expected)
+        self.assertEqual(self.client.failed_pages, [3])
+    
+    def test_async_client_keeps_cache_off_event_loop(self):
+        client = AsyncPublicDataAPIClient(use_cache=False)
+        client.base_url = self.server.url
+        client.cache = RecordingResponseCache()
+        
+        async def crawl():
+            return threading.get_ident(), await client.get_announcements()
+        
+        loop_thread, items = asyncio.run(crawl())
+        
+        self.assertEqual([item.pbanc_sn for item in items], [str(100000 - index) for index in range(50)])
+        self.assertEqual(len(client.cache.entries), 5)
+        self.assertTrue(client.cache.threads)
+        self.assertNotIn(loop_thread, client.cache.threads)
+        
+        # A second crawl is answered from the cache
+        _, items = asyncio.run(crawl())
+        self.assertEqual(len(items), 50)
+        self.assertEqual(len(self.server.requests), 5)
+
+
+class StubBatchHandler(BaseHTTPRequestHandler):
+    """Answers AI provider batch requests from the routes of the StubBatchServer"""
+    
+    def _respond(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        path = urlparse(self.path).path
+        self.server.requests.append((self.command, path, dict(self.headers), body))
+        
+        route = self.server.routes.get((self.command, path))
+        status, payload = route() if callable(route) else (route or (404, {'error': 'not found'}))
+        if not isinstance(payload, str):
+            payload = json.dumps(payload, ensure_ascii=False)
+        data = payload.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+    
+    do_GET = _respond
+    do_POST = _respond
+    
+    def log_message(self, format, *args):
+        pass
+
+
+class StubBatchServer(ThreadingHTTPServer):
+    """Local stand-in for the batch endpoints of OpenAI and Gemini"""
+    
+    daemon_threads = True
+    
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), StubBatchHandler)
+        self.requests = []
+        self.routes = {}
+    
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_port}"
+
+
+class BatchFilterTests(TestCase):
+    """Batch submission, polling and ingestion against a local stand-in server"""
+    
+    condition = '서울 지역 예비창업자'
+    
+    def setUp(self):
+        self.server = StubBatchServer()
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        
+        env = mock.patch.dict(os.environ, {
+            'OPENAI_API_KEY': 'test-key',
+            'OPENAI_BASE_URL': f"{self.server.url}/v1",
+            'OPENAI_FILTER_MODE': 'structured',
+            'GEMINI_API_KEY': 'test-key',
+            'GEMINI_API_BASE_URL': self.server.url,
+        })
+        env.start()
+        self.addCleanup(env.stop)
+        
+        # Build the OpenAI client again so it picks up the stand-in base URL
+        clients = mock.patch.dict(ai_utils._clients, clear=True)
+        clients.start()
+        self.addCleanup(clients.stop)
+        
+        self.announcements = [
+            AnnouncementRecord.from_api_item({'pbanc_sn': str(serial_number), 'biz_pbanc_nm': f"공고 {serial_number}",
+                                              'supt_regin': '서울'})
+            for serial_number in range(1001, 1006)
+        ]
+    
+    def _cached_verdicts(self, job):
+        keys = [tuple(item) for chunk in job.chunks for item in chunk['items']]
+        verdicts = verdict_cache.lookup_verdicts(self.condition, job.model_name, keys)
+        return {serial_number: verdict for (serial_number, _), verdict in verdicts.items()}
+    
+    def _openai_batch(self, status, output_file_id=None):
+        return {'id': 'batch_1', 'object': 'batch', 'endpoint': '/v1/chat/completions', 'input_file_id': 'file-in',
+                'completion_window': '24h', 'status': status, 'created_at': 0, 'output_file_id': output_file_id}
+    
+    def _openai_line(self, custom_id, content, status_code=200):
+        return json.dumps({
+            'custom_id': custom_id,
+            'response': {'status_code': status_code,
+                         'body': {'choices': [{'finish_reason': 'stop', 'message': {'content': content}}]}},
+            'error': None,
+        })
+    
+    def test_openai_batch_round_trip(self):
+        self.server.routes[('POST', '/v1/files')] = (200, {
+            'id': 'file-in', 'object': 'file', 'bytes': 1, 'created_at': 0, 'filename': 'sasum_batch.jsonl',
+            'purpose': 'batch', 'status': 'processed',
+        })
+        self.server.routes[('POST', '/v1/batches')] = (200, self._openai_batch('validating'))
+        self.server.routes[('GET', '/v1/batches/batch_1')] = (200, self._openai_batch('in_progress'))
+        
+        job = submit_batch_job(self.announcements, self.condition, 'openai-gpt-4o-mini')
+        
+        self.assertEqual(job.provider_job_id, 'batch_1')
+        self.assertEqual(job.status, 'submitted')
+        upload = next(body for _, path, _, body in self.server.requests if path == '/v1/files')
+        lines = [json.loads(line) for line in upload.decode('utf-8').splitlines() if line.startswith('{')]
+        self.assertEqual([line['custom_id'] for line in lines], [chunk['id'] for chunk in job.chunks])
+        self.assertEqual(lines[0]['body']['model'], 'gpt-4o-mini')
+        self.assertIn('1001', lines[0]['body']['messages'][1]['content'])
+        
+        # Still running at the provider
+        self.assertEqual(poll_batch_job(job).status, 'submitted')
+        
+        output = '\n'.join([
+            self._openai_line('chunk-1', json.dumps({'serial_numbers': ['1002', '1004']})),
+            '{"custom_id": "chunk-2", "response": ',
+            self._openai_line('chunk-3', '', status_code=500),
+        ])
+        self.server.routes[('GET', '/v1/batches/batch_1')] = (200, self._openai_batch('completed', 'file-out'))
+        self.server.routes[('GET', '/v1/files/file-out/content')] = (200, output)
+        
+        with self.assertLogs('announcement.utils.batch_filter', level='WARNING') as logs:
+            job = poll_batch_job(job)
+        
+        self.assertEqual(job.status, 'completed')
+        self.assertEqual(job.results, {'chunk-1': ['1002', '1004']})
+        self.assertTrue(any('Unreadable line' in message for message in logs.output))
+        
+        self.assertEqual(ingest_batch_job(job), 5)
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'ingested')
+        self.assertEqual(self._cached_verdicts(job),
+                         {'1001': False, '1002': True, '1003': False, '1004': True, '1005': False})
+    
+    def test_openai_failed_batch(self):
+        self.server.routes[('GET', '/v1/batches/batch_1')] = (200, self._openai_batch('expired'))
+        job = AIBatchJob.objects.create(provider='openai', model_name='gpt-4o-mini', user_condition=self.condition,
+                                        provider_job_id='batch_1', chunks=[])
+        
+        job = poll_batch_job(job)
+        
+        self.assertEqual(job.status, 'failed')
+        self.assertIn('batch_1', job.error)
+    
+    def test_gemini_batch_round_trip(self):
+        submit_path = '/v1beta/models/gemini-2.0-flash-lite:batchGenerateContent'
+        self.server.routes[('POST', submit_path)] = (200, {'name': 'batches/7'})
+        self.server.routes[('GET', '/v1beta/batches/7')] = (200, {
+            'name': 'batches/7', 'metadata': {'state': 'BATCH_STATE_RUNNING'}, 'done': False,
+        })
+        
+        job = submit_batch_job(self.announcements, self.condition, 'gemini-2.0-flash-lite')
+        
+        self.assertEqual(job.provider_job_id, 'batches/7')
+        _, _, headers, body = self.server.requests[0]
+        self.assertEqual(headers.get('x-goog-api-key'), 'test-key')
+        requests = json.loads(body)['batch']['input_config']['requests']['requests']
+        self.assertEqual([request['metadata']['key'] for request in requests], [chunk['id'] for chunk in job.chunks])
+        
+        self.assertEqual(poll_batch_job(job).status, 'submitted')
+        
+        text = json.dumps({'serial_numbers': ['1001', '1005']})
+        self.server.routes[('GET', '/v1beta/batches/7')] = (200, {
+            'name': 'batches/7', 'metadata': {'state': 'BATCH_STATE_SUCCEEDED'}, 'done': True,
+            'response': {'inlinedResponses': {'inlinedResponses': [
+                {'metadata': {'key': 'chunk-1'},
+                 'response': {'candidates': [{'finishReason': 'STOP', 'content': {'parts': [{'text': text}]}}]}},
+                {'metadata': {'key': 'chunk-2'}, 'error': {'code': 13, 'message': 'internal'}},
+            ]}},
+        })
+        
+        job = poll_batch_job(job)
+        
+        self.assertEqual(job.status, 'completed')
+        self.assertEqual(job.results, {'chunk-1': ['1001', '1005']})
+        self.assertEqual(ingest_batch_job(job), 5)
+        self.assertEqual(self._cached_verdicts(job),
+                         {'1001': True, '1002': False, '1003': False, '1004': False, '1005': True})
+    
+    def test_gemini_submit_error(self):
+        self.server.routes[('POST', '/v1beta/models/gemini-2.0-flash-lite:batchGenerateContent')] = (
+            400, {'error': {'message': 'bad request'}}
+        )
+        
+        with self.assertRaises(BatchJobError) as context:
+            submit_batch_job(self.announcements, self.condition, 'gemini-2.0-flash-lite')
+        
+        self.assertIn('Failed to submit Gemini batch', str(context.exception))
+        self.assertFalse(AIBatchJob.objects.exists())
+
+
+class ProviderInFlightLimitTests(SimpleTestCase):
+    """AI_MAX_IN_FLIGHT_<PLATFORM> is enforced per platform across concurrent callers"""
+    
+    def setUp(self):
+        for patcher in (
+            mock.patch.dict(os.environ, {'AI_MAX_IN_FLIGHT_OPENAI': '2', 'AI_MAX_IN_FLIGHT_GEMINI': '3'}),
+            mock.patch.dict(ai_utils._in_flight_slots, clear=True),
+            mock.patch.object(ai_utils, 'get_circuit_breaker', return_value=None),
+            mock.patch.object(ai_utils.call_log, 'record_call'),
+            mock.patch.object(ai_utils, 'get_openai_filtered_indices', side_effect=self._fake_provider('openai')),
+            mock.patch.object(ai_utils, 'get_gemini_filtered_indices', side_effect=self._fake_provider('gemini')),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        
+        self.lock = threading.Lock()
+        self.in_flight = {'openai': 0, 'gemini': 0}
+        self.peak = {'openai': 0, 'gemini': 0}
+    
+    def _fake_provider(self, platform):
+        def call(prompt, model_name):
+            with self.lock:
+                self.in_flight[platform] += 1
+                self.peak[platform] = max(self.peak[platform], self.in_flight[platform])
+            time.sleep(0.05)
+            with self.lock:
+                self.in_flight[platform] -= 1
+            return []
+        return call
+    
+    def test_limit_applies_across_callers(self):
+        routes = [ProviderRoute('openai', 'gpt-4o-mini')] * 8 + [ProviderRoute('gemini', 'gemini-2.0-flash-lite')] * 8
+        
+        # More callers than either limit, as with chunks of several jobs plus their hedges
+        with ThreadPoolExecutor(max_workers=len(routes)) as executor:
+            list(executor.map(lambda route: ai_utils._call_provider(route, 'prompt'), routes))
+        
+        self.assertEqual(self.peak, {'openai': 2, 'gemini': 3})
+
+
+class SaveAnnouncementsTests(TestCase):
+    """save_announcements reports only the rows it inserted"""
+    
+    def _record(self, serial_number):
+        return AnnouncementRecord.from_api_item({'pbanc_sn': serial_number, 'biz_pbanc_nm': f"공고 {serial_number}"})
+    
+    def test_rows_stored_before_are_not_reported(self):
+        AnnouncementNew.objects.create(pbanc_sn='2002', biz_pbanc_nm='기존 공고', memo='메모')
+        
+        with mock.patch('announcement.utils.ingestion.LOOKUP_BATCH_SIZE', 2):
+            saved = save_announcements([self._record(serial_number) for serial_number in ('2001', '2002', '2003', '2001')])
+        
+        self.assertEqual([announcement.pbanc_sn for announcement in saved], ['2001', '2003'])
+        self.assertEqual(AnnouncementNew.objects.count(), 3)
+        self.assertEqual(AnnouncementNew.objects.get(pk='2002').memo, '메모')
+        self.assertEqual(save_announcements([self._record('2003')]), [])
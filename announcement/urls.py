@@ -6,6 +6,8 @@ app_name = 'announcement'
 urlpatterns = [
     path('', views.StoredAnnouncementView.as_view(), name='index'),
     path('new-announcement/', views.NewAnnouncementView.as_view(), name='new-announcement'),
+    path('pipeline-jobs/<int:job_id>/', views.pipeline_job_status, name='pipeline-job-status'),
+    path('pipeline-jobs/<int:job_id>/events/', views.pipeline_job_events, name='pipeline-job-events'),
     path('stored-announcement/', views.StoredAnnouncementView.as_view(), name='stored-announcement'),
     path('update-announcement/', views.update_announcement, name='update-announcement'),
     path('delete-all-announcements/', views.delete_all_announcements, name='delete-all-announcements'),
@@ -1,4 +1,4 @@
-from .api_client import PublicDataAPIClient
+from .api_client import PublicDataAPIClient, AsyncPublicDataAPIClient
 from .ai_utils import call_ai_model_for_filtering
 
-__all__ = ['PublicDataAPIClient', 'call_ai_model_for_filtering'] 
\ No newline at end of file
+__all__ = ['PublicDataAPIClient', 'AsyncPublicDataAPIClient', 'call_ai_model_for_filtering']
\ No newline at end of file
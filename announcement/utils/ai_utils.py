@@ -1,48 +1,328 @@
 import os
 import logging
-from typing import List, Dict, Any, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
+from typing import Callable, List, Dict, Any, Optional, Set, Tuple
 import json
 import time
-
-# AI model libraries
-import openai
-from anthropic import Anthropic
-import google.generativeai as genai
+import hashlib
 
 # Models
 from announcement.models import Announcement, AnnouncementNew
+from .records import AnnouncementRecord
+from .provider_router import ProviderRoute, ProviderRouter
+from .circuit_breaker import AIProviderUnavailableError, get_circuit_breaker
+from . import call_log, chunking, prompt_encoder, verdict_cache
 
 logger = logging.getLogger(__name__)
 
-# Initialize AI clients
-openai_client = None
-gemini_client = None
-openai_assistant_id = None
 
-# Initialize OpenAI client if API key exists
-if os.environ.get('OPENAI_API_KEY'):
+class AIProviderError(Exception):
+    """Raised when an AI provider call fails or returns a response that cannot be used"""
+
+
+class AIResponseTruncatedError(AIProviderError):
+    """Raised when the provider stopped generating before the response was complete"""
+
+
+class AIResponseRejectedError(AIProviderError):
+    """
+    Raised when the provider answered but refused the prompt or returned an unusable response
+    
+    This is a problem with one prompt, not with the provider, so it does not count against
+    the circuit breaker.
+    """
+
+
+def _wrap_provider_exception(message: str, error: Exception) -> AIProviderError:
+    """
+    Classify an exception raised by a provider SDK
+    
+    Client errors (4xx other than 408 and 429) reject the request itself; transport errors,
+    timeouts, rate limits and server errors are provider failures.
+    """
+    status = getattr(error, 'status_code', None)
+    if not isinstance(status, int):
+        status = getattr(error, 'code', None)
+    if isinstance(status, int) and 400 <= status < 500 and status not in (408, 429):
+        return AIResponseRejectedError(message)
+    return AIProviderError(message)
+
+
+# System prompt for announcement filtering; the OpenAI Assistant is configured with the same prompt (see the Wiki)
+FILTER_SYSTEM_PROMPT = """
+# Startup Grant Announcement Filter Assistant
+
+You are an expert at analyzing and filtering startup grant announcements.
+
+## Role and Purpose
+Your role is to examine a collection of startup/business grant announcements and identify those that match specific criteria provided by users.
+
+## Input Data Structure
+You will receive:
+1. A user condition expressed in natural language
+2. A list of announcements in JSON format with fields like:
+   - pbanc_sn: Serial number (unique identifier)
+   - title: Announcement title
+   - content: Main announcement content
+   - url: URL to the detailed page
+   - target: Application target/eligibility criteria
+   - start_date: Application start date
+   - end_date: Application end date
+   - region: Supported region
+   - organization: Announcing organization
+
+## Task
+For each request:
+1. Carefully analyze each announcement
+2. Determine if it matches the user's condition
+3. Return ONLY the serial numbers (pbanc_sn field) of matching announcements
+
+## Response Format
+You must return ONLY a valid JSON object with the following structure:
+```json
+{"serial_numbers": [123456, 789012, 345678]}
+```
+
+Do not include any explanation, narrative, or additional text before or after the JSON.
+
+## Filtering Guidelines
+- Analyze the user's condition thoroughly to understand what they're looking for
+- Consider all relevant announcement fields when matching
+- Include partial matches if they reasonably satisfy the user's criteria
+- If the user condition mentions dates, prioritize announcements with active application periods
+- If the user condition specifies a region, match announcements for that region or those marked as nationwide
+- Use the content and target fields to determine eligibility requirements
+- Return an empty array if no matches are found
+
+## Important Rules
+1. Return ONLY valid JSON with no additional text
+2. Never make up or invent serial numbers
+3. Only include serial numbers from the provided announcements
+4. Always return exact serial numbers as they appear in the input
+5. Only include announcements that genuinely match the user's condition
+"""
+
+# JSON schema of the filtering response for OpenAI structured outputs
+FILTER_RESPONSE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "serial_numbers": {"type": "array", "items": {"type": "string"}},
+    },
+    "required": ["serial_numbers"],
+    "additionalProperties": False,
+}
+
+def _load_openai_client():
+    """Build the OpenAI client if OPENAI_API_KEY is set"""
+    if not os.environ.get('OPENAI_API_KEY'):
+        return None
+    
+    import openai
+    client = openai.OpenAI(api_key=os.environ.get('OPENAI_API_KEY'))
+    if not _get_openai_assistant_id() and os.environ.get('OPENAI_FILTER_MODE', 'assistants').lower() == 'assistants':
+        logger.warning("OPENAI_ASSISTANT_ID not set in environment variables")
+    return client
+
+def _load_gemini_client():
+    """Configure the Gemini SDK if GEMINI_API_KEY is set and return the module as the client"""
+    if not os.environ.get('GEMINI_API_KEY'):
+        return None
+    
+    import google.generativeai as genai
+    genai.configure(api_key=os.environ.get('GEMINI_API_KEY'))
+    return genai
+
+# AI client loaders per platform. The SDKs are imported by the loaders on first use, so
+# importing this module (done by the views on every process start) does not load them.
+CLIENT_LOADERS: Dict[str, Callable[[], Any]] = {
+    'openai': _load_openai_client,
+    'gemini': _load_gemini_client,
+}
+
+# Clients built so far (None when the platform is not configured or failed to initialize)
+_clients: Dict[str, Any] = {}
+_clients_lock = threading.Lock()
+
+def get_ai_client(ai_platform: str) -> Optional[Any]:
+    """
+    Return the client of an AI platform, building it on first use
+    
+    Args:
+        ai_platform (str): 'openai' or 'gemini'
+        
+    Returns:
+        Optional[Any]: The client, or None if the platform has no API key or failed to initialize
+    """
+    with _clients_lock:
+        if ai_platform not in _clients:
+            try:
+                _clients[ai_platform] = CLIENT_LOADERS[ai_platform]()
+            except Exception as e:
+                logger.error(f"Failed to initialize {ai_platform} client: {str(e)}")
+                _clients[ai_platform] = None
+        return _clients[ai_platform]
+
+def _get_openai_assistant_id() -> Optional[str]:
+    """Return the OpenAI Assistant ID from the environment"""
+    return os.environ.get('OPENAI_ASSISTANT_ID')
+
+# Model used when a chunk is hedged or falls back to another platform
+FALLBACK_MODELS = {
+    'openai': 'gpt-4o-mini',
+    'gemini': 'gemini-2.0-flash-lite',
+}
+
+# Process-wide router keeping per-route latency histograms
+provider_router = ProviderRouter()
+
+# Semaphores enforcing AI_MAX_IN_FLIGHT_<PLATFORM> per platform, created on first use
+_in_flight_slots: Dict[str, threading.BoundedSemaphore] = {}
+_in_flight_slots_lock = threading.Lock()
+
+def _is_platform_available(ai_platform: str) -> bool:
+    """Return whether the platform has the credentials it needs"""
+    if ai_platform == 'openai':
+        structured = os.environ.get('OPENAI_FILTER_MODE', 'assistants').lower() == 'structured'
+        return bool(get_ai_client('openai') and (_get_openai_assistant_id() or structured))
+    if ai_platform == 'gemini':
+        return bool(get_ai_client('gemini'))
+    return False
+
+def _get_routes(ai_platform: str, model_name: str) -> List[ProviderRoute]:
+    """
+    Return the routes for a request: the chosen model first, then the other platforms
+    
+    Platforms without credentials are left out.
+    
+    Raises:
+        ValueError: If no platform is available
+    """
+    routes = [ProviderRoute(ai_platform, model_name)] + [
+        ProviderRoute(platform, fallback_model)
+        for platform, fallback_model in FALLBACK_MODELS.items() if platform != ai_platform
+    ]
+    available = [route for route in routes if _is_platform_available(route.platform)]
+    
+    if not available:
+        if ai_platform == 'openai' and get_ai_client('openai'):
+            raise ValueError("OPENAI_ASSISTANT_ID가 설정되지 않았습니다.")
+        raise ValueError(f"{ai_platform.upper()}_API_KEY가 설정되지 않았습니다.")
+    if available[0] != routes[0]:
+        logger.warning(f"{routes[0]} is not configured, using {available[0]} instead")
+    return available
+
+def _call_provider(route: ProviderRoute, prompt: str, chunk_size: int = 0, retries: int = 0,
+                   condition_hash: str = '', failed_platforms: Optional[Set[str]] = None) -> List[str]:
+    """
+    Send a filtering prompt to the platform of a route through its circuit breaker
+    
+    Only provider failures (transport errors, timeouts, rate limits, server errors) count
+    against the breaker; truncated or rejected responses do not since the provider did
+    answer. Every call is recorded for the AI call report (see call_log).
+    
+    Calls wait for a free slot of the platform's in-flight limit (AI_MAX_IN_FLIGHT_<PLATFORM>),
+    which is shared by every chunk, hedge and fallback of every filtering job in the process.
+    
+    Args:
+        route (ProviderRoute): Platform and model to call
+        prompt (str): User prompt of the chunk
+        chunk_size (int): Number of announcements in the prompt
+        retries (int): Number of earlier attempts for these announcements
+        condition_hash (str): Hash of the user condition
+        failed_platforms (Optional[Set[str]]): Platforms that already had a failure counted for
+            the same logical chunk, so split retries of one chunk count as one failure
+    
+    Raises:
+        AIProviderUnavailableError: If the platform's circuit is open
+    """
+    def record(outcome: str, matches: int = 0, error: str = '') -> None:
+        call_log.record_call(route.platform, route.model_name, condition_hash, chunk_size,
+                             (time.perf_counter() - started_at) * 1000, retries, outcome, matches, error)
+    
+    with _get_in_flight_slots(route.platform):
+        started_at = time.perf_counter()
+        breaker = get_circuit_breaker(route.platform)
+        if breaker and not breaker.allow_request():
+            record('unavailable', error="circuit open")
+            raise AIProviderUnavailableError(f"{route.platform} 응답 오류가 반복되어 호출을 일시 중단했습니다.")
+        
+        try:
+            if route.platform == 'openai':
+                result = get_openai_filtered_indices(prompt, route.model_name)
+            else:
+                result = get_gemini_filtered_indices(prompt, route.model_name)
+        except AIResponseTruncatedError as e:
+            record('truncated', error=str(e))
+            if breaker:
+                breaker.record_success()
+            raise
+        except AIResponseRejectedError as e:
+            record('error', error=str(e))
+            if breaker:
+                breaker.record_success()
+            raise
+        except AIProviderError as e:
+            record('error', error=str(e))
+            if breaker and (failed_platforms is None or route.platform not in failed_platforms):
+                breaker.record_failure()
+                if failed_platforms is not None:
+                    failed_platforms.add(route.platform)
+            raise
+        
+        record('success', matches=len(result))
+        if breaker:
+            breaker.record_success()
+        return result
+
+def _get_max_in_flight(ai_platform: str) -> int:
+    """Return the maximum number of concurrent chunk requests for a platform (AI_MAX_IN_FLIGHT_<PLATFORM>)"""
+    env_name = f"AI_MAX_IN_FLIGHT_{ai_platform.upper()}"
     try:
-        openai_client = openai.OpenAI(api_key=os.environ.get('OPENAI_API_KEY'))
-        # Get assistant ID from environment variable
-        openai_assistant_id = os.environ.get('OPENAI_ASSISTANT_ID')
-        if not openai_assistant_id:
-            logger.warning("OPENAI_ASSISTANT_ID not set in environment variables")
-    except Exception as e:
-        logger.error(f"Failed to initialize OpenAI client: {str(e)}")
+        return max(1, int(os.environ.get(env_name, 4)))
+    except (ValueError, TypeError):
+        logger.warning(f"Invalid {env_name} value, using default of 4")
+        return 4
+
+def _get_in_flight_slots(ai_platform: str) -> threading.BoundedSemaphore:
+    """Return the process-wide semaphore bounding the concurrent calls to a platform"""
+    with _in_flight_slots_lock:
+        if ai_platform not in _in_flight_slots:
+            _in_flight_slots[ai_platform] = threading.BoundedSemaphore(_get_max_in_flight(ai_platform))
+        return _in_flight_slots[ai_platform]
 
-# Initialize Gemini client if API key exists
-if os.environ.get('GEMINI_API_KEY'):
+def _get_max_split_depth() -> int:
+    """Return how many times a failed chunk may be split in half and retried (AI_CHUNK_MAX_SPLIT_DEPTH)"""
     try:
-        genai.configure(api_key=os.environ.get('GEMINI_API_KEY'))
-        gemini_client = genai
-    except Exception as e:
-        logger.error(f"Failed to initialize Gemini client: {str(e)}")
+        return max(0, int(os.environ.get('AI_CHUNK_MAX_SPLIT_DEPTH', 3)))
+    except (ValueError, TypeError):
+        logger.warning("Invalid AI_CHUNK_MAX_SPLIT_DEPTH value, using default of 3")
+        return 3
 
 def get_openai_filtered_indices(prompt: str, model_name: str = 'gpt-4o-mini') -> List[str]:
-    """Use OpenAI to filter announcements and return matching serial numbers"""
+    """
+    Use OpenAI to filter announcements and return matching serial numbers
+    
+    OPENAI_FILTER_MODE selects the backend: 'assistants' (default) runs the configured
+    Assistant on a new thread, 'structured' makes a single chat completion call constrained
+    to FILTER_RESPONSE_SCHEMA.
+    
+    Raises:
+        ValueError: If the OpenAI API key or assistant ID is missing
+        AIProviderError: If the call failed or the response could not be parsed
+    """
+    openai_client = get_ai_client('openai')
     if not openai_client:
         raise ValueError("OPENAI_API_KEY가 설정되지 않았습니다.")
     
+    mode = os.environ.get('OPENAI_FILTER_MODE', 'assistants').lower()
+    if mode == 'structured':
+        return _get_openai_structured_indices(openai_client, prompt, model_name)
+    if mode != 'assistants':
+        logger.warning(f"Unknown OPENAI_FILTER_MODE '{mode}', using assistants")
+    
+    openai_assistant_id = _get_openai_assistant_id()
     if not openai_assistant_id:
         raise ValueError("OPENAI_ASSISTANT_ID가 설정되지 않았습니다.")
     
@@ -63,18 +343,24 @@ def get_openai_filtered_indices(prompt: str, model_name: str = 'gpt-4o-mini') ->
             assistant_id=openai_assistant_id
         )
         
-        # Wait for the run to complete
+        # Wait for the run to complete, polling quickly at first and backing off up to 1 second
+        poll_interval = 0.05
         while run.status in ["queued", "in_progress"]:
-            time.sleep(1)  # Wait for 1 second before checking again
+            time.sleep(poll_interval)
+            poll_interval = min(poll_interval * 2, 1.0)
             run = openai_client.beta.threads.runs.retrieve(
                 thread_id=thread.id,
                 run_id=run.id
             )
         
         # Check if run completed successfully
+        usage = getattr(run, 'usage', None)
+        if usage:
+            call_log.record_usage(usage.prompt_tokens, usage.completion_tokens)
+        if run.status == "incomplete":
+            raise AIResponseTruncatedError(f"Assistant run incomplete: {run.incomplete_details}")
         if run.status != "completed":
-            logger.error(f"Assistant run failed with status: {run.status}")
-            return []
+            raise AIProviderError(f"Assistant run failed with status: {run.status}")
         
         # Get the latest message from the assistant
         messages = openai_client.beta.threads.messages.list(
@@ -89,8 +375,7 @@ def get_openai_filtered_indices(prompt: str, model_name: str = 'gpt-4o-mini') ->
                 break
         
         if not content:
-            logger.error("No response from assistant")
-            return []
+            raise AIResponseRejectedError("No response from assistant")
         
         # Parse the JSON response
         try:
@@ -110,30 +395,145 @@ def get_openai_filtered_indices(prompt: str, model_name: str = 'gpt-4o-mini') ->
                 logger.warning("AI returned indices instead of serial numbers. Consider retraining.")
                 return result["indices"]
             
-            logger.error(f"Invalid response format from OpenAI Assistant: {content}")
-            return []
+            raise AIResponseRejectedError(f"Invalid response format from OpenAI Assistant: {content}")
         except json.JSONDecodeError:
-            logger.error(f"Failed to parse JSON from OpenAI Assistant response: {content}")
-            return []
+            raise AIResponseRejectedError(f"Failed to parse JSON from OpenAI Assistant response: {content}")
+    except AIProviderError:
+        raise
+    except Exception as e:
+        raise _wrap_provider_exception(f"Error with OpenAI Assistant: {str(e)}", e) from e
+
+def _get_openai_structured_indices(openai_client, prompt: str, model_name: str) -> List[str]:
+    """
+    Filter announcements with one chat completion call using a JSON schema response format
+    
+    Raises:
+        AIProviderError: If the call failed, was truncated or refused
+    """
+    try:
+        response = openai_client.chat.completions.create(
+            model=model_name,
+            messages=[
+                {"role": "system", "content": FILTER_SYSTEM_PROMPT},
+                {"role": "user", "content": prompt},
+            ],
+            response_format={
+                "type": "json_schema",
+                "json_schema": {"name": "filter_result", "strict": True, "schema": FILTER_RESPONSE_SCHEMA},
+            },
+            temperature=0.2,
+        )
+        
+        if response.usage:
+            call_log.record_usage(response.usage.prompt_tokens, response.usage.completion_tokens)
+        
+        choice = response.choices[0]
+        if choice.finish_reason == "length":
+            raise AIResponseTruncatedError("OpenAI response was truncated at the output token limit")
+        if getattr(choice.message, 'refusal', None):
+            raise AIResponseRejectedError(f"OpenAI refused the request: {choice.message.refusal}")
+        
+        content = choice.message.content or ""
+        try:
+            return json.loads(content)["serial_numbers"]
+        except (json.JSONDecodeError, KeyError, TypeError):
+            raise AIResponseRejectedError(f"Invalid structured response from OpenAI: {content}")
+    except AIProviderError:
+        raise
     except Exception as e:
-        logger.error(f"Error with OpenAI Assistant: {str(e)}")
-        return []
+        raise _wrap_provider_exception(f"Error with OpenAI: {str(e)}", e) from e
+
+# Gemini generation settings for filtering
+GEMINI_GENERATION_CONFIG = {
+    "temperature": 0.2,
+    "top_p": 0.8,
+    "response_mime_type": "application/json",
+}
+
+# Process-wide Gemini models per model name: (model, expiry as time.monotonic() or None)
+_gemini_models: Dict[str, Tuple[Any, Optional[float]]] = {}
+_gemini_models_lock = threading.Lock()
+
+def _get_gemini_model(model_name: str):
+    """
+    Return the shared Gemini model for a model name, carrying FILTER_SYSTEM_PROMPT
+    
+    With GEMINI_CONTEXT_CACHE=true the system prompt is stored as cached content, so it is
+    not billed and processed again on every chunk. The cached content is recreated shortly
+    before its TTL (GEMINI_CONTEXT_CACHE_TTL seconds) runs out. If it cannot be created, e.g.
+    because the prompt is below the model's minimum cacheable size, the model falls back
+    to a plain system instruction.
+    """
+    gemini_client = get_ai_client('gemini')
+    with _gemini_models_lock:
+        model, expires_at = _gemini_models.get(model_name, (None, None))
+        if model is not None and (expires_at is None or time.monotonic() < expires_at):
+            return model
+        
+        model, expires_at = None, None
+        if os.environ.get('GEMINI_CONTEXT_CACHE', 'false').lower() == 'true':
+            try:
+                ttl = max(60, int(os.environ.get('GEMINI_CONTEXT_CACHE_TTL', 3600)))
+            except (ValueError, TypeError):
+                logger.warning("Invalid GEMINI_CONTEXT_CACHE_TTL value, using default of 3600")
+                ttl = 3600
+            
+            try:
+                cached_content = gemini_client.caching.CachedContent.create(
+                    model=f"models/{model_name}",
+                    display_name="sasum-filter-system-prompt",
+                    system_instruction=FILTER_SYSTEM_PROMPT,
+                    ttl=timedelta(seconds=ttl),
+                )
+                model = gemini_client.GenerativeModel.from_cached_content(
+                    cached_content, generation_config=GEMINI_GENERATION_CONFIG
+                )
+                # Recreate a minute early so no request races the expiry
+                expires_at = time.monotonic() + ttl - 60
+                logger.info(f"Created Gemini cached content {cached_content.name} for {model_name}")
+            except Exception as e:
+                logger.warning(f"Gemini context cache unavailable for {model_name}, using a system instruction: {str(e)}")
+        
+        if model is None:
+            model = gemini_client.GenerativeModel(
+                model_name,
+                system_instruction=FILTER_SYSTEM_PROMPT,
+                generation_config=GEMINI_GENERATION_CONFIG,
+            )
+        
+        _gemini_models[model_name] = (model, expires_at)
+        return model
 
 def get_gemini_filtered_indices(prompt: str, model_name: str = 'gemini-1.5-flash-latest') -> List[str]:
-    """Use Gemini to filter announcements and return matching serial numbers"""
-    if not gemini_client:
+    """
+    Use Gemini to filter announcements and return matching serial numbers
+    
+    The system prompt is carried by the shared model (see _get_gemini_model), so the prompt
+    only holds the user condition and the announcements.
+    
+    Raises:
+        ValueError: If the Gemini API key is missing
+        AIProviderError: If the call failed or the response could not be parsed
+    """
+    if not get_ai_client('gemini'):
         raise ValueError("GEMINI_API_KEY가 설정되지 않았습니다.")
     
     try:
-        model = gemini_client.GenerativeModel(model_name)
-        response = model.generate_content(
-            contents=[prompt],
-            generation_config={
-                "temperature": 0.2,
-                "top_p": 0.8,
-                "response_mime_type": "application/json",
-            }
-        )
+        model = _get_gemini_model(model_name)
+        response = model.generate_content(contents=[prompt])
+        
+        usage = getattr(response, 'usage_metadata', None)
+        if usage:
+            call_log.record_usage(usage.prompt_token_count, usage.candidates_token_count)
+            logger.info(f"Gemini usage ({model_name}): prompt {usage.prompt_token_count} tokens "
+                        f"(cached {getattr(usage, 'cached_content_token_count', 0)}), "
+                        f"output {usage.candidates_token_count} tokens")
+        
+        # Detect responses cut off by the output token limit
+        if response.candidates:
+            finish_reason = response.candidates[0].finish_reason
+            if getattr(finish_reason, 'name', str(finish_reason)) == 'MAX_TOKENS':
+                raise AIResponseTruncatedError("Gemini response was truncated at the output token limit")
         
         # Parse the response content
         content = response.text
@@ -151,33 +551,24 @@ def get_gemini_filtered_indices(prompt: str, model_name: str = 'gemini-1.5-flash
                 logger.warning("Gemini returned a list of announcements instead of serial numbers. Extracting serial numbers.")
                 return [str(item["pbanc_sn"]) for item in result if "pbanc_sn" in item]
             else:
-                logger.error(f"Invalid response format from Gemini: {content}")
-                return []
+                raise AIResponseRejectedError(f"Invalid response format from Gemini: {content}")
         except json.JSONDecodeError:
-            logger.error(f"Failed to parse JSON from Gemini response: {content}")
-            return []
+            raise AIResponseRejectedError(f"Failed to parse JSON from Gemini response: {content}")
+    except AIProviderError:
+        raise
     except Exception as e:
-        logger.error(f"Error with Gemini: {str(e)}")
-        return []
+        raise _wrap_provider_exception(f"Error with Gemini: {str(e)}", e) from e
 
-def call_ai_model_for_filtering(announcements: List[Any], user_condition: str, ai_choice: str = 'openai-gpt-4o-mini') -> tuple[List[Any], List[str]]:
+def resolve_ai_choice(ai_choice: str) -> Tuple[str, str]:
     """
-    Filter announcements using AI based on user conditions
+    Map an AI choice from the UI ('openai-gpt-4o-mini', 'gemini-2.0-flash-lite', ...) to its platform and model
     
-    Args:
-        announcements: List of Announcement objects or dictionaries to filter
-        user_condition: User's filtering criteria in natural language
-        ai_choice: The AI model to use ('openai-gpt-4o-mini' or 'gemini-1.5-flash')
-        
     Returns:
-        Tuple containing:
-            - List of filtered announcements that match the user condition
-            - List of serial numbers (pbanc_sn) of the matching announcements
+        Tuple[str, str]: (platform, model name)
+        
+    Raises:
+        ValueError: If the platform is not supported
     """
-    if not announcements:
-        logger.warning("No announcements provided to filter")
-        return [], []
-    
     # Parse AI platform and model from choice
     ai_parts = ai_choice.split('-', 1)
     ai_platform = ai_parts[0].lower()
@@ -206,200 +597,396 @@ def call_ai_model_for_filtering(announcements: List[Any], user_condition: str, a
         supported_choices = ['openai-gpt-4o-mini', 'gemini-2.0-flash-lite']
         raise ValueError(f"지원되지 않는 AI 선택: {ai_choice}. 지원되는 옵션: {', '.join(supported_choices)}")
     
-    # Check API key for selected platform
-    if ai_platform == 'openai' and not openai_client:
-        raise ValueError("OPENAI_API_KEY가 설정되지 않았습니다.")
-    elif ai_platform == 'gemini' and not gemini_client:
-        raise ValueError("GEMINI_API_KEY가 설정되지 않았습니다.")
+    return ai_platform, model_name
+
+# Called with (matching announcements, chunks finished so far, total chunks) as results come in
+ChunkResultCallback = Callable[[List[Any], int, int], None]
+
+def call_ai_model_for_filtering(announcements: List[Any], user_condition: str, ai_choice: str = 'openai-gpt-4o-mini',
+                                on_chunk_result: Optional[ChunkResultCallback] = None,
+                                unanswered: Optional[List[Any]] = None) -> tuple[List[Any], List[str]]:
+    """
+    Filter announcements using AI based on user conditions
+    
+    Args:
+        announcements: List of AnnouncementRecord, Announcement objects or dictionaries to filter
+        user_condition: User's filtering criteria in natural language
+        ai_choice: The AI model to use ('openai-gpt-4o-mini' or 'gemini-1.5-flash')
+        on_chunk_result: Optional callback receiving the matches of each chunk as soon as it is
+            answered, on the calling thread. Matches from the verdict cache are reported first
+            with zero chunk counts.
+        unanswered: Optional list that receives the announcements whose chunks failed on every
+            provider or were stopped because AI became unavailable, so callers can retry them or
+            keep them unfiltered instead of treating them as non-matches.
+        
+    Returns:
+        Tuple containing:
+            - List of filtered announcements that match the user condition
+            - List of serial numbers (pbanc_sn) of the matching announcements
+            
+    Raises:
+        ValueError: If AI is not configured or unavailable and no announcement got a verdict
+    """
+    if not announcements:
+        logger.warning("No announcements provided to filter")
+        return [], []
+    
+    ai_platform, model_name = resolve_ai_choice(ai_choice)
+    
+    # Reuse verdicts from previous runs of the same condition and model
+    use_verdict_cache = verdict_cache.is_enabled()
+    verdict_keys = [(_get_serial_number(ann), _content_hash(ann)) for ann in announcements]
+    cached_verdicts = {}
+    if use_verdict_cache:
+        cached_verdicts = verdict_cache.lookup_verdicts(
+            user_condition, model_name, [key for key in verdict_keys if key[0]]
+        )
+    uncached_announcements = [
+        ann for ann, key in zip(announcements, verdict_keys) if key not in cached_verdicts
+    ]
     
-    # Set chunk size
-    CHUNK_SIZE = 50
+    # Drop announcements that share nothing with the condition; they are not cached since the
+    # cut-off depends on the rest of the batch
+    if uncached_announcements and os.environ.get('AI_PREFILTER_ENABLED', 'false').lower() == 'true':
+        # Imported here since it loads NumPy and SciPy
+        from . import prefilter
+        uncached_announcements = prefilter.prefilter_announcements(
+            uncached_announcements, user_condition, _create_announcement_text
+        )
     
-    # Split announcements into chunks of 50
-    announcement_chunks = [announcements[i:i+CHUNK_SIZE] for i in range(0, len(announcements), CHUNK_SIZE)]
-    logger.info(f"Split {len(announcements)} announcements into {len(announcement_chunks)} chunks of max {CHUNK_SIZE}")
+    if on_chunk_result and cached_verdicts:
+        cached_matches = [ann for ann, key in zip(announcements, verdict_keys) if cached_verdicts.get(key)]
+        _report_chunk_result(on_chunk_result, cached_matches, 0, 0)
     
-    # Initialize combined results
+    new_verdicts = {}
+    if uncached_announcements:
+        try:
+            answers = _filter_uncached(uncached_announcements, user_condition, ai_platform, model_name, on_chunk_result)
+        except ValueError as e:
+            # Without any verdict at all the caller decides what to do; cached ones are still valid
+            if not cached_verdicts:
+                raise
+            logger.warning(f"AI unavailable, using the {len(cached_verdicts)} cached verdicts only: {str(e)}")
+            answers = {}
+        finally:
+            call_log.flush_call_logs()
+        new_verdicts = {key: is_match for key, (is_match, _) in answers.items()}
+        if unanswered is not None:
+            unanswered.extend(
+                ann for ann in uncached_announcements if (_get_serial_number(ann), _content_hash(ann)) not in answers
+            )
+        if use_verdict_cache:
+            # Store each verdict under the model that actually answered it
+            verdicts_by_model: Dict[str, Dict[Tuple[str, str], bool]] = {}
+            for key, (is_match, answered_by) in answers.items():
+                if key[0]:
+                    verdicts_by_model.setdefault(answered_by, {})[key] = is_match
+            for answered_by, verdicts in verdicts_by_model.items():
+                verdict_cache.store_verdicts(user_condition, answered_by, verdicts)
+    else:
+        logger.info(f"All {len(announcements)} announcements answered from the verdict cache")
+    
+    # Combine cached and new verdicts in input order
     all_filtered_announcements = []
     all_filtered_serial_numbers = []
+    seen_serial_numbers = set()
+    for ann, key in zip(announcements, verdict_keys):
+        serial_number = key[0]
+        if serial_number in seen_serial_numbers:
+            continue
+        if cached_verdicts.get(key) or new_verdicts.get(key):
+            all_filtered_announcements.append(ann)
+            all_filtered_serial_numbers.append(serial_number)
+            seen_serial_numbers.add(serial_number)
+    
+    # Log the final combined results
+    logger.info(f"Total filtered announcements: {len(all_filtered_announcements)} out of {len(announcements)} "
+                f"({len(cached_verdicts)} from the verdict cache)")
+    
+    return all_filtered_announcements, all_filtered_serial_numbers
+
+def build_announcement_chunks(announcements: List[Any], model_name: str) -> List[List[Any]]:
+    """
+    Pack announcements into chunks by the estimated tokens of their encoded form
+    
+    Args:
+        announcements (List[Any]): Announcements to send to the model
+        model_name (str): Model whose chunk limits apply
+        
+    Returns:
+        List[List[Any]]: Chunks in input order
+    """
+    token_budget, max_items = chunking.get_chunk_limits(model_name)
+    encoding = prompt_encoder.get_encoding()
+    field_caps = prompt_encoder.get_field_caps()
+    token_counts = [
+        chunking.estimate_tokens(prompt_encoder.serialize_item(_create_announcement_text(ann), encoding, field_caps))
+        for ann in announcements
+    ]
+    announcement_chunks = chunking.build_chunks(announcements, token_counts, token_budget, max_items)
+    logger.info(f"Split {len(announcements)} announcements (~{sum(token_counts)} tokens) into "
+                f"{len(announcement_chunks)} chunks of max {token_budget} tokens / {max_items} items")
+    return announcement_chunks
+
+def build_filter_prompt(chunk: List[Any], user_condition: str, chunk_label: str = '') -> str:
+    """
+    Build the user prompt of a chunk; the system prompt is FILTER_SYSTEM_PROMPT
+    
+    Args:
+        chunk (List[Any]): Announcements of the chunk
+        user_condition (str): User's filtering criteria in natural language
+        chunk_label (str): Chunk label for logging
+        
+    Returns:
+        str: Prompt holding the condition and the encoded announcements
+    """
+    announcements_text = prompt_encoder.encode_announcements(
+        [_create_announcement_text(ann) for ann in chunk], chunk_label
+    )
+    return f"""
+    User Condition: {user_condition}
+    
+    Announcements:
+    {announcements_text}
+    """
+
+def _filter_uncached(announcements: List[Any], user_condition: str, ai_platform: str, model_name: str,
+                     on_chunk_result: Optional[ChunkResultCallback] = None) -> Dict[Tuple[str, str], Tuple[bool, str]]:
+    """
+    Send announcements to the AI model in concurrent chunks and return a verdict per announcement
+    
+    Chunks go through the provider router, so a chunk may be answered by another platform
+    when the chosen one is slow, failing or not configured. Announcements of chunks that
+    failed everywhere are left out of the result so they are neither reported as matches
+    nor cached. The same goes for chunks stopped by a missing key or an open circuit breaker
+    once other chunks were answered, so their verdicts are not thrown away.
     
-    # Process each chunk
-    for chunk_idx, chunk in enumerate(announcement_chunks):
-        logger.info(f"Processing chunk {chunk_idx+1}/{len(announcement_chunks)} with {len(chunk)} announcements")
+    Returns:
+        Dict[Tuple[str, str], Tuple[bool, str]]: (verdict, answering model) keyed by (pbanc_sn, content hash)
         
+    Raises:
+        ValueError: If no AI platform is configured, or AI became unavailable before any chunk
+            was answered
+    """
+    # Check API keys; the chosen platform comes first, the others are hedges and fallbacks
+    routes = _get_routes(ai_platform, model_name)
+    
+    # Pack chunks by estimated token count instead of a fixed number of announcements
+    announcement_chunks = build_announcement_chunks(announcements, routes[0].model_name)
+    
+    # Send chunks concurrently, bounded by the per-provider in-flight limit
+    max_in_flight = min(_get_max_in_flight(routes[0].platform), len(announcement_chunks))
+    max_split_depth = _get_max_split_depth()
+    condition_hash = verdict_cache.hash_condition(user_condition)
+    chunk_results: List[Optional[List[Tuple[List[Any], List[str], ProviderRoute]]]] = [None] * len(announcement_chunks)
+    key_error = None
+    started_at = time.perf_counter()
+    
+    def run_chunk(chunk_idx: int) -> List[Tuple[List[Any], List[str], ProviderRoute]]:
+        chunk_started_at = time.perf_counter()
         try:
-            # Prepare the announcements data for the AI model
-            simplified_announcements = []
-            announcement_map = {}  # Map to store index -> announcement mapping
-            
-            for i, ann in enumerate(chunk):
-                # Add the announcement information with serial number
-                announcement_data = _create_announcement_text(ann)
-                simplified_announcements.append(announcement_data)
-                
-                # Store the mapping of index to announcement
-                announcement_map[i] = ann
-            
-            # Create prompt for the AI model
-            prompt = f"""
-            User Condition: {user_condition}
-            
-            Announcements:
-            {json.dumps(simplified_announcements, ensure_ascii=False, indent=2)}
-            """
-            
-            logger.info(f"Using AI: {ai_choice} (Platform: {ai_platform}, Model: {model_name})")
+            return _filter_chunk_with_split(f"{chunk_idx+1}/{len(announcement_chunks)}", announcement_chunks[chunk_idx],
+                                            user_condition, routes, max_split_depth, condition_hash)
+        finally:
+            logger.info(f"Chunk {chunk_idx+1}/{len(announcement_chunks)} finished in {time.perf_counter() - chunk_started_at:.2f}s")
+    
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        futures = {executor.submit(run_chunk, chunk_idx): chunk_idx for chunk_idx in range(len(announcement_chunks))}
+        for finished_chunks, future in enumerate(as_completed(futures), start=1):
+            chunk_idx = futures[future]
+            try:
+                chunk_results[chunk_idx] = future.result()
+            except ValueError as e:
+                # Handle API key errors and open circuit breakers
+                logger.error(f"AI unavailable for chunk {chunk_idx+1}: {str(e)}")
+                key_error = key_error or e
+            except Exception as e:
+                logger.error(f"Error processing chunk {chunk_idx+1}: {str(e)}")
+                # Continue with other chunks in case of an error
             
-            # Call the appropriate platform-specific function
-            if ai_platform == 'openai':
-                indices = get_openai_filtered_indices(prompt, model_name)
-            elif ai_platform == 'gemini':
-                # Create system prompt for Gemini
-                system_prompt = """
-                # Startup Grant Announcement Filter Assistant
-
-                You are an expert at analyzing and filtering startup grant announcements.
-
-                ## Role and Purpose
-                Your role is to examine a collection of startup/business grant announcements and identify those that match specific criteria provided by users.
-
-                ## Input Data Structure
-                You will receive:
-                1. A user condition expressed in natural language
-                2. A list of announcements in JSON format with fields like:
-                   - pbanc_sn: Serial number (unique identifier)
-                   - title: Announcement title
-                   - content: Main announcement content
-                   - url: URL to the detailed page
-                   - target: Application target/eligibility criteria
-                   - start_date: Application start date
-                   - end_date: Application end date
-                   - region: Supported region
-                   - organization: Announcing organization
-
-                ## Task
-                For each request:
-                1. Carefully analyze each announcement
-                2. Determine if it matches the user's condition
-                3. Return ONLY the serial numbers (pbanc_sn field) of matching announcements
-
-                ## Response Format
-                You must return ONLY a valid JSON object with the following structure:
-                ```json
-                {"serial_numbers": [123456, 789012, 345678]}
-                ```
-
-                Do not include any explanation, narrative, or additional text before or after the JSON.
-
-                ## Filtering Guidelines
-                - Analyze the user's condition thoroughly to understand what they're looking for
-                - Consider all relevant announcement fields when matching
-                - Include partial matches if they reasonably satisfy the user's criteria
-                - If the user condition mentions dates, prioritize announcements with active application periods
-                - If the user condition specifies a region, match announcements for that region or those marked as nationwide
-                - Use the content and target fields to determine eligibility requirements
-                - Return an empty array if no matches are found
-
-                ## Important Rules
-                1. Return ONLY valid JSON with no additional text
-                2. Never make up or invent serial numbers
-                3. Only include serial numbers from the provided announcements
-                4. Always return exact serial numbers as they appear in the input
-                5. Only include announcements that genuinely match the user's condition
-                """
-                
-                # Combine system prompt with user condition and announcements
-                gemini_prompt = system_prompt + f"""
+            if on_chunk_result:
+                matches = []
+                for answered, matched, _ in chunk_results[chunk_idx] or []:
+                    matched_serial_numbers = set(matched)
+                    matches.extend(ann for ann in answered if _get_serial_number(ann) in matched_serial_numbers)
+                _report_chunk_result(on_chunk_result, matches, finished_chunks, len(announcement_chunks))
+    
+    logger.info(f"Processed {len(announcement_chunks)} chunks in {time.perf_counter() - started_at:.2f}s "
+                f"with up to {max_in_flight} in flight")
+    for route, histogram in provider_router.histograms().items():
+        logger.info(f"Latency of {route}: {histogram.summary()}")
+    
+    # Turn the matches of each successful chunk into a verdict for every announcement it contained
+    verdicts = {}
+    for answered_parts in chunk_results:
+        for answered, matched, route in answered_parts or []:
+            matched_serial_numbers = set(matched)
+            for ann in answered:
+                serial_number = _get_serial_number(ann)
+                verdicts[(serial_number, _content_hash(ann))] = (serial_number in matched_serial_numbers, route.model_name)
+    
+    if key_error:
+        if not verdicts:
+            raise key_error  # Re-raise to handle at the caller level
+        logger.warning(f"AI became unavailable during filtering ({str(key_error)}); "
+                       f"keeping the verdicts of {len(verdicts)} answered announcements")
+    
+    # Check if we have any results
+    if not any(is_match for is_match, _ in verdicts.values()):
+        logger.warning("No announcements were filtered by AI across all chunks")
+    
+    return verdicts
 
-                User Condition: {user_condition}
-                
-                Announcements:
-                {json.dumps(simplified_announcements, ensure_ascii=False, indent=2)}
-                """
-                
-                indices = get_gemini_filtered_indices(gemini_prompt, model_name)
-            
-            # Filter the announcements based on the serial numbers from AI
-            chunk_filtered_announcements = []
-            chunk_filtered_serial_numbers = []
-            
-            # Create a map of serial numbers to announcements for this chunk
-            serial_to_announcement = {}
-            for ann in chunk:
-                if isinstance(ann, Announcement) or isinstance(ann, AnnouncementNew):
-                    serial_number = getattr(ann, 'pbanc_sn', '')
-                else:
-                    serial_number = ann.get('pbanc_sn', '')
-                    
+def _report_chunk_result(on_chunk_result: ChunkResultCallback, matches: List[Any],
+                         finished_chunks: int, total_chunks: int) -> None:
+    """Pass chunk matches to a callback without letting its errors abort the filtering"""
+    try:
+        on_chunk_result(matches, finished_chunks, total_chunks)
+    except Exception as e:
+        logger.error(f"Chunk result callback failed: {str(e)}")
+
+def _filter_chunk_with_split(chunk_label: str, chunk: List[Any], user_condition: str, routes: List[ProviderRoute],
+                             split_depth: int, condition_hash: str = '', split_level: int = 0,
+                             failed_platforms: Optional[Set[str]] = None) -> List[Tuple[List[Any], List[str], ProviderRoute]]:
+    """
+    Filter one chunk, splitting it in half and retrying each half when the call fails or is truncated
+    
+    The halves share failed_platforms with the original chunk, so a chunk counts at most one
+    failure per platform against the circuit breakers.
+    
+    Returns:
+        List of (announcements answered by one successful call, their matching serial numbers,
+        route that answered). Announcements whose calls kept failing are left out.
+        
+    Raises:
+        ValueError: If the API key of the platform is missing
+    """
+    if failed_platforms is None:
+        failed_platforms = set()
+    try:
+        _, serial_numbers, route = _filter_chunk(chunk_label, chunk, user_condition, routes, condition_hash,
+                                                 split_level, failed_platforms)
+        return [(chunk, serial_numbers, route)]
+    except AIProviderError as e:
+        if split_depth <= 0 or len(chunk) < 2:
+            logger.error(f"Giving up on chunk {chunk_label} with {len(chunk)} announcements: {str(e)}")
+            return []
+        logger.warning(f"Chunk {chunk_label} failed ({str(e)}), retrying as two halves")
+    
+    middle = len(chunk) // 2
+    return (
+        _filter_chunk_with_split(f"{chunk_label}.1", chunk[:middle], user_condition, routes, split_depth - 1,
+                                 condition_hash, split_level + 1, failed_platforms)
+        + _filter_chunk_with_split(f"{chunk_label}.2", chunk[middle:], user_condition, routes, split_depth - 1,
+                                   condition_hash, split_level + 1, failed_platforms)
+    )
+
+def _filter_chunk(chunk_label: str, chunk: List[Any], user_condition: str, routes: List[ProviderRoute],
+                  condition_hash: str = '', split_level: int = 0,
+                  failed_platforms: Optional[Set[str]] = None) -> Tuple[List[Any], List[str], ProviderRoute]:
+    """
+    Send one chunk of announcements to the AI model and return its matches and the route that answered
+    
+    Raises:
+        ValueError: If the API key of the platform is missing
+        AIProviderError: If the provider call failed or returned an unusable response
+    """
+    logger.info(f"Processing chunk {chunk_label} with {len(chunk)} announcements")
+    
+    # Map to store index -> announcement mapping
+    announcement_map = dict(enumerate(chunk))
+    
+    # Create prompt for the AI model
+    prompt = build_filter_prompt(chunk, user_condition, chunk_label)
+    
+    logger.info(f"Using AI: {routes[0]} (fallbacks: {', '.join(map(str, routes[1:])) or 'none'})")
+    
+    # Call the platform-specific function through the router (hedging and fallback)
+    # A call counts the halvings before it and the routes tried ahead of it as retries
+    indices, route = provider_router.call(
+        routes,
+        lambda route: _call_provider(route, prompt, len(chunk), split_level + routes.index(route), condition_hash,
+                                     failed_platforms),
+    )
+    if route != routes[0]:
+        logger.info(f"Chunk {chunk_label} was answered by {route}")
+    
+    # Filter the announcements based on the serial numbers from AI
+    chunk_filtered_announcements = []
+    chunk_filtered_serial_numbers = []
+    
+    # Create a map of serial numbers to announcements for this chunk
+    serial_to_announcement = {}
+    for ann in chunk:
+        serial_number = _get_serial_number(ann)
+        if serial_number:
+            serial_to_announcement[serial_number] = ann
+    
+    # Log available serial numbers for debugging
+    logger.info(f"Available serial numbers in chunk {chunk_label}: {list(serial_to_announcement.keys())[:5]}...")
+    
+    # Extract filtered announcements based on AI response
+    for idx in indices:
+        try:
+            # Now we're expecting the AI to return serial numbers directly
+            # If the response still has indices, convert to index-based access
+            if isinstance(idx, int) and 0 <= idx < len(chunk):
+                # Old format - AI still returning indices
+                ann = announcement_map[idx]
+                serial_number = _get_serial_number(ann)
                 if serial_number:
-                    serial_to_announcement[serial_number] = ann
-            
-            # Log available serial numbers for debugging
-            logger.info(f"Available serial numbers in chunk {chunk_idx+1}: {list(serial_to_announcement.keys())[:5]}...")
-            
-            # Extract filtered announcements based on AI response
-            for idx in indices:
-                try:
-                    # Now we're expecting the AI to return serial numbers directly
-                    # If the response still has indices, convert to index-based access
-                    if isinstance(idx, int) and 0 <= idx < len(chunk):
-                        # Old format - AI still returning indices
-                        ann = announcement_map[idx]
-                        if isinstance(ann, Announcement) or isinstance(ann, AnnouncementNew):
-                            serial_number = getattr(ann, 'pbanc_sn', '')
-                        else:
-                            serial_number = ann.get('pbanc_sn', '')
-                        
-                        if serial_number:
-                            chunk_filtered_announcements.append(ann)
-                            chunk_filtered_serial_numbers.append(serial_number)
-                    else:
-                        # New format - AI returning serial numbers directly
-                        # Try different formats of the serial number
-                        serial_number_str = str(idx)
-                        if serial_number_str in serial_to_announcement:
-                            chunk_filtered_announcements.append(serial_to_announcement[serial_number_str])
-                            chunk_filtered_serial_numbers.append(serial_number_str)
+                    chunk_filtered_announcements.append(ann)
+                    chunk_filtered_serial_numbers.append(serial_number)
+            else:
+                # New format - AI returning serial numbers directly
+                # Try different formats of the serial number
+                serial_number_str = str(idx)
+                if serial_number_str in serial_to_announcement:
+                    chunk_filtered_announcements.append(serial_to_announcement[serial_number_str])
+                    chunk_filtered_serial_numbers.append(serial_number_str)
+                    continue
+                
+                # Try matching the integer value if serial numbers are stored as integers
+                if isinstance(idx, int):
+                    # Check if any serial number converted to int matches
+                    for serial_key in serial_to_announcement.keys():
+                        try:
+                            if int(serial_key) == idx:
+                                chunk_filtered_announcements.append(serial_to_announcement[serial_key])
+                                chunk_filtered_serial_numbers.append(serial_key)
+                                logger.info(f"Matched integer serial number {idx} to string key {serial_key}")
+                                break
+                        except (ValueError, TypeError):
                             continue
-                        
-                        # Try matching the integer value if serial numbers are stored as integers
-                        if isinstance(idx, int):
-                            # Check if any serial number converted to int matches
-                            for serial_key in serial_to_announcement.keys():
-                                try:
-                                    if int(serial_key) == idx:
-                                        chunk_filtered_announcements.append(serial_to_announcement[serial_key])
-                                        chunk_filtered_serial_numbers.append(serial_key)
-                                        logger.info(f"Matched integer serial number {idx} to string key {serial_key}")
-                                        break
-                                except (ValueError, TypeError):
-                                    continue
-                except (IndexError, TypeError, KeyError) as e:
-                    logger.error(f"Error processing AI response item: {idx}, error: {str(e)}")
-            
-            # Log the filtered serial numbers for this chunk
-            logger.info(f"Chunk {chunk_idx+1} filtered announcement serial numbers: {chunk_filtered_serial_numbers}")
-            
-            # Add chunk results to combined results
-            all_filtered_announcements.extend(chunk_filtered_announcements)
-            all_filtered_serial_numbers.extend(chunk_filtered_serial_numbers)
-            
-        except ValueError as e:
-            # Handle API key errors
-            logger.error(f"API key error in chunk {chunk_idx+1}: {str(e)}")
-            raise  # Re-raise to handle at the caller level
-        except Exception as e:
-            logger.error(f"Error processing chunk {chunk_idx+1}: {str(e)}")
-            # Continue with other chunks in case of an error
+        except (IndexError, TypeError, KeyError) as e:
+            logger.error(f"Error processing AI response item: {idx}, error: {str(e)}")
     
-    # Check if we have any results
-    if not all_filtered_announcements and len(announcement_chunks) > 0:
-        logger.warning("No announcements were filtered by AI across all chunks")
+    # Log the filtered serial numbers for this chunk
+    logger.info(f"Chunk {chunk_label} filtered announcement serial numbers: {chunk_filtered_serial_numbers}")
     
-    # Log the final combined results
-    logger.info(f"Total filtered announcements: {len(all_filtered_announcements)} out of {len(announcements)}")
+    return chunk_filtered_announcements, chunk_filtered_serial_numbers, route
+
+def _get_serial_number(ann) -> str:
+    """
+    Return the serial number (pbanc_sn) of a record, model instance or dictionary
+    """
+    if isinstance(ann, AnnouncementRecord):
+        return ann.pbanc_sn
+    if isinstance(ann, Announcement) or isinstance(ann, AnnouncementNew):
+        return getattr(ann, 'pbanc_sn', '')
+    return ann.get('pbanc_sn', '')
+
+def _content_hash(ann) -> str:
+    """
+    Return a hash of the announcement text sent to the AI model, used to invalidate cached verdicts
     
-    return all_filtered_announcements, all_filtered_serial_numbers
+    The compact encoding cuts long fields, so its verdicts are kept apart from verbose ones.
+    """
+    text = _create_announcement_text(ann)
+    if prompt_encoder.get_encoding() == 'compact':
+        text = {'encoding': 'compact', 'item': prompt_encoder.compact_item(text, prompt_encoder.get_field_caps())}
+    text = json.dumps(text, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
 
 def _create_announcement_text(ann):
     """
@@ -413,7 +1000,19 @@ def _create_announcement_text(ann):
             return date_obj.strftime('%Y-%m-%d')
         return str(date_obj) if date_obj else ""
     
-    if isinstance(ann, Announcement) or isinstance(ann, AnnouncementNew):
+    if isinstance(ann, AnnouncementRecord):
+        # It's a normalized record from the API client
+        return {
+            'pbanc_sn': ann.pbanc_sn,
+            'title': ann.biz_pbanc_nm,
+            'content': ann.pbanc_ctnt or ann.aply_trgt,
+            'target': ann.aply_trgt,
+            'start_date': format_date(ann.pbanc_rcpt_bgng_dt),
+            'end_date': format_date(ann.pbanc_rcpt_end_dt),
+            'region': ann.supt_regin,
+            'organization': ann.pbanc_ntrp_nm,
+        }
+    elif isinstance(ann, Announcement) or isinstance(ann, AnnouncementNew):
         # It's a model instance
         return {
             'pbanc_sn': getattr(ann, 'pbanc_sn', ''),
@@ -0,0 +1,216 @@
+import os
+import logging
+from datetime import timedelta
+from typing import Dict, Iterator, List, Optional
+
+from django.db import transaction
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from announcement.models import AnnouncementRaw, AnnouncementSyncRun
+from .api_client import PublicDataAPIClient, PublicDataAPIError, _serial_number_value
+from .records import AnnouncementRecord
+
+logger = logging.getLogger(__name__)
+
+# Portal fields copied to AnnouncementRaw
+RECORD_FIELDS = list(AnnouncementRecord.__slots__)
+
+# Number of announcements per page read from the local store
+STORE_PAGE_SIZE = 50
+
+
+def get_max_age() -> timedelta:
+    """Return how old the last sync may be for searches to use the local store (ANNOUNCEMENT_STORE_MAX_AGE_MINUTES)"""
+    try:
+        minutes = float(os.environ.get('ANNOUNCEMENT_STORE_MAX_AGE_MINUTES', 90))
+    except (ValueError, TypeError):
+        logger.warning("Invalid ANNOUNCEMENT_STORE_MAX_AGE_MINUTES value, using default of 90")
+        minutes = 90
+    return timedelta(minutes=max(0, minutes))
+
+
+def last_complete_sync() -> Optional[AnnouncementSyncRun]:
+    """Return the latest sync run that fetched every page"""
+    return AnnouncementSyncRun.objects.filter(status='completed').order_by('-finished_at').first()
+
+
+def is_store_fresh() -> bool:
+    """
+    Return whether the local store is recent enough to answer searches instead of the portal
+    
+    A max age of 0 turns the local store off for searches.
+    """
+    max_age = get_max_age()
+    if not max_age:
+        return False
+    sync_run = last_complete_sync()
+    return bool(sync_run and sync_run.finished_at >= timezone.now() - max_age)
+
+
+def to_record(row: AnnouncementRaw) -> AnnouncementRecord:
+    """Build the normalized record of a stored announcement"""
+    return AnnouncementRecord(**{name: getattr(row, name) for name in RECORD_FIELDS})
+
+
+def active_announcements(region: str = '', startup_period: str = '', target_age: str = '') -> QuerySet:
+    """
+    Return the active announcements of the local store matching the portal filters
+    
+    The filters match the portal's LIKE conditions used by PublicDataAPIClient.
+    
+    Args:
+        region (str): Region filter
+        startup_period (str): Startup period filter
+        target_age (str): Target age filter
+    
+    Returns:
+        QuerySet: AnnouncementRaw rows
+    """
+    queryset = AnnouncementRaw.objects.filter(is_active=True)
+    if region:
+        queryset = queryset.filter(supt_regin__icontains=region)
+    if startup_period:
+        queryset = queryset.filter(biz_enyy__icontains=startup_period)
+    if target_age:
+        queryset = queryset.filter(biz_trgt_age__icontains=target_age)
+    return queryset
+
+
+def iter_store_pages(region: str = '', startup_period: str = '',
+                     target_age: str = '') -> Iterator[List[AnnouncementRecord]]:
+    """
+    Yield active announcements from the local store in pages, newest first
+    
+    Args:
+        region (str): Region filter
+        startup_period (str): Startup period filter
+        target_age (str): Target age filter
+    
+    Yields:
+        List[AnnouncementRecord]: Up to STORE_PAGE_SIZE records
+    """
+    queryset = active_announcements(region, startup_period, target_age)
+    
+    page = []
+    for row in queryset.order_by('-pbanc_sn').iterator(chunk_size=500):
+        page.append(to_record(row))
+        if len(page) >= STORE_PAGE_SIZE:
+            yield page
+            page = []
+    if page:
+        yield page
+
+
+def upsert_records(records: List[AnnouncementRecord]) -> Dict[str, int]:
+    """
+    Insert new announcements, update those whose content hash changed and mark all of them as seen
+    
+    Args:
+        records (List[AnnouncementRecord]): Records of one portal page
+    
+    Returns:
+        Dict[str, int]: Numbers of 'created', 'updated' and 'unchanged' announcements
+    """
+    now = timezone.now()
+    hashes = {}
+    for record in records:
+        if record.pbanc_sn and record.pbanc_sn not in hashes:
+            hashes[record.pbanc_sn] = (record, record.content_hash())
+    if not hashes:
+        return {'created': 0, 'updated': 0, 'unchanged': 0}
+    
+    stored_hashes = dict(
+        AnnouncementRaw.objects.filter(pk__in=list(hashes)).values_list('pk', 'content_hash')
+    )
+    
+    to_create = []
+    to_update = []
+    unchanged = []
+    for serial_number, (record, content_hash) in hashes.items():
+        if serial_number not in stored_hashes:
+            to_create.append(AnnouncementRaw(
+                **record.to_model_kwargs(), content_hash=content_hash,
+                first_seen_at=now, last_seen_at=now, content_updated_at=now,
+            ))
+        elif stored_hashes[serial_number] != content_hash:
+            to_update.append(AnnouncementRaw(
+                **record.to_model_kwargs(), content_hash=content_hash, is_active=True,
+                last_seen_at=now, content_updated_at=now,
+            ))
+        else:
+            unchanged.append(serial_number)
+    
+    with transaction.atomic():
+        if to_create:
+            AnnouncementRaw.objects.bulk_create(to_create, batch_size=500, ignore_conflicts=True)
+        if to_update:
+            AnnouncementRaw.objects.bulk_update(
+                to_update,
+                RECORD_FIELDS[1:] + ['content_hash', 'is_active', 'last_seen_at', 'content_updated_at'],
+                batch_size=500,
+            )
+        if unchanged:
+            AnnouncementRaw.objects.filter(pk__in=unchanged).update(last_seen_at=now, is_active=True)
+    
+    return {'created': len(to_create), 'updated': len(to_update), 'unchanged': len(unchanged)}
+
+
+def sync_announcements(api_client: Optional[PublicDataAPIClient] = None) -> AnnouncementSyncRun:
+    """
+    Crawl every active announcement on the portal into the local store
+    
+    The response cache and incremental mode are bypassed so the store reflects the portal at
+    the time of the run. When every page was fetched, stored announcements that no longer
+    appear on the portal are marked inactive; otherwise the run is recorded as partial and
+    nothing is deactivated.
+    
+    Args:
+        api_client (Optional[PublicDataAPIClient]): Client to crawl with
+    
+    Returns:
+        AnnouncementSyncRun: The finished run with its statistics
+    """
+    sync_run = AnnouncementSyncRun.objects.create()
+    api_client = api_client or PublicDataAPIClient(use_cache=False)
+    max_serial = None
+    
+    try:
+        for page_items in api_client.iter_announcement_pages(incremental=False):
+            counts = upsert_records(page_items)
+            sync_run.pages_fetched += 1
+            sync_run.fetched_count += len(page_items)
+            sync_run.created_count += counts['created']
+            sync_run.updated_count += counts['updated']
+            sync_run.unchanged_count += counts['unchanged']
+            
+            serials = [_serial_number_value(item.pbanc_sn) for item in page_items]
+            max_serial = max([max_serial or 0] + [serial for serial in serials if serial is not None]) or None
+            sync_run.save()
+        
+        sync_run.failed_pages = api_client.failed_pages
+        if sync_run.failed_pages or api_client.debug_mode:
+            # Debug mode only fetches a few announcements, so the crawl is never complete
+            sync_run.status = 'partial'
+        else:
+            sync_run.status = 'completed'
+            sync_run.deactivated_count = AnnouncementRaw.objects.filter(
+                is_active=True, last_seen_at__lt=sync_run.started_at
+            ).update(is_active=False)
+    except PublicDataAPIError as e:
+        logger.error(f"Announcement sync failed: {str(e)}")
+        sync_run.status = 'failed'
+        sync_run.error = str(e)
+    except Exception as e:
+        logger.exception(f"Announcement sync failed: {str(e)}")
+        sync_run.status = 'failed'
+        sync_run.error = str(e)
+    
+    if max_serial is not None:
+        sync_run.high_water_serial = str(max_serial)
+    sync_run.finished_at = timezone.now()
+    sync_run.save()
+    logger.info(f"Announcement sync {sync_run.status}: {sync_run.fetched_count} fetched, "
+                f"{sync_run.created_count} created, {sync_run.updated_count} updated, "
+                f"{sync_run.deactivated_count} deactivated")
+    return sync_run
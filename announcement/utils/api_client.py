@@ -1,19 +1,332 @@
 import os
+import asyncio
+import hashlib
+import json
+import random
+import tempfile
+import threading
+import time
+import httpx
 import requests
-from typing import Dict, List, Any, Optional, Tuple
+from requests.adapters import HTTPAdapter
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain, islice
+from typing import Callable, Dict, List, Any, Iterator, Optional, Tuple
 import logging
 
+from .rate_limiter import QuotaExceededError, get_portal_rate_limiter
+from .records import AnnouncementRecord
+
 logger = logging.getLogger(__name__)
 
+# Process-wide HTTP session so every request in a worker reuses pooled keep-alive connections
+_shared_session = None
+_shared_session_lock = threading.Lock()
+
+
+def _env_number(name: str, default, cast=int):
+    """Read a numeric setting from the environment, falling back to the default on invalid values"""
+    try:
+        return cast(os.environ.get(name, default))
+    except (ValueError, TypeError):
+        logger.warning(f"Invalid {name} value, using default of {default}")
+        return default
+
+
+def _params_digest(params: Dict[str, Any], exclude: Tuple[str, ...] = ('serviceKey',)) -> str:
+    """Return a stable digest of the non-empty request params, ignoring the excluded names"""
+    normalized = sorted(
+        (name, str(value).strip()) for name, value in params.items()
+        if name not in exclude and value is not None and str(value).strip() != ''
+    )
+    return hashlib.sha256(json.dumps(normalized, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+def _serial_number_value(serial_number: Any) -> Optional[int]:
+    """Return the numeric value of a pbanc_sn, or None if it is not numeric"""
+    try:
+        return int(serial_number)
+    except (ValueError, TypeError):
+        return None
+
+
+def get_shared_session() -> requests.Session:
+    """
+    Return the HTTP session shared by all API clients in this process
+    
+    The session is created on first use. Its connection pool is sized by API_POOL_MAXSIZE
+    so concurrent page fetches can each hold a keep-alive connection to the portal.
+    
+    Returns:
+        requests.Session: Shared session
+    """
+    global _shared_session
+    
+    if _shared_session is None:
+        with _shared_session_lock:
+            if _shared_session is None:
+                pool_maxsize = max(1, _env_number('API_POOL_MAXSIZE', 10))
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _shared_session = session
+    
+    return _shared_session
+
+class FileResponseCacheBackend:
+    """
+    Response cache backend storing one JSON file per entry in a local directory
+    
+    When the directory grows beyond max_bytes, the least recently written entries are evicted.
+    """
+    
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(self.directory, exist_ok=True)
+    
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+    
+    def get(self, key: str, allow_stale: bool = False) -> Optional[Any]:
+        try:
+            with open(self._path(key), encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        
+        # Expired entries stay on disk until evicted so they can still be served when the quota is exhausted
+        if entry.get('expires_at', 0) < time.time() and not allow_stale:
+            return None
+        return entry.get('data')
+    
+    def set(self, key: str, value: Any, ttl: int) -> None:
+        # Write to a temporary file first so readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'expires_at': time.time() + ttl, 'data': value}, f, ensure_ascii=False)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            logger.warning(f"응답 캐시 저장 실패: {str(e)}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return
+        self._evict()
+    
+    def _evict(self) -> None:
+        """Remove the oldest entries until the cache directory fits in max_bytes"""
+        try:
+            entries = [entry for entry in os.scandir(self.directory) if entry.name.endswith('.json')]
+            stats = [(entry.path, entry.stat()) for entry in entries]
+        except OSError:
+            return
+        
+        total_bytes = sum(stat.st_size for _, stat in stats)
+        if total_bytes <= self.max_bytes:
+            return
+        
+        for path, stat in sorted(stats, key=lambda item: item[1].st_mtime):
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total_bytes -= stat.st_size
+            if total_bytes <= self.max_bytes:
+                break
+
+
+class DjangoResponseCacheBackend:
+    """
+    Response cache backend using one of Django's configured caches
+    
+    Size-based eviction is handled by the cache itself (e.g. MAX_ENTRIES in CACHES OPTIONS).
+    """
+    
+    def __init__(self, alias: str = 'default'):
+        self.alias = alias
+    
+    def get(self, key: str, allow_stale: bool = False) -> Optional[Any]:
+        # Django removes expired entries itself, so stale entries are never available here
+        from django.core.cache import caches
+        return caches[self.alias].get(key)
+    
+    def set(self, key: str, value: Any, ttl: int) -> None:
+        from django.core.cache import caches
+        caches[self.alias].set(key, value, ttl)
+
+
+class PortalResponseCache:
+    """
+    Cache of decoded portal responses keyed by the normalized request params
+    
+    The serviceKey is excluded from the key so entries survive key rotation and are never
+    written to the cache store. Hit and miss counters are kept for the lifetime of the process.
+    """
+    
+    def __init__(self, backend, ttl: int):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def make_key(params: Dict[str, Any]) -> str:
+        """
+        Build the cache key for a set of request params
+        
+        Args:
+            params (Dict[str, Any]): Request parameters
+            
+        Returns:
+            str: Cache key
+        """
+        return f"portal-response-{_params_digest(params)}"
+    
+    def get(self, params: Dict[str, Any], allow_stale: bool = False) -> Optional[Any]:
+        try:
+            value = self.backend.get(self.make_key(params), allow_stale=allow_stale)
+        except Exception as e:
+            logger.warning(f"응답 캐시 조회 실패: {str(e)}")
+            value = None
+        
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+    
+    def set(self, params: Dict[str, Any], value: Any) -> None:
+        try:
+            self.backend.set(self.make_key(params), value, self.ttl)
+        except Exception as e:
+            logger.warning(f"응답 캐시 저장 실패: {str(e)}")
+    
+    def stats(self) -> Dict[str, int]:
+        """
+        Return the hit/miss counters of this cache
+        
+        Returns:
+            Dict[str, int]: {'hits': ..., 'misses': ...}
+        """
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses}
+
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[PortalResponseCache]:
+    """
+    Return the process-wide portal response cache configured from the environment
+    
+    API_CACHE_BACKEND selects 'file' (default), 'django' or 'none'.
+    
+    Returns:
+        Optional[PortalResponseCache]: The cache, or None if caching is disabled
+    """
+    global _response_cache
+    
+    backend_name = os.environ.get('API_CACHE_BACKEND', 'file').lower()
+    if backend_name == 'none':
+        return None
+    
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                ttl = _env_number('API_CACHE_TTL', 3600)
+                if backend_name == 'django':
+                    backend = DjangoResponseCacheBackend(os.environ.get('API_CACHE_DJANGO_ALIAS', 'default'))
+                else:
+                    directory = os.environ.get('API_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'sasum_api_cache'))
+                    backend = FileResponseCacheBackend(directory, _env_number('API_CACHE_MAX_BYTES', 50 * 1024 * 1024))
+                _response_cache = PortalResponseCache(backend, ttl)
+    
+    return _response_cache
+
+
+class _PagePrefetcher:
+    """
+    Fetch pages in a worker pool ahead of the consumer and yield them in page order
+    
+    Fetching starts as soon as the prefetcher is created, and at most `window` pages are in
+    flight or buffered at any time. A page that fails is logged and skipped without dropping
+    the pages after it.
+    """
+    
+    def __init__(self, fetch_page: Callable[[Dict[str, Any], int], Optional[List[AnnouncementRecord]]],
+                 params: Dict[str, Any], page_numbers: range, window: int):
+        self._fetch_page = fetch_page
+        self._params = params
+        self._page_numbers = iter(page_numbers)
+        self._pending = deque()
+        self._failed_pages = []
+        self._executor = ThreadPoolExecutor(max_workers=window) if len(page_numbers) else None
+        for _ in range(window):
+            self._submit_next()
+    
+    def _submit_next(self) -> None:
+        if self._executor is None:
+            return
+        for page_num in islice(self._page_numbers, 1):
+            self._pending.append((page_num, self._executor.submit(self._fetch_page, self._params, page_num)))
+    
+    def __iter__(self) -> Iterator[List[AnnouncementRecord]]:
+        while self._pending:
+            page_num, future = self._pending.popleft()
+            try:
+                page_items = future.result()
+            except Exception as e:
+                logger.error(f"페이지 {page_num} 호출 중 오류: {str(e)}")
+                page_items = None
+            
+            # Keep the prefetch window full before handing the page to the caller
+            self._submit_next()
+            
+            if page_items is None:
+                self._failed_pages.append(page_num)
+                continue
+            
+            yield page_items
+    
+    @property
+    def failed_pages(self) -> List[int]:
+        """Page numbers that could not be fetched so far"""
+        return list(self._failed_pages)
+    
+    def close(self) -> None:
+        """Stop prefetching (e.g. when the caller stopped consuming early)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        if self._failed_pages:
+            logger.error(f"가져오지 못한 페이지: {self._failed_pages} (나머지 페이지 결과는 유지합니다)")
+
+
+class PublicDataAPIError(Exception):
+    """Raised when a portal crawl cannot start (missing key or the first page failed)"""
+
+
 class PublicDataAPIClient:
     """
     Client for the Korean public data portal API for startup announcements
     """
     
-    def __init__(self):
+    def __init__(self, max_workers: Optional[int] = None, session: Optional[requests.Session] = None,
+                 use_cache: bool = True, sync_mode: Optional[str] = None):
         self.api_key = os.environ.get('PUBLIC_DATA_API_KEY')
         self.base_url = "https://apis.data.go.kr/B552735/kisedKstartupService01/getAnnouncementInformation01"
         
+        # Pages skipped by the last iter_announcement_pages call because they could not be fetched
+        self.failed_pages: List[int] = []
+        
         # Check if we're in debug mode
         self.debug_mode = os.environ.get('DEBUG', 'false').lower() == 'true'
         
@@ -32,6 +345,29 @@ class PublicDataAPIClient:
                 self.per_page = 30
                 self.max_items = None
         
+        # Number of pages fetched in parallel after the first page (1 = sequential)
+        if max_workers is None:
+            max_workers = _env_number('API_FETCH_CONCURRENCY', 4)
+        self.max_workers = max(1, max_workers)
+        
+        # HTTP session, timeouts (connect, read) in seconds and retry policy for 5xx/timeouts
+        self.session = session or get_shared_session()
+        self.timeout = (_env_number('API_CONNECT_TIMEOUT', 5.0, float), _env_number('API_READ_TIMEOUT', 30.0, float))
+        self.max_retries = max(0, _env_number('API_MAX_RETRIES', 3))
+        self.retry_backoff = _env_number('API_RETRY_BACKOFF', 0.5, float)
+        self.retry_backoff_max = _env_number('API_RETRY_BACKOFF_MAX', 8.0, float)
+        
+        # Response cache for identical queries (use_cache=False bypasses it)
+        self.cache = get_response_cache() if use_cache else None
+        
+        # Token bucket and daily quota shared by every worker process
+        self.rate_limiter = get_portal_rate_limiter()
+        
+        # 'incremental' stops paging at the high-water mark of the previous crawl,
+        # falling back to a full crawl once every API_FULL_SYNC_INTERVAL_HOURS for reconciliation
+        self.sync_mode = (sync_mode or os.environ.get('API_SYNC_MODE', 'full')).lower()
+        self.full_sync_interval_hours = _env_number('API_FULL_SYNC_INTERVAL_HOURS', 24.0, float)
+        
         if not self.api_key:
             logger.warning("PUBLIC_DATA_KEY not found in environment variables")
     
@@ -72,26 +408,66 @@ class PublicDataAPIClient:
             
         return params
     
+    def _retry_delay(self, attempt: int) -> float:
+        """
+        Compute the jittered exponential backoff delay before a retry
+        
+        Args:
+            attempt (int): Zero-based number of the attempt that just failed
+            
+        Returns:
+            float: Seconds to wait ("full jitter" between 0 and the capped exponential delay)
+        """
+        return random.uniform(0, min(self.retry_backoff_max, self.retry_backoff * (2 ** attempt)))
+    
     def _make_api_request(self, params: Dict[str, Any], page_num: int) -> Optional[requests.Response]:
         """
         Make API request with given parameters
         
+        Server errors (5xx), timeouts and connection errors are retried up to max_retries
+        times with jittered exponential backoff. Every attempt takes a token from the rate limiter.
+        
         Args:
             params (Dict[str, Any]): Request parameters
             page_num (int): Page number for logging
             
         Returns:
             Optional[requests.Response]: Response object or None if request failed
+            
+        Raises:
+            QuotaExceededError: If the daily call quota is exhausted
         """
-        try:
-            # Log API call details
-            logger.info(f"API 호출 URL: {self.base_url}")
-            logger.info(f"API 호출 페이지: {page_num}")
-            logger.info(f"API 호출 파라미터: {params}")
+        # Log API call details
+        logger.info(f"API 호출 URL: {self.base_url}")
+        logger.info(f"API 호출 페이지: {page_num}")
+        logger.info(f"API 호출 파라미터: {params}")
+        
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
             
-            # Make API request
-            response = requests.get(self.base_url, params=params)
-            logger.info(f"API 응답 상태 코드: {response.status_code}")
+            try:
+                # Make API request
+                response = self.session.get(self.base_url, params=params, timeout=self.timeout)
+                logger.info(f"API 응답 상태 코드: {response.status_code}")
+            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+                if attempt < self.max_retries:
+                    delay = self._retry_delay(attempt)
+                    logger.warning(f"API 요청 시간 초과/연결 오류 (페이지 {page_num}, 시도 {attempt + 1}): {str(e)}. {delay:.2f}초 후 재시도합니다")
+                    time.sleep(delay)
+                    continue
+                logger.error(f"API 요청 오류: {str(e)}")
+                return None
+            except requests.exceptions.RequestException as e:
+                logger.error(f"API 요청 오류: {str(e)}")
+                return None
+            
+            # Retry server errors
+            if response.status_code >= 500 and attempt < self.max_retries:
+                delay = self._retry_delay(attempt)
+                logger.warning(f"서버 오류 {response.status_code} (페이지 {page_num}, 시도 {attempt + 1}). {delay:.2f}초 후 재시도합니다")
+                time.sleep(delay)
+                continue
             
             # Check response status code
             if response.status_code != 200:
@@ -112,27 +488,90 @@ class PublicDataAPIClient:
                 return None
                 
             return response
+        
+        return None
+    
+    def _get_page_data(self, params: Dict[str, Any], page_num: int) -> Optional[Any]:
+        """
+        Return the decoded API response for the given params, from the cache when possible
+        
+        Args:
+            params (Dict[str, Any]): Request parameters
+            page_num (int): Page number for logging
+            
+        Returns:
+            Optional[Any]: Decoded JSON response, or None if the request failed
+        """
+        if self.cache:
+            data = self.cache.get(params)
+            if data is not None:
+                logger.info(f"캐시된 응답 사용 (페이지 {page_num})")
+                return data
+        
+        try:
+            response = self._make_api_request(params, page_num)
+        except QuotaExceededError as e:
+            logger.error(str(e))
+            return self._get_stale_page_data(params, page_num)
+        if not response:
+            return None
+        
+        return self._decode_response(response, params)
+    
+    def _get_stale_page_data(self, params: Dict[str, Any], page_num: int) -> Optional[Any]:
+        """
+        Return an expired cached response when the portal can no longer be called
+        
+        Args:
+            params (Dict[str, Any]): Request parameters
+            page_num (int): Page number for logging
+            
+        Returns:
+            Optional[Any]: Decoded JSON response, or None if nothing is cached
+        """
+        if not self.cache:
+            return None
+        
+        data = self.cache.get(params, allow_stale=True)
+        if data is not None:
+            logger.warning(f"호출 한도 초과로 만료된 캐시 응답을 사용합니다 (페이지 {page_num})")
+        return data
+    
+    def _decode_response(self, response: Any, params: Dict[str, Any]) -> Optional[Any]:
+        """
+        Decode a successful API response and store it in the cache
+        
+        Args:
+            response (Any): requests or httpx response
+            params (Dict[str, Any]): Request parameters used as the cache key
             
-        except requests.exceptions.RequestException as e:
-            logger.error(f"API 요청 오류: {str(e)}")
+        Returns:
+            Optional[Any]: Decoded JSON response, or None if it is not valid JSON
+        """
+        try:
+            data = response.json()
+        except ValueError as e:
+            logger.error(f"JSON 파싱 오류: {str(e)}")
             return None
+        
+        # Never cache error payloads
+        if self.cache and not (isinstance(data, dict) and 'error' in data):
+            self.cache.set(params, data)
+        return data
     
-    def _parse_response_data(self, response: requests.Response, per_page: int) -> Tuple[List[Dict[str, Any]], int, int]:
+    def _parse_response_data(self, data: Any, per_page: int) -> Tuple[List[AnnouncementRecord], int, int]:
         """
         Parse API response and extract items and pagination info
         
         Args:
-            response (requests.Response): API response
+            data (Any): Decoded JSON response
             per_page (int): Number of items per page for pagination calculation
             
         Returns:
-            Tuple[List[Dict[str, Any]], int, int]: (items, match_count, total_pages)
+            Tuple[List[AnnouncementRecord], int, int]: (items, match_count, total_pages)
             Returns empty list and 0, 0 if parsing failed
         """
         try:
-            # Parse JSON response
-            data = response.json()
-            
             # Check for error in response
             if isinstance(data, dict) and 'error' in data:
                 logger.error(f"API error: {data['error']}")
@@ -144,16 +583,13 @@ class PublicDataAPIClient:
             if isinstance(data, list):
                 # API directly returned a list of items
                 logger.error("API가 리스트 형식으로 응답을 반환했습니다")
-                items = data
+                items = self._extract_items(data)
                 match_count = len(items)
                 total_pages = 1  # Assume single page if direct list
                 
             elif isinstance(data, dict):
                 # Normal nested structure
-                if "data" in data and isinstance(data["data"], dict) and "data" in data["data"]:
-                    items = data["data"]["data"]
-                elif "data" in data and isinstance(data["data"], list):
-                    items = data["data"]
+                items = self._extract_items(data)
                 
                 # Get match count from the response if available
                 match_count = int(data.get("matchCount", len(items)))
@@ -181,96 +617,135 @@ class PublicDataAPIClient:
             logger.error(f"JSON 파싱 오류: {str(e)}")
             return [], 0, 0
     
-    def _fetch_additional_pages(self, params: Dict[str, Any], start_page: int, 
-                               total_pages: int, current_item_count: int) -> List[Dict[str, Any]]:
+    def _extract_items(self, data: Any) -> List[AnnouncementRecord]:
         """
-        Fetch additional pages beyond the first one
+        Extract the announcement items from a decoded API response as normalized records
         
         Args:
-            params (Dict[str, Any]): Base request parameters
-            start_page (int): Page to start from (usually initial_page + 1)
-            total_pages (int): Total number of pages to fetch
-            current_item_count (int): Number of items already fetched
+            data (Any): Decoded JSON response
             
         Returns:
-            List[Dict[str, Any]]: Items from additional pages
+            List[AnnouncementRecord]: Items contained in the response
         """
-        additional_items = []
+        items = []
+        if isinstance(data, list):
+            items = data
+        elif isinstance(data, dict):
+            if "data" in data and isinstance(data["data"], dict) and "data" in data["data"]:
+                items = data["data"]["data"]
+            elif "data" in data and isinstance(data["data"], list):
+                items = data["data"]
         
-        for page_num in range(start_page, total_pages + 1):
-            # In debug mode, check if we've reached the maximum items
-            if self.debug_mode and self.max_items and current_item_count + len(additional_items) >= self.max_items:
-                logger.warning(f"DEBUG 모드: 최대 항목 수 {self.max_items}에 도달했습니다. 추가 페이지를 가져오지 않습니다.")
-                break
-                
-            # Update page parameter
-            params["page"] = page_num
-            
-            # Log API call details
-            logger.info(f"추가 API 호출 페이지: {page_num}")
-            
-            # Make API request
-            response = self._make_api_request(params, page_num)
+        return [AnnouncementRecord.from_api_item(item) for item in items if isinstance(item, dict)]
+    
+    def _fetch_page(self, params: Dict[str, Any], page_num: int) -> Optional[List[AnnouncementRecord]]:
+        """
+        Fetch a single additional page
+        
+        Args:
+            params (Dict[str, Any]): Base request parameters (not modified)
+            page_num (int): Page number to fetch
             
-            if not response:
-                break
+        Returns:
+            Optional[List[AnnouncementRecord]]: Items of the page, or None if the page could not be fetched
+        """
+        # Each page gets its own copy so concurrent workers never share a params dict
+        page_params = dict(params, page=page_num)
+        
+        logger.info(f"추가 API 호출 페이지: {page_num}")
+        page_data = self._get_page_data(page_params, page_num)
+        if page_data is None:
+            return None
+        
+        page_items = self._extract_items(page_data)
+        logger.info(f"페이지 {page_num} 아이템 수: {len(page_items)}")
+        return page_items
+    
+    def _load_high_water_mark(self, signature: str) -> Optional[int]:
+        """
+        Return the high-water serial number to stop at, or None if a full crawl is due
+        
+        Args:
+            signature (str): Query signature of the crawl
             
-            try:
-                page_data = response.json()
-                
-                # Extract items from this page
-                page_items = []
-                if isinstance(page_data, list):
-                    page_items = page_data
-                elif isinstance(page_data, dict):
-                    if "data" in page_data and isinstance(page_data["data"], dict) and "data" in page_data["data"]:
-                        page_items = page_data["data"]["data"]
-                    elif "data" in page_data and isinstance(page_data["data"], list):
-                        page_items = page_data["data"]
-                
-                logger.info(f"페이지 {page_num} 아이템 수: {len(page_items)}")
-                
-                # In debug mode, add items until we reach the maximum
-                if self.debug_mode and self.max_items:
-                    remaining_slots = self.max_items - (current_item_count + len(additional_items))
-                    if remaining_slots <= 0:
-                        # Already have enough items
-                        break
-                    elif len(page_items) > remaining_slots:
-                        # Need to truncate the items to fit the max
-                        additional_items.extend(page_items[:remaining_slots])
-                        break
-                    else:
-                        # Can add all items
-                        additional_items.extend(page_items)
-                else:
-                    # Normal mode, add all items
-                    additional_items.extend(page_items)
-                
-            except ValueError as e:
-                logger.error(f"추가 페이지 JSON 파싱 오류: {str(e)}")
-                break
-                
-        return additional_items
+        Returns:
+            Optional[int]: Highest serial number seen by the previous crawl of this query
+        """
+        from django.utils import timezone
+        from announcement.models import PortalSyncState
+        
+        state = PortalSyncState.objects.filter(pk=signature).first()
+        if not state or not state.last_full_sync_at:
+            logger.info("증분 모드: 이전 전체 동기화 기록이 없어 전체 조회를 수행합니다")
+            return None
+        
+        elapsed_hours = (timezone.now() - state.last_full_sync_at).total_seconds() / 3600
+        if elapsed_hours >= self.full_sync_interval_hours:
+            logger.info(f"증분 모드: 마지막 전체 동기화 후 {elapsed_hours:.1f}시간이 지나 전체 조회로 재조정합니다")
+            return None
+        
+        return _serial_number_value(state.high_water_serial)
     
-    def get_announcements(self, page: int = 1, per_page: int = None, region: str = None, 
-                          startup_period: str = None, target_age: str = None) -> Optional[List[Dict[str, Any]]]:
+    def _save_high_water_mark(self, signature: str, max_serial: Optional[int], full_crawl: bool) -> None:
         """
-        Fetch announcements from the public data portal API
+        Persist the highest serial number seen for a query signature
         
         Args:
-            page (int): Page number for pagination (0-based)
+            signature (str): Query signature of the crawl
+            max_serial (Optional[int]): Highest serial number seen by this crawl
+            full_crawl (bool): Whether this crawl walked every page
+        """
+        from django.utils import timezone
+        from announcement.models import PortalSyncState
+        
+        state, _ = PortalSyncState.objects.get_or_create(pk=signature)
+        previous = _serial_number_value(state.high_water_serial)
+        if max_serial is not None and (previous is None or max_serial > previous):
+            state.high_water_serial = str(max_serial)
+        if full_crawl:
+            state.last_full_sync_at = timezone.now()
+        state.save()
+    
+    def iter_announcement_pages(self, page: int = 1, per_page: int = None, region: str = None, 
+                                startup_period: str = None, target_age: str = None,
+                                incremental: Optional[bool] = None,
+                                sync_scope: str = '') -> Iterator[List[AnnouncementRecord]]:
+        """
+        Yield announcements from the public data portal API page by page as they arrive
+        
+        Unlike get_announcements, the full result set is never held in memory, so callers can
+        process the first page while later pages are still being fetched.
+        
+        In incremental mode the portal is assumed to list the newest registrations first, and
+        paging stops at the first page whose serial numbers are all at or below the high-water
+        mark recorded for the same query and sync scope by the previous crawl. Callers that
+        only keep part of the announcements, like a search saving those matching its AI
+        condition, must pass a scope identifying what they keep; otherwise one caller's crawl
+        would hide announcements another caller never kept. The mark is not moved when
+        pages could not be fetched, so their announcements are picked up by the next crawl.
+        
+        Pages that fail after the first one are skipped; their numbers are left in
+        self.failed_pages once the iteration has ended.
+        
+        Args:
+            page (int): First page to fetch
             per_page (int, optional): Number of items per page, defaults to value from env
             region (str, optional): Region filter
             startup_period (str, optional): Startup period filter (e.g., "7년미만", "예비창업자")
             target_age (str, optional): Target age filter (e.g., "만 20세 미만")
+            incremental (bool, optional): Stop at the high-water mark, defaults to API_SYNC_MODE
+            sync_scope (str): Key separating the high-water marks of callers keeping different
+                subsets of the announcements
             
-        Returns:
-            List[Dict[str, Any]] or None: List of announcement data as dictionaries, or None if request failed
+        Yields:
+            List[AnnouncementRecord]: Announcement data of each page
+            
+        Raises:
+            PublicDataAPIError: If the API key is missing or the first page could not be fetched
         """
+        self.failed_pages = []
         if not self.api_key:
-            logger.error("No supplier key available for public data portal")
-            return None
+            raise PublicDataAPIError("No supplier key available for public data portal")
         
         # Use provided per_page or default from environment
         per_page = per_page or self.per_page
@@ -279,26 +754,334 @@ class PublicDataAPIClient:
         params = self._build_params(page, per_page, region, startup_period, target_age)
         
         # Make the initial API request 
-        response = self._make_api_request(params, page)
-        if not response:
-            return None
+        data = self._get_page_data(params, page)
+        if data is None:
+            raise PublicDataAPIError("API에서 첫 페이지를 가져오지 못했습니다")
         
         # Parse the response and get initial items
-        items, match_count, total_pages = self._parse_response_data(response, per_page)
+        items, match_count, total_pages = self._parse_response_data(data, per_page)
         if not items:
-            return []
+            return
         
-        # In debug mode, truncate first page items if needed
-        if self.debug_mode and self.max_items and len(items) > self.max_items:
-            all_items = items[:self.max_items]
-            logger.warning(f"DEBUG 모드: 첫 페이지에서 {self.max_items}개 항목으로 제한했습니다")
+        if incremental is None:
+            incremental = self.sync_mode == 'incremental'
+        
+        signature = _params_digest(dict(params, syncScope=sync_scope), exclude=('serviceKey', 'page', 'perPage'))
+        high_water = self._load_high_water_mark(signature) if incremental else None
+        
+        # In debug mode, stop once max_items have been yielded
+        remaining = self.max_items if self.debug_mode and self.max_items else None
+        
+        if high_water is None:
+            # Start fetching the following pages while the caller works on the first one
+            prefetcher = _PagePrefetcher(self._fetch_page, params, range(page + 1, total_pages + 1), self.max_workers)
+            pages = chain([items], prefetcher)
         else:
-            all_items = items.copy()
+            # Incremental crawls usually stop after a page or two, so fetch one page at a time
+            # and only once the first page turned out to contain new announcements
+            prefetcher = None
+            
+            def pages_after_first():
+                nonlocal prefetcher
+                prefetcher = _PagePrefetcher(self._fetch_page, params, range(page + 1, total_pages + 1), 1)
+                yield from prefetcher
+            
+            pages = chain([items], pages_after_first())
+        
+        def failed_pages() -> List[int]:
+            return prefetcher.failed_pages if prefetcher is not None else []
+        
+        try:
+            yield from self._iter_until_high_water(pages, signature, high_water, incremental, remaining, failed_pages)
+        finally:
+            if prefetcher is not None:
+                self.failed_pages = prefetcher.failed_pages
+                prefetcher.close()
+    
+    def _iter_until_high_water(self, pages: Iterator[List[AnnouncementRecord]], signature: str,
+                               high_water: Optional[int], incremental: bool, remaining: Optional[int],
+                               failed_pages: Callable[[], List[int]] = list) -> Iterator[List[AnnouncementRecord]]:
+        """
+        Yield pages until the high-water mark (incremental mode) or the debug item limit is reached
+        
+        Args:
+            pages (Iterator[List[AnnouncementRecord]]): Pages in order
+            signature (str): Query signature of the crawl
+            high_water (Optional[int]): Serial number to stop at, None for a full crawl
+            incremental (bool): Whether to record the high-water mark of this crawl
+            remaining (Optional[int]): Maximum number of items to yield (debug mode)
+            failed_pages (Callable[[], List[int]]): Returns the pages skipped so far
+            
+        Yields:
+            List[AnnouncementRecord]: Announcement data of each page
+        """
+        max_serial = None
+        
+        for page_items in pages:
+            serials = [_serial_number_value(item.pbanc_sn) for item in page_items]
+            numeric_serials = [serial for serial in serials if serial is not None]
+            if numeric_serials:
+                max_serial = max([max_serial or 0] + numeric_serials)
+            
+            # Stop paging once a page contains only announcements already seen by the previous crawl
+            if high_water is not None and serials and all(serial is not None and serial <= high_water for serial in serials):
+                logger.info(f"증분 모드: 고수위 공고번호 {high_water} 이하의 공고만 있어 페이지 조회를 중단합니다")
+                self._finish_crawl(signature, max_serial, False, failed_pages())
+                return
+            
+            if remaining is not None:
+                page_items = page_items[:remaining]
+                remaining -= len(page_items)
+            
+            yield page_items
+            
+            if remaining is not None and remaining <= 0:
+                logger.warning(f"DEBUG 모드: 최대 항목 수 {self.max_items}에 도달했습니다")
+                return
+        
+        if incremental:
+            self._finish_crawl(signature, max_serial, high_water is None, failed_pages())
+    
+    def _finish_crawl(self, signature: str, max_serial: Optional[int], full_crawl: bool,
+                      failed_pages: List[int]) -> None:
+        """Record the high-water mark of a crawl unless some of its pages were skipped"""
+        if failed_pages:
+            # Announcements of the skipped pages lie below the new mark and would never be fetched
+            logger.warning(f"증분 모드: 가져오지 못한 페이지 {failed_pages}가 있어 고수위 공고번호를 갱신하지 않습니다")
+            return
+        self._save_high_water_mark(signature, max_serial, full_crawl)
+    
+    def get_announcements(self, page: int = 1, per_page: int = None, region: str = None, 
+                          startup_period: str = None, target_age: str = None) -> Optional[List[AnnouncementRecord]]:
+        """
+        Fetch announcements from the public data portal API
+        
+        Args:
+            page (int): Page number for pagination (0-based)
+            per_page (int, optional): Number of items per page, defaults to value from env
+            region (str, optional): Region filter
+            startup_period (str, optional): Startup period filter (e.g., "7년미만", "예비창업자")
+            target_age (str, optional): Target age filter (e.g., "만 20세 미만")
+            
+        Returns:
+            List[AnnouncementRecord] or None: List of normalized announcement records, or None if request failed
+        """
+        all_items = []
+        try:
+            for page_items in self.iter_announcement_pages(page, per_page, region, startup_period, target_age):
+                all_items.extend(page_items)
+        except PublicDataAPIError as e:
+            logger.error(str(e))
+            return None
+        
+        logger.info(f"총 {len(all_items)}개의 항목을 가져왔습니다")
+        if self.cache:
+            stats = self.cache.stats()
+            logger.info(f"응답 캐시 적중: {stats['hits']}, 미스: {stats['misses']}")
+        return all_items
+
+
+class AsyncPublicDataAPIClient(PublicDataAPIClient):
+    """
+    Asyncio client for the Korean public data portal API for startup announcements
+    
+    Shares configuration, parameter building and response parsing with PublicDataAPIClient,
+    but performs requests with httpx.AsyncClient so a crawl can be awaited from async views.
+    The number of requests in flight per crawl is bounded by max_workers (API_FETCH_CONCURRENCY).
+    """
+    
+    def __init__(self, max_workers: Optional[int] = None, client: Optional[httpx.AsyncClient] = None,
+                 use_cache: bool = True):
+        super().__init__(max_workers=max_workers, use_cache=use_cache)
+        # Optional long-lived client owned by the caller; otherwise one is created per crawl
+        self.client = client
+    
+    def _create_client(self) -> httpx.AsyncClient:
+        """
+        Create an async HTTP client with the configured timeouts and connection limits
+        
+        Returns:
+            httpx.AsyncClient: New client (caller is responsible for closing it)
+        """
+        connect_timeout, read_timeout = self.timeout
+        return httpx.AsyncClient(
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=self.max_workers, max_keepalive_connections=self.max_workers),
+        )
+    
+    async def _make_async_api_request(self, client: httpx.AsyncClient, params: Dict[str, Any], 
+                                      page_num: int) -> Optional[httpx.Response]:
+        """
+        Make an async API request with the same retry policy as the sync client
+        
+        Args:
+            client (httpx.AsyncClient): Client to send the request with
+            params (Dict[str, Any]): Request parameters
+            page_num (int): Page number for logging
+            
+        Returns:
+            Optional[httpx.Response]: Response object or None if request failed
+            
+        Raises:
+            QuotaExceededError: If the daily call quota is exhausted
+        """
+        logger.info(f"비동기 API 호출 페이지: {page_num}")
+        
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limiter:
+                # The limiter may sleep while waiting for a token, so keep it off the event loop
+                await asyncio.to_thread(self.rate_limiter.acquire)
+            
+            try:
+                response = await client.get(self.base_url, params=params)
+                logger.info(f"API 응답 상태 코드: {response.status_code}")
+            except (httpx.TimeoutException, httpx.TransportError) as e:
+                if attempt < self.max_retries:
+                    delay = self._retry_delay(attempt)
+                    logger.warning(f"API 요청 시간 초과/연결 오류 (페이지 {page_num}, 시도 {attempt + 1}): {str(e)}. {delay:.2f}초 후 재시도합니다")
+                    await asyncio.sleep(delay)
+                    continue
+                logger.error(f"API 요청 오류: {str(e)}")
+                return None
+            except httpx.HTTPError as e:
+                logger.error(f"API 요청 오류: {str(e)}")
+                return None
+            
+            # Retry server errors
+            if response.status_code >= 500 and attempt < self.max_retries:
+                delay = self._retry_delay(attempt)
+                logger.warning(f"서버 오류 {response.status_code} (페이지 {page_num}, 시도 {attempt + 1}). {delay:.2f}초 후 재시도합니다")
+                await asyncio.sleep(delay)
+                continue
+            
+            if response.status_code != 200:
+                logger.error(f"API 오류 응답: {response.status_code}")
+                if response.status_code == 401:
+                    logger.error("인증 오류: API 키를 확인하세요")
+                return None
+            
+            if not response.text.strip():
+                logger.error("API returned empty response")
+                return None
+            
+            return response
+        
+        return None
+    
+    async def _get_page_data_async(self, client: httpx.AsyncClient, semaphore: asyncio.Semaphore,
+                                   params: Dict[str, Any], page_num: int) -> Optional[Any]:
+        """
+        Return the decoded API response for the given params, from the cache when possible
+        
+        Args:
+            client (httpx.AsyncClient): Client to send the request with
+            semaphore (asyncio.Semaphore): Semaphore limiting requests in flight
+            params (Dict[str, Any]): Request parameters
+            page_num (int): Page number for logging
+            
+        Returns:
+            Optional[Any]: Decoded JSON response, or None if the request failed
+        """
+        # The cache backends read and write files or a Django cache, so keep them off the event loop
+        if self.cache:
+            data = await asyncio.to_thread(self.cache.get, params)
+            if data is not None:
+                logger.info(f"캐시된 응답 사용 (페이지 {page_num})")
+                return data
+        
+        try:
+            async with semaphore:
+                response = await self._make_async_api_request(client, params, page_num)
+        except QuotaExceededError as e:
+            logger.error(str(e))
+            return await asyncio.to_thread(self._get_stale_page_data, params, page_num)
+        if not response:
+            return None
+        
+        return await asyncio.to_thread(self._decode_response, response, params)
+    
+    async def _fetch_page_async(self, client: httpx.AsyncClient, semaphore: asyncio.Semaphore, 
+                                params: Dict[str, Any], page_num: int) -> Optional[List[AnnouncementRecord]]:
+        """
+        Fetch a single additional page, waiting on the semaphore to bound concurrency
+        
+        Args:
+            client (httpx.AsyncClient): Client to send the request with
+            semaphore (asyncio.Semaphore): Semaphore limiting requests in flight
+            params (Dict[str, Any]): Base request parameters (not modified)
+            page_num (int): Page number to fetch
+            
+        Returns:
+            Optional[List[AnnouncementRecord]]: Items of the page, or None if the page could not be fetched
+        """
+        page_data = await self._get_page_data_async(client, semaphore, dict(params, page=page_num), page_num)
+        if page_data is None:
+            return None
+        
+        page_items = self._extract_items(page_data)
+        logger.info(f"페이지 {page_num} 아이템 수: {len(page_items)}")
+        return page_items
+    
+    async def get_announcements(self, page: int = 1, per_page: int = None, region: str = None, 
+                                startup_period: str = None, target_age: str = None) -> Optional[List[AnnouncementRecord]]:
+        """
+        Fetch announcements from the public data portal API without blocking the event loop
+        
+        Args:
+            page (int): Page number for pagination
+            per_page (int, optional): Number of items per page, defaults to value from env
+            region (str, optional): Region filter
+            startup_period (str, optional): Startup period filter (e.g., "7년미만", "예비창업자")
+            target_age (str, optional): Target age filter (e.g., "만 20세 미만")
+            
+        Returns:
+            List[AnnouncementRecord] or None: List of normalized announcement records, or None if request failed
+        """
+        if not self.api_key:
+            logger.error("No supplier key available for public data portal")
+            return None
+        
+        per_page = per_page or self.per_page
+        params = self._build_params(page, per_page, region, startup_period, target_age)
+        
+        client = self.client or self._create_client()
+        try:
+            semaphore = asyncio.Semaphore(self.max_workers)
+            
+            # The first page tells us how many pages there are
+            data = await self._get_page_data_async(client, semaphore, params, page)
+            if data is None:
+                return None
+            
+            items, match_count, total_pages = self._parse_response_data(data, per_page)
+            if not items:
+                return []
+            
+            all_items = list(items)
+            
+            # Fetch the remaining pages concurrently; gather keeps page order
+            page_numbers = list(range(page + 1, total_pages + 1))
+            if page_numbers and (not self.debug_mode or len(all_items) < self.max_items):
+                pages = await asyncio.gather(
+                    *(self._fetch_page_async(client, semaphore, params, page_num) for page_num in page_numbers),
+                    return_exceptions=True,
+                )
+                failed_pages = []
+                for page_num, page_items in zip(page_numbers, pages):
+                    if page_items is None or isinstance(page_items, BaseException):
+                        failed_pages.append(page_num)
+                        continue
+                    all_items.extend(page_items)
+                
+                if failed_pages:
+                    logger.error(f"가져오지 못한 페이지: {failed_pages} (나머지 페이지 결과는 유지합니다)")
+        finally:
+            if client is not self.client:
+                await client.aclose()
         
-        # Always fetch all pages if there are more than one (respecting max_items in debug mode)
-        if total_pages > 1 and (not self.debug_mode or len(all_items) < self.max_items):
-            additional_items = self._fetch_additional_pages(params, page + 1, total_pages, len(all_items))
-            all_items.extend(additional_items)
+        # In debug mode, keep only as many items as allowed
+        if self.debug_mode and self.max_items and len(all_items) > self.max_items:
+            all_items = all_items[:self.max_items]
         
         logger.info(f"총 {len(all_items)}개의 항목을 가져왔습니다")
-        return all_items 
\ No newline at end of file
+        return all_items
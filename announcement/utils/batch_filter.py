@@ -0,0 +1,319 @@
+import os
+import io
+import json
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+from django.utils import timezone
+
+from announcement.models import AIBatchJob
+from . import verdict_cache
+from .ai_utils import (
+    FILTER_RESPONSE_SCHEMA, FILTER_SYSTEM_PROMPT, GEMINI_GENERATION_CONFIG, build_announcement_chunks,
+    build_filter_prompt, get_ai_client, resolve_ai_choice, _content_hash, _get_serial_number,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class BatchJobError(Exception):
+    """Raised when a batch job cannot be submitted or its results cannot be read"""
+
+
+def parse_serial_numbers(content: str) -> List[str]:
+    """
+    Parse the serial numbers out of a filtering response
+    
+    Args:
+        content (str): JSON text returned by the model
+    
+    Returns:
+        List[str]: Matching serial numbers as strings
+    
+    Raises:
+        ValueError: If the response is not a JSON object with serial numbers
+    """
+    start_index = content.find('{')
+    end_index = content.rfind('}') + 1
+    result = json.loads(content[start_index:end_index] if start_index != -1 else content)
+    if not isinstance(result, dict) or 'serial_numbers' not in result:
+        raise ValueError(f"Invalid response format: {content[:200]}")
+    return [str(serial_number) for serial_number in result['serial_numbers']]
+
+
+class OpenAIBatchBackend:
+    """
+    OpenAI Batch API: one chat completion request per chunk in an uploaded JSONL file
+    
+    Requests use the structured-output format, since assistants cannot run in a batch. The
+    endpoint follows OPENAI_BASE_URL like every other OpenAI call.
+    """
+    
+    def submit(self, model_name: str, prompts: List[Tuple[str, str]]) -> str:
+        client = get_ai_client('openai')
+        if not client:
+            raise BatchJobError("OPENAI_API_KEY가 설정되지 않았습니다.")
+        
+        lines = []
+        for custom_id, prompt in prompts:
+            lines.append(json.dumps({
+                "custom_id": custom_id,
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": model_name,
+                    "messages": [
+                        {"role": "system", "content": FILTER_SYSTEM_PROMPT},
+                        {"role": "user", "content": prompt},
+                    ],
+                    "response_format": {
+                        "type": "json_schema",
+                        "json_schema": {"name": "filter_result", "strict": True, "schema": FILTER_RESPONSE_SCHEMA},
+                    },
+                    "temperature": 0.2,
+                },
+            }, ensure_ascii=False))
+        
+        try:
+            input_file = client.files.create(
+                file=("sasum_batch.jsonl", io.BytesIO("\n".join(lines).encode('utf-8'))),
+                purpose="batch",
+            )
+            batch = client.batches.create(
+                input_file_id=input_file.id,
+                endpoint="/v1/chat/completions",
+                completion_window="24h",
+            )
+        except Exception as e:
+            raise BatchJobError(f"Failed to submit OpenAI batch: {str(e)}") from e
+        return batch.id
+    
+    def poll(self, job_id: str) -> Tuple[str, Optional[Dict[str, List[str]]]]:
+        client = get_ai_client('openai')
+        if not client:
+            raise BatchJobError("OPENAI_API_KEY가 설정되지 않았습니다.")
+        
+        try:
+            batch = client.batches.retrieve(job_id)
+            if batch.status in ("failed", "expired", "cancelled"):
+                return 'failed', None
+            if batch.status != "completed":
+                return 'submitted', None
+            if not batch.output_file_id:
+                return 'failed', None
+            output = client.files.content(batch.output_file_id).text
+        except Exception as e:
+            raise BatchJobError(f"Failed to poll OpenAI batch {job_id}: {str(e)}") from e
+        
+        results = {}
+        for line in output.splitlines():
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError as e:
+                logger.warning(f"Unreadable line in OpenAI batch output {batch.output_file_id}: {str(e)}")
+                continue
+            if not isinstance(entry, dict):
+                logger.warning(f"Unexpected line in OpenAI batch output {batch.output_file_id}: {line[:200]}")
+                continue
+            response = entry.get('response') or {}
+            if entry.get('error') or response.get('status_code') != 200:
+                logger.warning(f"OpenAI batch request {entry.get('custom_id')} failed: {entry.get('error')}")
+                continue
+            try:
+                choice = response['body']['choices'][0]
+                if choice.get('finish_reason') == 'length':
+                    raise ValueError("truncated response")
+                results[entry['custom_id']] = parse_serial_numbers(choice['message']['content'] or '')
+            except (KeyError, IndexError, ValueError) as e:
+                logger.warning(f"Unusable OpenAI batch response for {entry.get('custom_id')}: {str(e)}")
+        return 'completed', results
+
+
+class GeminiBatchBackend:
+    """
+    Gemini Batch API over REST with inline requests
+    
+    The installed SDK has no batch support, so the batchGenerateContent endpoint is called
+    directly. GEMINI_API_BASE_URL points it at another host, e.g. a local stand-in server.
+    """
+    
+    def __init__(self):
+        self.base_url = os.environ.get('GEMINI_API_BASE_URL', 'https://generativelanguage.googleapis.com').rstrip('/')
+    
+    def _headers(self) -> Dict[str, str]:
+        api_key = os.environ.get('GEMINI_API_KEY')
+        if not api_key:
+            raise BatchJobError("GEMINI_API_KEY가 설정되지 않았습니다.")
+        return {'x-goog-api-key': api_key, 'Content-Type': 'application/json'}
+    
+    def submit(self, model_name: str, prompts: List[Tuple[str, str]]) -> str:
+        generation_config = {
+            "temperature": GEMINI_GENERATION_CONFIG["temperature"],
+            "topP": GEMINI_GENERATION_CONFIG["top_p"],
+            "responseMimeType": GEMINI_GENERATION_CONFIG["response_mime_type"],
+        }
+        body = {
+            "batch": {
+                "display_name": "sasum-batch-filter",
+                "input_config": {
+                    "requests": {
+                        "requests": [
+                            {
+                                "request": {
+                                    "systemInstruction": {"parts": [{"text": FILTER_SYSTEM_PROMPT}]},
+                                    "contents": [{"role": "user", "parts": [{"text": prompt}]}],
+                                    "generationConfig": generation_config,
+                                },
+                                "metadata": {"key": custom_id},
+                            }
+                            for custom_id, prompt in prompts
+                        ],
+                    },
+                },
+            },
+        }
+        
+        try:
+            response = requests.post(
+                f"{self.base_url}/v1beta/models/{model_name}:batchGenerateContent",
+                headers=self._headers(), json=body, timeout=(5, 120),
+            )
+            response.raise_for_status()
+            return response.json()['name']
+        except (requests.RequestException, KeyError, ValueError) as e:
+            raise BatchJobError(f"Failed to submit Gemini batch: {str(e)}") from e
+    
+    def poll(self, job_id: str) -> Tuple[str, Optional[Dict[str, List[str]]]]:
+        try:
+            response = requests.get(f"{self.base_url}/v1beta/{job_id}", headers=self._headers(), timeout=(5, 120))
+            response.raise_for_status()
+            operation = response.json()
+        except (requests.RequestException, ValueError) as e:
+            raise BatchJobError(f"Failed to poll Gemini batch {job_id}: {str(e)}") from e
+        
+        state = (operation.get('metadata') or {}).get('state', '')
+        if state.endswith(('FAILED', 'CANCELLED', 'EXPIRED')) or operation.get('error'):
+            return 'failed', None
+        if not operation.get('done'):
+            return 'submitted', None
+        
+        results = {}
+        inlined = ((operation.get('response') or {}).get('inlinedResponses') or {}).get('inlinedResponses', [])
+        for entry in inlined:
+            key = (entry.get('metadata') or {}).get('key')
+            try:
+                candidate = entry['response']['candidates'][0]
+                if candidate.get('finishReason') == 'MAX_TOKENS':
+                    raise ValueError("truncated response")
+                text = ''.join(part.get('text', '') for part in candidate['content']['parts'])
+                results[key] = parse_serial_numbers(text)
+            except (KeyError, IndexError, TypeError, ValueError) as e:
+                logger.warning(f"Unusable Gemini batch response for {key}: {entry.get('error') or str(e)}")
+        return 'completed', results
+
+
+# Batch backends per platform
+BATCH_BACKENDS = {
+    'openai': OpenAIBatchBackend,
+    'gemini': GeminiBatchBackend,
+}
+
+
+def submit_batch_job(announcements: List[Any], user_condition: str, ai_choice: str) -> AIBatchJob:
+    """
+    Package announcements into chunks and submit them as one provider batch job
+    
+    Args:
+        announcements (List[Any]): Announcements to evaluate
+        user_condition (str): User's filtering criteria in natural language
+        ai_choice (str): AI choice, e.g. 'openai-gpt-4o-mini'
+    
+    Returns:
+        AIBatchJob: The persisted job
+    
+    Raises:
+        BatchJobError: If the job could not be submitted
+    """
+    ai_platform, model_name = resolve_ai_choice(ai_choice)
+    chunks = build_announcement_chunks(announcements, model_name)
+    
+    prompts = []
+    composition = []
+    for chunk_idx, chunk in enumerate(chunks):
+        chunk_id = f"chunk-{chunk_idx + 1}"
+        prompts.append((chunk_id, build_filter_prompt(chunk, user_condition, chunk_id)))
+        composition.append({
+            'id': chunk_id,
+            'items': [[_get_serial_number(ann), _content_hash(ann)] for ann in chunk],
+        })
+    
+    provider_job_id = BATCH_BACKENDS[ai_platform]().submit(model_name, prompts)
+    job = AIBatchJob.objects.create(
+        provider=ai_platform,
+        model_name=model_name,
+        user_condition=user_condition,
+        provider_job_id=provider_job_id,
+        chunks=composition,
+    )
+    logger.info(f"Submitted {ai_platform} batch {provider_job_id} with {len(chunks)} chunks "
+                f"({len(announcements)} announcements)")
+    return job
+
+
+def poll_batch_job(job: AIBatchJob) -> AIBatchJob:
+    """
+    Check a submitted job and store its results once it has completed
+    
+    Args:
+        job (AIBatchJob): Job in the 'submitted' state
+    
+    Returns:
+        AIBatchJob: The updated job
+    """
+    status, results = BATCH_BACKENDS[job.provider]().poll(job.provider_job_id)
+    if status == 'submitted':
+        return job
+    
+    job.status = status
+    if status == 'completed':
+        job.results = results
+    else:
+        job.error = f"Batch {job.provider_job_id} ended without results"
+    job.save(update_fields=['status', 'results', 'error', 'updated_at'])
+    return job
+
+
+def ingest_batch_job(job: AIBatchJob) -> int:
+    """
+    Write the verdicts of a completed job into the verdict cache
+    
+    Safe to run more than once. The job's verdicts replace cached ones with the same key,
+    including expired entries that were not evicted yet.
+    
+    Args:
+        job (AIBatchJob): Job in the 'completed' or 'ingested' state
+    
+    Returns:
+        int: Number of verdicts derived from the job
+    """
+    results = job.results or {}
+    verdicts = {}
+    for chunk in job.chunks:
+        if chunk['id'] not in results:
+            continue
+        matched_serial_numbers = set(results[chunk['id']])
+        for serial_number, content_hash in chunk['items']:
+            if serial_number:
+                verdicts[(serial_number, content_hash)] = serial_number in matched_serial_numbers
+    
+    verdict_cache.store_verdicts(job.user_condition, job.model_name, verdicts)
+    
+    job.status = 'ingested'
+    job.ingested_at = timezone.now()
+    job.save(update_fields=['status', 'ingested_at', 'updated_at'])
+    logger.info(f"Ingested {len(verdicts)} verdicts from batch {job.provider_job_id} "
+                f"({len(results)}/{len(job.chunks)} chunks answered)")
+    return len(verdicts)
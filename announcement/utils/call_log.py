@@ -0,0 +1,92 @@
+import os
+import logging
+import threading
+from typing import List, Optional, Tuple
+
+from announcement.models import AICallLog
+
+logger = logging.getLogger(__name__)
+
+# Calls recorded by the worker threads, written by the request thread in flush_call_logs
+_pending: List[AICallLog] = []
+_pending_lock = threading.Lock()
+
+# Token usage reported by the last provider response of the current thread
+_usage = threading.local()
+
+
+def is_enabled() -> bool:
+    """Return whether AI calls are recorded (AI_CALL_LOG_ENABLED)"""
+    return os.environ.get('AI_CALL_LOG_ENABLED', 'true').lower() == 'true'
+
+
+def record_usage(prompt_tokens: Optional[int], completion_tokens: Optional[int]) -> None:
+    """
+    Remember the token usage reported by a provider response on the calling thread
+    
+    Args:
+        prompt_tokens (Optional[int]): Input tokens, None if not reported
+        completion_tokens (Optional[int]): Output tokens, None if not reported
+    """
+    _usage.tokens = (prompt_tokens, completion_tokens)
+
+
+def take_usage() -> Tuple[Optional[int], Optional[int]]:
+    """Return and clear the token usage recorded on the calling thread"""
+    tokens = getattr(_usage, 'tokens', (None, None))
+    _usage.tokens = (None, None)
+    return tokens
+
+
+def record_call(provider: str, model_name: str, condition_hash: str, chunk_size: int, latency_ms: float,
+                retries: int, outcome: str, matches: int = 0, error: str = '') -> None:
+    """
+    Queue the record of one provider call; the token usage is taken from the calling thread
+    
+    Records are only kept in memory here, since provider calls run on worker threads that
+    should not open database connections of their own.
+    """
+    prompt_tokens, completion_tokens = take_usage()
+    if not is_enabled():
+        return
+    
+    entry = AICallLog(
+        provider=provider,
+        model_name=model_name,
+        condition_hash=condition_hash,
+        chunk_size=chunk_size,
+        prompt_tokens=prompt_tokens,
+        completion_tokens=completion_tokens,
+        latency_ms=latency_ms,
+        retries=retries,
+        outcome=outcome,
+        matches=matches,
+        error=error[:1000],
+    )
+    with _pending_lock:
+        _pending.append(entry)
+
+
+def flush_call_logs() -> int:
+    """
+    Write the queued call records to the database
+    
+    Calls that finish after a flush, e.g. hedged calls that lost the race, are written by
+    the next flush.
+    
+    Returns:
+        int: Number of records written
+    """
+    with _pending_lock:
+        entries = _pending[:]
+        _pending.clear()
+    if not entries:
+        return 0
+    
+    try:
+        AICallLog.objects.bulk_create(entries, batch_size=500)
+    except Exception as e:
+        # Telemetry must never fail a search
+        logger.error(f"Failed to write {len(entries)} AI call records: {str(e)}")
+        return 0
+    return len(entries)
@@ -0,0 +1,88 @@
+import os
+import logging
+from typing import Any, List, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Input token budget per chunk for each model, leaving room for the system prompt and the response
+MODEL_TOKEN_BUDGETS = {
+    'gpt-4o-mini': 24000,
+    'gemini-1.5-flash-lite': 24000,
+    'gemini-2.0-flash-lite': 24000,
+}
+DEFAULT_TOKEN_BUDGET = 16000
+
+# Maximum number of announcements per chunk, which bounds the length of the returned serial number list
+DEFAULT_MAX_ITEMS = 100
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Roughly estimate the number of tokens of a text without a tokenizer
+    
+    Hangul and other non-ASCII characters take about one token each with the OpenAI and
+    Gemini tokenizers, while ASCII text averages about four characters per token.
+    
+    Args:
+        text (str): Text to estimate
+        
+    Returns:
+        int: Estimated token count (at least 1)
+    """
+    non_ascii = sum(1 for char in text if ord(char) > 127)
+    return max(1, non_ascii + (len(text) - non_ascii + 3) // 4)
+
+
+def get_chunk_limits(model_name: str) -> tuple:
+    """
+    Return the (token budget, max items) of a chunk for a model
+    
+    AI_CHUNK_TOKEN_BUDGET and AI_CHUNK_MAX_ITEMS override the defaults for every model.
+    
+    Args:
+        model_name (str): AI model name
+        
+    Returns:
+        tuple: (token_budget, max_items)
+    """
+    token_budget = MODEL_TOKEN_BUDGETS.get(model_name, DEFAULT_TOKEN_BUDGET)
+    try:
+        token_budget = max(1, int(os.environ.get('AI_CHUNK_TOKEN_BUDGET', token_budget)))
+    except (ValueError, TypeError):
+        logger.warning(f"Invalid AI_CHUNK_TOKEN_BUDGET value, using default of {token_budget}")
+    
+    max_items = DEFAULT_MAX_ITEMS
+    try:
+        max_items = max(1, int(os.environ.get('AI_CHUNK_MAX_ITEMS', DEFAULT_MAX_ITEMS)))
+    except (ValueError, TypeError):
+        logger.warning(f"Invalid AI_CHUNK_MAX_ITEMS value, using default of {DEFAULT_MAX_ITEMS}")
+    
+    return token_budget, max_items
+
+
+def build_chunks(items: Sequence[Any], token_counts: Sequence[int], token_budget: int, max_items: int) -> List[List[Any]]:
+    """
+    Pack items into consecutive chunks up to a token budget and an item count
+    
+    An item larger than the budget on its own gets a chunk of its own.
+    
+    Args:
+        items (Sequence[Any]): Items to pack, in order
+        token_counts (Sequence[int]): Estimated tokens of each item
+        token_budget (int): Maximum estimated tokens per chunk
+        max_items (int): Maximum number of items per chunk
+        
+    Returns:
+        List[List[Any]]: Chunks in input order
+    """
+    chunks = []
+    current, current_tokens = [], 0
+    for item, tokens in zip(items, token_counts):
+        if current and (current_tokens + tokens > token_budget or len(current) >= max_items):
+            chunks.append(current)
+            current, current_tokens = [], 0
+        current.append(item)
+        current_tokens += tokens
+    if current:
+        chunks.append(current)
+    return chunks
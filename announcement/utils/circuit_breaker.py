@@ -0,0 +1,118 @@
+import os
+import time
+import logging
+from typing import Any, Dict, Optional
+
+from .shared_state import default_state_path, locked_json_state
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class AIProviderUnavailableError(ValueError):
+    """
+    Raised without calling the provider while its circuit breaker is open
+    
+    A ValueError like a missing API key, so callers fall back to unfiltered results.
+    """
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker for one AI provider, shared by all worker processes
+    
+    Closed: calls go through and consecutive failures are counted. After failure_threshold
+    failures the circuit opens and calls fail fast. Once reset_timeout seconds have passed,
+    the circuit is half-open and a single probe call is let through: success closes the
+    circuit, failure opens it again. The state lives in a JSON file under a file lock.
+    """
+    
+    def __init__(self, name: str, state_path: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.state_path = state_path
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+    
+    def _provider_state(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        return state.setdefault(self.name, {'state': CLOSED, 'failures': 0, 'opened_at': None, 'probe_at': None})
+    
+    def allow_request(self) -> bool:
+        """
+        Return whether a call may be made now, reserving the probe when half-open
+        
+        Returns:
+            bool: False while the circuit is open or another process holds the probe
+        """
+        with locked_json_state(self.state_path) as state:
+            provider = self._provider_state(state)
+            now = time.time()
+            
+            if provider['state'] == CLOSED:
+                return True
+            
+            if provider['state'] == OPEN:
+                if now - provider['opened_at'] < self.reset_timeout:
+                    return False
+                provider['state'] = HALF_OPEN
+                provider['probe_at'] = None
+                logger.info(f"{self.name} 회로 차단기가 반개방 상태로 전환되었습니다")
+            
+            # Half-open: one probe at a time; a probe that never reported back is replaced
+            if provider['probe_at'] and now - provider['probe_at'] < self.reset_timeout:
+                return False
+            provider['probe_at'] = now
+            return True
+    
+    def record_success(self) -> None:
+        with locked_json_state(self.state_path) as state:
+            provider = self._provider_state(state)
+            if provider['state'] != CLOSED:
+                logger.info(f"{self.name} 회로 차단기가 닫혔습니다 (정상 응답)")
+            provider.update(state=CLOSED, failures=0, opened_at=None, probe_at=None)
+    
+    def record_failure(self) -> None:
+        with locked_json_state(self.state_path) as state:
+            provider = self._provider_state(state)
+            provider['failures'] += 1
+            
+            if provider['state'] == HALF_OPEN or provider['failures'] >= self.failure_threshold:
+                if provider['state'] != OPEN:
+                    logger.warning(f"{self.name} 회로 차단기가 열렸습니다 (연속 실패 {provider['failures']}회), "
+                                   f"{self.reset_timeout:.0f}초 동안 호출을 차단합니다")
+                provider.update(state=OPEN, opened_at=time.time(), probe_at=None)
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the current state, consecutive failures and when the circuit opened"""
+        with locked_json_state(self.state_path) as state:
+            return dict(self._provider_state(state))
+
+
+def get_circuit_breaker(name: str) -> Optional[CircuitBreaker]:
+    """
+    Build the circuit breaker of an AI provider configured from the environment
+    
+    Args:
+        name (str): Provider platform name
+        
+    Returns:
+        Optional[CircuitBreaker]: The breaker, or None if AI_CIRCUIT_BREAKER_ENABLED is false
+    """
+    if os.environ.get('AI_CIRCUIT_BREAKER_ENABLED', 'true').lower() != 'true':
+        return None
+    
+    def env_number(env_name, default, cast):
+        try:
+            return cast(os.environ.get(env_name, default))
+        except (ValueError, TypeError):
+            logger.warning(f"Invalid {env_name} value, using default of {default}")
+            return default
+    
+    return CircuitBreaker(
+        name=name,
+        state_path=os.environ.get('AI_CIRCUIT_BREAKER_STATE', default_state_path('ai_circuit_breaker.json')),
+        failure_threshold=env_number('AI_CIRCUIT_FAILURE_THRESHOLD', 5, int),
+        reset_timeout=env_number('AI_CIRCUIT_RESET_TIMEOUT', 60.0, float),
+    )
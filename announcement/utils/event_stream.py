@@ -0,0 +1,121 @@
+import os
+import json
+import time
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Dict, Iterator, List, Tuple
+
+from asgiref.sync import sync_to_async
+
+from announcement.models import PipelineJobEvent
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of events read per query
+EVENT_BATCH_SIZE = 100
+
+# Seconds between keep-alive comments, so proxies do not close an idle stream
+KEEP_ALIVE_INTERVAL = 15
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return max(0.1, float(os.environ.get(name, default)))
+    except (ValueError, TypeError):
+        logger.warning(f"Invalid {name} value, using default of {default}")
+        return default
+
+
+def get_stream_settings() -> Tuple[float, float]:
+    """
+    Return the event stream settings
+    
+    Returns:
+        Tuple[float, float]: (seconds between checks for new events (PIPELINE_EVENT_POLL_INTERVAL),
+        seconds before a stream is closed for the browser to reconnect (PIPELINE_EVENT_STREAM_TIMEOUT))
+    """
+    return (
+        _env_float('PIPELINE_EVENT_POLL_INTERVAL', 0.5),
+        _env_float('PIPELINE_EVENT_STREAM_TIMEOUT', 300),
+    )
+
+
+def format_event(event: PipelineJobEvent) -> str:
+    """Format an event as a server-sent event; the id lets a reconnecting browser resume after it"""
+    return f"id: {event.pk}\nevent: {event.kind}\ndata: {json.dumps(event.data, ensure_ascii=False)}\n\n"
+
+
+def format_final_status(status: Dict[str, Any]) -> str:
+    """Format the final status of a job whose events were already pruned as a 'finished' event"""
+    return f"event: finished\ndata: {json.dumps(status, ensure_ascii=False)}\n\n"
+
+
+def _fetch_events(job_id: int, last_event_id: int) -> List[PipelineJobEvent]:
+    return list(
+        PipelineJobEvent.objects.filter(job_id=job_id, pk__gt=last_event_id).order_by('id')[:EVENT_BATCH_SIZE]
+    )
+
+
+async def stream_job_events(job_id: int, last_event_id: int = 0) -> AsyncIterator[str]:
+    """
+    Yield the events of a job as server-sent events until the job has finished
+    
+    Waiting happens on the event loop, so under ASGI an open stream holds no thread; only the
+    short event queries run in the database thread.
+    
+    Args:
+        job_id (int): Pipeline job ID
+        last_event_id (int): ID of the last event the browser already received
+    
+    Yields:
+        str: Server-sent event messages and keep-alive comments
+    """
+    poll_interval, timeout = get_stream_settings()
+    started_at = last_sent_at = time.monotonic()
+    fetch_events = sync_to_async(_fetch_events)
+    
+    while True:
+        events = await fetch_events(job_id, last_event_id)
+        for event in events:
+            last_event_id = event.pk
+            yield format_event(event)
+            if event.kind == 'finished':
+                return
+        if events:
+            last_sent_at = time.monotonic()
+            continue
+        
+        now = time.monotonic()
+        if now - started_at >= timeout:
+            return
+        if now - last_sent_at >= KEEP_ALIVE_INTERVAL:
+            last_sent_at = now
+            yield ": keep-alive\n\n"
+        await asyncio.sleep(poll_interval)
+
+
+def stream_job_events_sync(job_id: int, last_event_id: int = 0) -> Iterator[str]:
+    """
+    Same as stream_job_events for WSGI servers, where each open stream holds a worker thread
+    """
+    poll_interval, timeout = get_stream_settings()
+    started_at = last_sent_at = time.monotonic()
+    
+    while True:
+        events = _fetch_events(job_id, last_event_id)
+        for event in events:
+            last_event_id = event.pk
+            yield format_event(event)
+            if event.kind == 'finished':
+                return
+        if events:
+            last_sent_at = time.monotonic()
+            continue
+        
+        now = time.monotonic()
+        if now - started_at >= timeout:
+            return
+        if now - last_sent_at >= KEEP_ALIVE_INTERVAL:
+            last_sent_at = now
+            yield ": keep-alive\n\n"
+        time.sleep(poll_interval)
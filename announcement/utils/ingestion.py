@@ -0,0 +1,112 @@
+import os
+import logging
+from typing import Iterable, List, Set
+
+from django.db import transaction
+
+from announcement.models import AnnouncementNew
+from .records import AnnouncementRecord
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of serial numbers per pk IN (...) query, well below the bind parameter limits
+LOOKUP_BATCH_SIZE = 1000
+
+
+def get_insert_batch_size() -> int:
+    """Return the number of rows per INSERT statement (ANNOUNCEMENT_INSERT_BATCH_SIZE)"""
+    try:
+        return max(1, int(os.environ.get('ANNOUNCEMENT_INSERT_BATCH_SIZE', 500)))
+    except (ValueError, TypeError):
+        logger.warning("Invalid ANNOUNCEMENT_INSERT_BATCH_SIZE value, using default of 500")
+        return 500
+
+
+def find_stored_serial_numbers(serial_numbers: Iterable[str]) -> Set[str]:
+    """
+    Return which of the given serial numbers are already stored as AnnouncementNew rows
+    
+    Args:
+        serial_numbers (Iterable[str]): Serial numbers to look up
+    
+    Returns:
+        Set[str]: The stored serial numbers, resolved with one query per LOOKUP_BATCH_SIZE numbers
+    """
+    unique_serial_numbers = list(dict.fromkeys(sn for sn in serial_numbers if sn))
+    stored = set()
+    for start in range(0, len(unique_serial_numbers), LOOKUP_BATCH_SIZE):
+        stored.update(
+            AnnouncementNew.objects.filter(pk__in=unique_serial_numbers[start:start + LOOKUP_BATCH_SIZE])
+            .values_list('pk', flat=True)
+        )
+    return stored
+
+
+def exclude_known_items(items: List[AnnouncementRecord], seen_serial_numbers: Set[str]) -> List[AnnouncementRecord]:
+    """
+    Return the items whose serial number is not yet stored in the DB nor seen earlier in this crawl
+    
+    Args:
+        items (List[AnnouncementRecord]): Records of one page or batch
+        seen_serial_numbers (Set[str]): Serial numbers seen so far, updated in place
+    
+    Returns:
+        List[AnnouncementRecord]: New records, without duplicates
+    """
+    candidates = [item for item in items if item.pbanc_sn and item.pbanc_sn not in seen_serial_numbers]
+    if not candidates:
+        return []
+    
+    stored_serial_numbers = find_stored_serial_numbers(item.pbanc_sn for item in candidates)
+    
+    new_items = []
+    for item in candidates:
+        if item.pbanc_sn in seen_serial_numbers:
+            continue
+        seen_serial_numbers.add(item.pbanc_sn)
+        if item.pbanc_sn not in stored_serial_numbers:
+            new_items.append(item)
+    return new_items
+
+
+def save_announcements(items: List[AnnouncementRecord]) -> List[AnnouncementNew]:
+    """
+    Insert announcement records as AnnouncementNew rows in batched INSERT statements
+    
+    Rows that already exist, e.g. saved meanwhile by another worker, are skipped by the
+    database instead of failing the batch; the existing row and its user status are kept.
+    The database does not report which rows it skipped, so the stored rows are read back
+    and only those carrying the creation time of this insert count as saved.
+    
+    Args:
+        items (List[AnnouncementRecord]): Records to save; dates are already parsed
+    
+    Returns:
+        List[AnnouncementNew]: Instances actually inserted, in input order
+    """
+    announcements = {}
+    for item in items:
+        if item.pbanc_sn and item.pbanc_sn not in announcements:
+            announcements[item.pbanc_sn] = AnnouncementNew(**item.to_model_kwargs())
+    if not announcements:
+        return []
+    
+    with transaction.atomic():
+        AnnouncementNew.objects.bulk_create(
+            announcements.values(), batch_size=get_insert_batch_size(), ignore_conflicts=True
+        )
+        
+        # bulk_create set created_at on every instance; skipped rows keep their own
+        serial_numbers = list(announcements)
+        inserted = set()
+        for start in range(0, len(serial_numbers), LOOKUP_BATCH_SIZE):
+            for serial_number, created_at in (
+                AnnouncementNew.objects.filter(pk__in=serial_numbers[start:start + LOOKUP_BATCH_SIZE])
+                .values_list('pk', 'created_at')
+            ):
+                if created_at == announcements[serial_number].created_at:
+                    inserted.add(serial_number)
+    
+    if len(inserted) < len(announcements):
+        logger.info(f"Skipped {len(announcements) - len(inserted)} announcements that were already stored")
+    return [announcement for serial_number, announcement in announcements.items() if serial_number in inserted]
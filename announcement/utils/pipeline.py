@@ -0,0 +1,308 @@
+import os
+import logging
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
+
+from django.db import transaction
+from django.utils import timezone
+
+from announcement.models import PipelineJob, PipelineJobEvent
+from .api_client import PublicDataAPIClient, PublicDataAPIError
+from .ai_utils import call_ai_model_for_filtering
+from . import announcement_store, verdict_cache
+from .circuit_breaker import AIProviderUnavailableError
+from .ingestion import exclude_known_items, save_announcements
+from .records import AnnouncementRecord
+
+logger = logging.getLogger(__name__)
+
+# Number of new announcements collected from the page stream before they are filtered and saved
+PIPELINE_BATCH_SIZE = 150
+
+
+def get_stale_after() -> int:
+    """Return after how many seconds without progress a running job is considered abandoned (PIPELINE_JOB_STALE_SECONDS)"""
+    try:
+        return max(60, int(os.environ.get('PIPELINE_JOB_STALE_SECONDS', 900)))
+    except (ValueError, TypeError):
+        logger.warning("Invalid PIPELINE_JOB_STALE_SECONDS value, using default of 900")
+        return 900
+
+
+def get_event_retention() -> timedelta:
+    """Return how long the progress events of a finished job are kept (PIPELINE_EVENT_RETENTION_MINUTES)"""
+    try:
+        minutes = max(1, int(os.environ.get('PIPELINE_EVENT_RETENTION_MINUTES', 60)))
+    except (ValueError, TypeError):
+        logger.warning("Invalid PIPELINE_EVENT_RETENTION_MINUTES value, using default of 60")
+        minutes = 60
+    return timedelta(minutes=minutes)
+
+
+def enqueue_pipeline_job(user_condition: str, ai_choice: str, region: str = '',
+                         startup_period: str = '', target_age: str = '') -> PipelineJob:
+    """
+    Queue a pipeline run for a worker to pick up
+    
+    Returns:
+        PipelineJob: The queued job
+    """
+    return PipelineJob.objects.create(
+        user_condition=user_condition,
+        ai_choice=ai_choice,
+        region=region,
+        startup_period=startup_period,
+        target_age=target_age,
+    )
+
+
+def claim_next_job(worker_name: str) -> Optional[PipelineJob]:
+    """
+    Claim the oldest queued job for this worker
+    
+    The row is locked with SELECT ... FOR UPDATE SKIP LOCKED, so concurrent workers each get
+    a different job without waiting on one another. The status is also checked in the UPDATE
+    so the claim stays exclusive on backends without row locks.
+    
+    Returns:
+        Optional[PipelineJob]: The claimed job, or None if the queue is empty
+    """
+    with transaction.atomic():
+        job = (PipelineJob.objects.select_for_update(skip_locked=True)
+               .filter(status='queued').order_by('created_at').first())
+        if job is None:
+            return None
+        
+        now = timezone.now()
+        claimed = PipelineJob.objects.filter(pk=job.pk, status='queued').update(
+            status='running', stage='fetching', worker=worker_name, attempts=job.attempts + 1,
+            started_at=now, updated_at=now,
+        )
+        if not claimed:
+            return None
+    
+    job.refresh_from_db()
+    return job
+
+
+def requeue_stale_jobs(max_attempts: int = 3) -> int:
+    """
+    Put running jobs whose worker stopped reporting progress back in the queue
+    
+    Jobs that were already attempted max_attempts times are marked as failed instead.
+    
+    Returns:
+        int: Number of jobs requeued or failed
+    """
+    stale_before = timezone.now() - timedelta(seconds=get_stale_after())
+    stale_jobs = PipelineJob.objects.filter(status='running', updated_at__lt=stale_before)
+    failed = stale_jobs.filter(attempts__gte=max_attempts).update(
+        status='failed', error="워커가 응답하지 않아 작업이 중단되었습니다.", finished_at=timezone.now(),
+    )
+    requeued = stale_jobs.update(status='queued', stage='queued', worker='')
+    if failed or requeued:
+        logger.warning(f"Requeued {requeued} and failed {failed} stale pipeline jobs")
+    return failed + requeued
+
+
+def prune_job_events() -> int:
+    """
+    Delete the progress events of jobs that finished longer ago than the retention period
+    
+    Streams of finished jobs without events report the job's final state right away, so
+    browsers reconnecting later still get the result.
+    
+    Returns:
+        int: Number of deleted events
+    """
+    cutoff = timezone.now() - get_event_retention()
+    deleted, _ = PipelineJobEvent.objects.filter(job__finished_at__lt=cutoff).delete()
+    if deleted:
+        logger.info(f"Pruned {deleted} pipeline job events")
+    return deleted
+
+
+def run_pipeline_job(job: PipelineJob) -> PipelineJob:
+    """
+    Fetch new announcements, filter them with AI and save the matches, recording progress on the job
+    
+    Pages are streamed from the public data portal and processed in batches of
+    PIPELINE_BATCH_SIZE, so filtering and saving of early pages overlaps with fetching later ones.
+    While the local store has been synced recently (see announcement_store), the pages are
+    read from it instead of the portal. Each step is also recorded as a PipelineJobEvent for
+    the job's event stream.
+    
+    Args:
+        job (PipelineJob): A claimed job
+    
+    Returns:
+        PipelineJob: The finished job
+    """
+    # A retried job starts over; announcements saved by the earlier attempt are skipped as known
+    job.pages_fetched = job.total_count = job.new_count = job.processed_count = job.filtered_count = 0
+    job.saved_serial_numbers = []
+    job.warnings = []
+    job.events.all().delete()
+    use_store = announcement_store.is_store_fresh()
+    emit_event(job, 'started', source='store' if use_store else 'portal')
+    
+    try:
+        if use_store:
+            # Read announcements synced by sync_announcements instead of crawling the portal
+            pages = announcement_store.iter_store_pages(job.region, job.startup_period, job.target_age)
+        else:
+            api_client = PublicDataAPIClient()
+            pages = api_client.iter_announcement_pages(
+                page=1,
+                per_page=50,
+                region=job.region,
+                startup_period=job.startup_period,
+                target_age=job.target_age,
+                # Only matches of this condition are saved, so incremental crawls are tracked per condition
+                sync_scope=f"{job.ai_choice}:{verdict_cache.hash_condition(job.user_condition)}",
+            )
+        
+        seen_serial_numbers = set()
+        pending_items = []
+        state = {'use_ai': bool(job.user_condition), 'streamed': set()}
+        
+        for page_items in pages:
+            job.pages_fetched += 1
+            job.total_count += len(page_items)
+            
+            # Keep only announcements that are neither stored nor already seen in this crawl
+            new_items = exclude_known_items(page_items, seen_serial_numbers)
+            job.new_count += len(new_items)
+            pending_items.extend(new_items)
+            _save_progress(job, 'fetching')
+            emit_event(job, 'page', pages_fetched=job.pages_fetched, total_count=job.total_count,
+                       new_count=job.new_count)
+            
+            if len(pending_items) >= PIPELINE_BATCH_SIZE:
+                _filter_and_save_batch(job, pending_items, state)
+                pending_items = []
+        
+        if pending_items:
+            _filter_and_save_batch(job, pending_items, state)
+        
+        job.status = 'completed'
+    except PublicDataAPIError as e:
+        logger.error("Public data API error: %s", str(e))
+        job.status = 'failed'
+        job.error = "API에서 데이터를 가져오지 못했습니다. 나중에 다시 시도해 주세요."
+    except Exception as e:
+        logger.exception("Error in pipeline job %s: %s", job.pk, str(e))
+        job.status = 'failed'
+        job.error = f"오류가 발생했습니다: {str(e)}"
+    
+    job.finished_at = timezone.now()
+    _save_progress(job, 'done')
+    emit_event(job, 'finished', **job_status(job))
+    logger.info(f"Pipeline job {job.pk} {job.status}: {job.total_count} fetched, {job.new_count} new, "
+                f"{job.filtered_count} saved")
+    return job
+
+
+def job_status(job: PipelineJob) -> Dict[str, Any]:
+    """
+    Return the status of a job as a JSON-serializable dictionary
+    """
+    return {
+        'id': job.pk,
+        'status': job.status,
+        'status_display': job.get_status_display(),
+        'stage': job.stage,
+        'stage_display': job.get_stage_display(),
+        'pages_fetched': job.pages_fetched,
+        'total_count': job.total_count,
+        'new_count': job.new_count,
+        'processed_count': job.processed_count,
+        'filtered_count': job.filtered_count,
+        'warnings': job.warnings,
+        'error': job.error,
+        'is_finished': job.is_finished,
+        'created_at': job.created_at.isoformat(),
+        'started_at': job.started_at.isoformat() if job.started_at else None,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+
+def emit_event(job: PipelineJob, kind: str, **data) -> PipelineJobEvent:
+    """Record a progress event of a job for its event stream"""
+    return PipelineJobEvent.objects.create(job=job, kind=kind, data=data)
+
+
+def summarize_announcement(item: AnnouncementRecord) -> Dict[str, str]:
+    """Return the fields of an announcement shown in the live result list"""
+    return {
+        'pbanc_sn': item.pbanc_sn,
+        'biz_pbanc_nm': item.biz_pbanc_nm,
+        'pbanc_rcpt_bgng_dt': item.pbanc_rcpt_bgng_dt.isoformat() if item.pbanc_rcpt_bgng_dt else '',
+        'pbanc_rcpt_end_dt': item.pbanc_rcpt_end_dt.isoformat() if item.pbanc_rcpt_end_dt else '',
+        'detl_pg_url': item.detl_pg_url,
+    }
+
+
+def _filter_and_save_batch(job: PipelineJob, items: List[AnnouncementRecord], state: Dict[str, Any]) -> None:
+    """
+    Apply AI filtering to a batch of new items and save the matches
+    
+    state['use_ai'] is turned off when AI filtering is unavailable, so the following batches
+    are saved unfiltered. Announcements whose chunks got no answer while others did are
+    saved unfiltered as well, rather than the whole batch. state['streamed'] holds the serial numbers already sent to the
+    browser, so a match is streamed once, as soon as its chunk is answered.
+    """
+    def on_chunk_result(matches: List[AnnouncementRecord], finished_chunks: int, total_chunks: int) -> None:
+        # Heartbeat, so a batch with slow chunks is not taken for an abandoned job and requeued
+        PipelineJob.objects.filter(pk=job.pk).update(updated_at=timezone.now())
+        new_matches = [item for item in matches if item.pbanc_sn not in state['streamed']]
+        state['streamed'].update(item.pbanc_sn for item in new_matches)
+        emit_event(job, 'chunk', chunk=finished_chunks, chunks=total_chunks,
+                   announcements=[summarize_announcement(item) for item in new_matches])
+    
+    if state['use_ai']:
+        _save_progress(job, 'filtering')
+        emit_event(job, 'filtering', items=len(items))
+        unanswered = []
+        try:
+            filtered_items, _ = call_ai_model_for_filtering(items, job.user_condition, job.ai_choice, on_chunk_result,
+                                                            unanswered)
+            if unanswered:
+                # Keep announcements without a verdict rather than dropping possible matches
+                filtered_items = filtered_items + unanswered
+                warning = "AI 응답을 받지 못한 일부 공고는 필터링 없이 표시합니다."
+                if warning not in job.warnings:
+                    job.warnings.append(warning)
+        except AIProviderUnavailableError as e:
+            # AI providers keep failing; save the announcements unfiltered instead of waiting
+            logger.warning(f"AI filtering skipped: {str(e)}")
+            job.warnings.append("AI 서비스가 일시적으로 응답하지 않아 필터링 없이 공고를 표시합니다. 잠시 후 다시 시도해 주세요.")
+            state['use_ai'] = False
+        except ValueError:
+            # This is caught when API key is missing
+            ai_platform = job.ai_choice.split('-')[0].upper()
+            job.warnings.append(f"{ai_platform}_API_KEY가 설정되지 않았습니다. .env 파일에 API 키를 추가해 주세요.")
+            state['use_ai'] = False
+    
+    if not state['use_ai']:
+        # If no filtering condition (or no AI available), use all new announcements
+        filtered_items = items
+    
+    _save_progress(job, 'saving')
+    saved = save_announcements(filtered_items)
+    job.processed_count += len(items)
+    job.filtered_count += len(saved)
+    job.saved_serial_numbers.extend(ann.pbanc_sn for ann in saved)
+    _save_progress(job, 'fetching')
+    
+    # Unfiltered batches were not streamed by chunk, so their announcements go with this event
+    unstreamed = [item for item in filtered_items if item.pbanc_sn and item.pbanc_sn not in state['streamed']]
+    state['streamed'].update(item.pbanc_sn for item in unstreamed)
+    emit_event(job, 'saved', saved=len(saved), filtered_count=job.filtered_count, processed_count=job.processed_count,
+               announcements=[summarize_announcement(item) for item in unstreamed])
+
+
+def _save_progress(job: PipelineJob, stage: str) -> None:
+    """Record the current stage and counters of a job; this also serves as the worker heartbeat"""
+    job.stage = stage
+    job.save()
@@ -0,0 +1,168 @@
+import os
+import re
+import logging
+import unicodedata
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+from scipy import sparse
+
+logger = logging.getLogger(__name__)
+
+# Fields of the AI announcement text that are scored against the user condition
+DOCUMENT_FIELDS = ('title', 'content', 'target', 'region', 'organization')
+
+# Character n-gram sizes; Korean words carry particles and compounds, so whole-word tokens match poorly
+NGRAM_SIZES = (2, 3)
+
+# BM25 parameters
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+_WORD_RE = re.compile(r'\w+')
+
+
+def get_settings() -> Dict[str, Any]:
+    """
+    Read the pre-filter cut-offs from the environment
+    
+    Returns:
+        Dict[str, Any]: 'top_k' (0 means no limit) and 'min_score'
+    """
+    try:
+        top_k = max(0, int(os.environ.get('AI_PREFILTER_TOP_K', 0)))
+    except (ValueError, TypeError):
+        logger.warning("Invalid AI_PREFILTER_TOP_K value, using default of 0")
+        top_k = 0
+    
+    try:
+        min_score = float(os.environ.get('AI_PREFILTER_MIN_SCORE', 0.0))
+    except (ValueError, TypeError):
+        logger.warning("Invalid AI_PREFILTER_MIN_SCORE value, using default of 0.0")
+        min_score = 0.0
+    
+    return {'top_k': top_k, 'min_score': min_score}
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into character n-grams of every word
+    
+    Words shorter than the smallest n-gram are kept whole.
+    
+    Args:
+        text (str): Text to tokenize
+        
+    Returns:
+        List[str]: Tokens in order of appearance
+    """
+    tokens = []
+    min_size = min(NGRAM_SIZES)
+    for word in _WORD_RE.findall(unicodedata.normalize('NFC', text or '').lower()):
+        if len(word) < min_size:
+            tokens.append(word)
+            continue
+        for size in NGRAM_SIZES:
+            tokens.extend(word[i:i + size] for i in range(len(word) - size + 1))
+    return tokens
+
+
+def bm25_scores(documents: Sequence[str], query: str) -> np.ndarray:
+    """
+    Score documents against a query with BM25
+    
+    Only the query terms are counted, into a sparse (documents x query terms) matrix,
+    and the BM25 weights are computed on its non-zero entries.
+    
+    Args:
+        documents (Sequence[str]): Documents to score
+        query (str): Query text
+        
+    Returns:
+        np.ndarray: Score of each document, in input order
+    """
+    scores = np.zeros(len(documents))
+    term_columns = {term: column for column, term in enumerate(sorted(set(tokenize(query))))}
+    if not documents or not term_columns:
+        return scores
+    
+    rows, columns = [], []
+    doc_lengths = np.empty(len(documents))
+    for doc_idx, document in enumerate(documents):
+        tokens = tokenize(document)
+        doc_lengths[doc_idx] = len(tokens)
+        for token in tokens:
+            column = term_columns.get(token)
+            if column is not None:
+                rows.append(doc_idx)
+                columns.append(column)
+    
+    if not rows:
+        return scores
+    
+    # Duplicate (row, column) pairs are summed into term frequencies
+    term_freqs = sparse.csr_matrix(
+        (np.ones(len(rows)), (rows, columns)), shape=(len(documents), len(term_columns))
+    )
+    term_freqs.sum_duplicates()
+    
+    doc_freqs = np.bincount(term_freqs.indices, minlength=len(term_columns))
+    idf = np.log1p((len(documents) - doc_freqs + 0.5) / (doc_freqs + 0.5))
+    length_norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_lengths / (doc_lengths.mean() or 1.0))
+    
+    entry_rows = np.repeat(np.arange(len(documents)), np.diff(term_freqs.indptr))
+    tf = term_freqs.data
+    term_freqs.data = idf[term_freqs.indices] * tf * (BM25_K1 + 1) / (tf + length_norm[entry_rows])
+    return np.asarray(term_freqs.sum(axis=1)).ravel()
+
+
+def select_candidates(scores: np.ndarray, top_k: int = 0, min_score: float = 0.0) -> List[int]:
+    """
+    Pick the indices of the documents that should go to the AI model
+    
+    Args:
+        scores (np.ndarray): BM25 score of each document
+        top_k (int): Keep at most this many best-scoring documents (0 means no limit)
+        min_score (float): Drop documents scoring at or below this value
+        
+    Returns:
+        List[int]: Kept indices in input order
+    """
+    keep = scores > min_score
+    if top_k and np.count_nonzero(keep) > top_k:
+        ranked = np.argsort(-scores, kind='stable')[:top_k]
+        top_mask = np.zeros(len(scores), dtype=bool)
+        top_mask[ranked] = True
+        keep &= top_mask
+    return np.flatnonzero(keep).tolist()
+
+
+def prefilter_announcements(announcements: List[Any], user_condition: str,
+                            text_fn: Callable[[Any], Dict[str, Any]],
+                            top_k: Optional[int] = None, min_score: Optional[float] = None) -> List[Any]:
+    """
+    Drop announcements that lexically cannot match the user condition
+    
+    Args:
+        announcements (List[Any]): Announcements to rank
+        user_condition (str): User's filtering criteria in natural language
+        text_fn (Callable): Returns the AI announcement text (dict) of an announcement
+        top_k (Optional[int]): Overrides AI_PREFILTER_TOP_K
+        min_score (Optional[float]): Overrides AI_PREFILTER_MIN_SCORE
+        
+    Returns:
+        List[Any]: Announcements to send to the AI model, in input order
+    """
+    settings = get_settings()
+    top_k = settings['top_k'] if top_k is None else top_k
+    min_score = settings['min_score'] if min_score is None else min_score
+    
+    documents = [
+        ' '.join(str(text.get(field) or '') for field in DOCUMENT_FIELDS)
+        for text in map(text_fn, announcements)
+    ]
+    kept = select_candidates(bm25_scores(documents, user_condition), top_k, min_score)
+    
+    logger.info(f"Pre-filter kept {len(kept)} of {len(announcements)} announcements "
+                f"(top_k={top_k or 'all'}, min_score={min_score})")
+    return [announcements[i] for i in kept]
@@ -0,0 +1,137 @@
+import os
+import json
+import logging
+from typing import Any, Dict, List
+
+from .chunking import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# Short keys used in the compact encoding, in output order
+COMPACT_KEYS = {
+    'pbanc_sn': 'sn',
+    'title': 't',
+    'content': 'c',
+    'target': 'tg',
+    'start_date': 's',
+    'end_date': 'e',
+    'region': 'r',
+    'organization': 'o',
+}
+
+# Explains the short keys to the model; sent once per prompt
+LEGEND = (
+    "Each announcement uses short keys: sn=pbanc_sn (serial number), t=title, c=content, "
+    "tg=target, s=start_date, e=end_date, r=region, o=organization. Missing keys are empty."
+)
+
+# Default character caps per field; 0 means no cap
+DEFAULT_FIELD_CAPS = {
+    'title': 200,
+    'content': 400,
+    'target': 200,
+}
+
+
+def get_encoding() -> str:
+    """
+    Return the prompt encoding, 'verbose' or 'compact' (AI_PROMPT_ENCODING)
+    
+    Verbose is the default since the compact encoding cuts long fields, which changes what
+    the model sees; compact is opt-in once AI_PROMPT_MEASURE and the verdicts were checked.
+    """
+    encoding = os.environ.get('AI_PROMPT_ENCODING', 'verbose').lower()
+    if encoding not in ('compact', 'verbose'):
+        logger.warning(f"Unknown AI_PROMPT_ENCODING '{encoding}', using verbose")
+        return 'verbose'
+    return encoding
+
+
+def get_field_caps() -> Dict[str, int]:
+    """
+    Return the character cap of each field
+    
+    AI_PROMPT_FIELD_CAPS overrides the defaults, e.g. "content=300,target=150".
+    
+    Returns:
+        Dict[str, int]: Cap per field name of the announcement text
+    """
+    caps = dict(DEFAULT_FIELD_CAPS)
+    for entry in os.environ.get('AI_PROMPT_FIELD_CAPS', '').split(','):
+        if not entry.strip():
+            continue
+        try:
+            field, cap = entry.split('=', 1)
+            caps[field.strip()] = max(0, int(cap))
+        except ValueError:
+            logger.warning(f"Invalid AI_PROMPT_FIELD_CAPS entry '{entry}', ignoring")
+    return caps
+
+
+def compact_item(text: Dict[str, Any], field_caps: Dict[str, int]) -> Dict[str, Any]:
+    """
+    Project an announcement text onto short keys
+    
+    Empty fields are dropped, content is dropped when it only repeats the target, and
+    capped fields are cut to their first N characters.
+    
+    Args:
+        text (Dict[str, Any]): Announcement text from _create_announcement_text
+        field_caps (Dict[str, int]): Character cap per field
+        
+    Returns:
+        Dict[str, Any]: Compact announcement
+    """
+    item = {}
+    for field, key in COMPACT_KEYS.items():
+        value = text.get(field)
+        if not value:
+            continue
+        if field == 'content' and value == text.get('target'):
+            continue
+        cap = field_caps.get(field, 0)
+        if cap and isinstance(value, str) and len(value) > cap:
+            value = value[:cap] + '…'
+        item[key] = value
+    return item
+
+
+def serialize_item(text: Dict[str, Any], encoding: str, field_caps: Dict[str, int]) -> str:
+    """Serialize one announcement text the way encode_announcements does"""
+    if encoding == 'verbose':
+        return json.dumps(text, ensure_ascii=False, indent=2)
+    return json.dumps(compact_item(text, field_caps), ensure_ascii=False, separators=(',', ':'))
+
+
+def encode_announcements(texts: List[Dict[str, Any]], chunk_label: str = '') -> str:
+    """
+    Encode announcement texts for the prompt
+    
+    With AI_PROMPT_MEASURE=true the estimated tokens of the verbose and compact encodings
+    of the chunk are logged, whichever encoding is used.
+    
+    Args:
+        texts (List[Dict[str, Any]]): Announcement texts from _create_announcement_text
+        chunk_label (str): Chunk label for the measurement log
+        
+    Returns:
+        str: Announcements section of the prompt
+    """
+    encoding = get_encoding()
+    measure = os.environ.get('AI_PROMPT_MEASURE', 'false').lower() == 'true'
+    verbose = json.dumps(texts, ensure_ascii=False, indent=2)
+    if encoding == 'verbose' and not measure:
+        return verbose
+    
+    field_caps = get_field_caps()
+    compact = LEGEND + "\n" + json.dumps(
+        [compact_item(text, field_caps) for text in texts], ensure_ascii=False, separators=(',', ':')
+    )
+    
+    if measure:
+        verbose_tokens = estimate_tokens(verbose)
+        compact_tokens = estimate_tokens(compact)
+        saved = verbose_tokens - compact_tokens
+        logger.info(f"Prompt tokens for chunk {chunk_label}: verbose ~{verbose_tokens}, compact ~{compact_tokens}, "
+                    f"saved ~{saved} ({saved / max(verbose_tokens, 1):.0%})")
+    return verbose if encoding == 'verbose' else compact
@@ -0,0 +1,188 @@
+import os
+import time
+import bisect
+import logging
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Deque, Dict, List, NamedTuple, Optional, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+# Upper bounds (seconds) of the latency histogram buckets; the last bucket is open-ended
+LATENCY_BUCKETS = (0.5, 1, 2, 5, 10, 20, 30, 60)
+
+
+class ProviderRoute(NamedTuple):
+    """AI provider platform and model a chunk can be sent to"""
+    platform: str
+    model_name: str
+    
+    def __str__(self):
+        return f"{self.platform}/{self.model_name}"
+
+
+class LatencyHistogram:
+    """
+    Latencies of successful calls to one route
+    
+    Keeps bucket counts over the process lifetime and a window of recent samples used for
+    percentiles, so the hedge threshold follows the provider's current behaviour.
+    """
+    
+    def __init__(self, max_samples: int = 500):
+        self._samples: Deque[float] = deque(maxlen=max_samples)
+        self._buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self._lock = threading.Lock()
+    
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+            self._buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+    
+    def __len__(self) -> int:
+        return len(self._samples)
+    
+    def percentile(self, percent: float) -> Optional[float]:
+        """
+        Return the latency below which the given percentage of recent calls finished
+        
+        Args:
+            percent (float): Percentile between 0 and 100
+            
+        Returns:
+            Optional[float]: Latency in seconds, or None without samples
+        """
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        index = min(len(samples) - 1, max(0, int(round(percent / 100 * len(samples))) - 1))
+        return samples[index]
+    
+    def summary(self) -> str:
+        """Return the sample count, p50/p95 and bucket counts as one log line"""
+        with self._lock:
+            buckets = list(self._buckets)
+        if not len(self):
+            return "no samples"
+        labels = [f"<={bound}s" for bound in LATENCY_BUCKETS] + [f">{LATENCY_BUCKETS[-1]}s"]
+        counts = ', '.join(f"{label}: {count}" for label, count in zip(labels, buckets) if count)
+        return f"n={len(self)}, p50 {self.percentile(50):.2f}s, p95 {self.percentile(95):.2f}s ({counts})"
+
+
+class ProviderRouter:
+    """
+    Sends a call to an ordered list of routes with hedging and fallback
+    
+    The first route is tried first. If it has not answered within the configured percentile
+    of its recent latencies (AI_HEDGE_PERCENTILE, once AI_HEDGE_MIN_SAMPLES calls have been
+    seen, AI_HEDGE_DEFAULT_DELAY before that), the next route is started as a hedge and the
+    first answer wins. If a route fails, the next one is started right away
+    (AI_FALLBACK_ENABLED). Calls that lose a race keep running in the background and only
+    feed the histograms.
+    """
+    
+    def __init__(self, max_workers: int = 16):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='ai-route')
+        self._histograms: Dict[ProviderRoute, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+    
+    def histogram(self, route: ProviderRoute) -> LatencyHistogram:
+        with self._lock:
+            if route not in self._histograms:
+                self._histograms[route] = LatencyHistogram()
+            return self._histograms[route]
+    
+    def histograms(self) -> Dict[ProviderRoute, LatencyHistogram]:
+        with self._lock:
+            return dict(self._histograms)
+    
+    def hedge_delay(self, route: ProviderRoute) -> Optional[float]:
+        """
+        Return how long to wait for a route before hedging, or None if hedging is disabled
+        
+        Args:
+            route (ProviderRoute): Route of the call in flight
+            
+        Returns:
+            Optional[float]: Delay in seconds
+        """
+        if os.environ.get('AI_HEDGE_ENABLED', 'false').lower() != 'true':
+            return None
+        
+        try:
+            percent = float(os.environ.get('AI_HEDGE_PERCENTILE', 95))
+            min_samples = int(os.environ.get('AI_HEDGE_MIN_SAMPLES', 20))
+            default_delay = float(os.environ.get('AI_HEDGE_DEFAULT_DELAY', 15))
+        except (ValueError, TypeError):
+            logger.warning("Invalid AI_HEDGE_* value, using defaults of 95 / 20 / 15")
+            percent, min_samples, default_delay = 95.0, 20, 15.0
+        
+        histogram = self.histogram(route)
+        if len(histogram) < min_samples:
+            return default_delay
+        return histogram.percentile(percent)
+    
+    def call(self, routes: List[ProviderRoute], call: Callable[[ProviderRoute], T]) -> Tuple[T, ProviderRoute]:
+        """
+        Run call(route) on the routes in order until one succeeds
+        
+        Args:
+            routes (List[ProviderRoute]): Routes to try, preferred first
+            call (Callable): Performs the request for a route
+            
+        Returns:
+            Tuple[T, ProviderRoute]: Result of the first successful call and its route
+            
+        Raises:
+            Exception: The error of the failed calls if no route succeeded; a provider error
+                is preferred over a missing-key ValueError
+        """
+        fallback_enabled = os.environ.get('AI_FALLBACK_ENABLED', 'true').lower() == 'true'
+        remaining = list(routes)
+        pending: Dict[Future, ProviderRoute] = {}
+        errors: List[Exception] = []
+        first_started_at = time.perf_counter()
+        
+        def launch() -> None:
+            route = remaining.pop(0)
+            started_at = time.perf_counter()
+            future = self._executor.submit(call, route)
+            future.add_done_callback(lambda f: self._record(route, started_at, f))
+            pending[future] = route
+        
+        launch()
+        hedge_delay = self.hedge_delay(routes[0])
+        while pending:
+            timeout = None
+            if remaining and hedge_delay is not None:
+                timeout = max(0.0, first_started_at + hedge_delay - time.perf_counter())
+            
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                logger.info(f"{routes[0]} has not answered within {hedge_delay:.2f}s, hedging with {remaining[0]}")
+                launch()
+                hedge_delay = None  # Hedge only once
+                continue
+            
+            for future in done:
+                route = pending.pop(future)
+                try:
+                    return future.result(), route
+                except Exception as e:
+                    logger.warning(f"AI route {route} failed: {str(e)}")
+                    errors.append(e)
+            
+            if not pending and remaining and fallback_enabled:
+                logger.info(f"Falling back to {remaining[0]}")
+                launch()
+        
+        provider_errors = [e for e in errors if not isinstance(e, ValueError)]
+        raise (provider_errors or errors)[0]
+    
+    def _record(self, route: ProviderRoute, started_at: float, future: Future) -> None:
+        if not future.cancelled() and future.exception() is None:
+            self.histogram(route).record(time.perf_counter() - started_at)
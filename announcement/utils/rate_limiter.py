@@ -0,0 +1,146 @@
+import os
+import time
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from .shared_state import default_state_path, locked_json_state
+
+logger = logging.getLogger(__name__)
+
+# data.go.kr resets the daily call quota at midnight Korean time
+KST = timezone(timedelta(hours=9))
+
+# Usage ratios at which a warning is logged
+QUOTA_WARNING_THRESHOLDS = (0.5, 0.8, 0.9, 1.0)
+
+# Number of days of call counts kept in the state file
+USAGE_HISTORY_DAYS = 31
+
+
+class QuotaExceededError(Exception):
+    """Raised when the daily call quota of the public data portal is exhausted"""
+
+
+class PortalRateLimiter:
+    """
+    Token-bucket rate limiter with a daily call quota for the public data portal
+    
+    The bucket and the per-day call counters live in a JSON state file guarded by a file lock,
+    so every worker process on the host shares the same budget.
+    """
+    
+    def __init__(self, state_path: str, rate: float, burst: int, daily_quota: int):
+        self.state_path = state_path
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.daily_quota = daily_quota
+    
+    @staticmethod
+    def _today() -> str:
+        return datetime.now(KST).date().isoformat()
+    
+    def _refill(self, state: Dict[str, Any], now: float) -> None:
+        """Add the tokens accumulated since the last update to the bucket"""
+        tokens = state.get('tokens', float(self.burst))
+        updated_at = state.get('updated_at', now)
+        state['tokens'] = min(float(self.burst), tokens + max(0.0, now - updated_at) * self.rate)
+        state['updated_at'] = now
+    
+    def acquire(self) -> None:
+        """
+        Take one token for an API call, waiting for the bucket to refill if needed
+        
+        Raises:
+            QuotaExceededError: If today's call quota has been used up
+        """
+        while True:
+            with locked_json_state(self.state_path) as state:
+                now = time.time()
+                self._refill(state, now)
+                
+                today = self._today()
+                daily_calls = state.setdefault('daily_calls', {})
+                calls = daily_calls.get(today, 0)
+                
+                if self.daily_quota and calls >= self.daily_quota:
+                    raise QuotaExceededError(f"공공 데이터 포털 일일 호출 한도({self.daily_quota})를 모두 사용했습니다")
+                
+                if state['tokens'] >= 1:
+                    state['tokens'] -= 1
+                    daily_calls[today] = calls + 1
+                    
+                    # Drop counters older than the history window
+                    for day in sorted(daily_calls)[:-USAGE_HISTORY_DAYS]:
+                        del daily_calls[day]
+                    
+                    self._report_usage(calls, calls + 1)
+                    return
+                
+                wait = (1 - state['tokens']) / self.rate
+            
+            time.sleep(wait)
+    
+    def _report_usage(self, previous_calls: int, calls: int) -> None:
+        """Log the daily usage, with a warning whenever a quota threshold is crossed"""
+        if not self.daily_quota:
+            logger.debug(f"포털 API 일일 호출 수: {calls}")
+            return
+        
+        for threshold in QUOTA_WARNING_THRESHOLDS:
+            limit = self.daily_quota * threshold
+            if previous_calls < limit <= calls:
+                logger.warning(f"포털 API 일일 호출 한도의 {int(threshold * 100)}%를 사용했습니다 ({calls}/{self.daily_quota})")
+        logger.debug(f"포털 API 일일 호출 수: {calls}/{self.daily_quota}")
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Return the current state of the limiter for monitoring
+        
+        Returns:
+            Dict[str, Any]: Today's calls, quota, remaining calls, usage ratio, available tokens
+                and the call counts of the previous days
+        """
+        with locked_json_state(self.state_path) as state:
+            self._refill(state, time.time())
+            daily_calls = dict(state.get('daily_calls', {}))
+            tokens = state['tokens']
+        
+        calls = daily_calls.get(self._today(), 0)
+        return {
+            'date': self._today(),
+            'calls': calls,
+            'quota': self.daily_quota,
+            'remaining': max(self.daily_quota - calls, 0) if self.daily_quota else None,
+            'usage_ratio': calls / self.daily_quota if self.daily_quota else None,
+            'tokens': tokens,
+            'rate_per_second': self.rate,
+            'burst': self.burst,
+            'history': daily_calls,
+        }
+
+
+def get_portal_rate_limiter() -> Optional[PortalRateLimiter]:
+    """
+    Build the portal rate limiter configured from the environment
+    
+    Returns:
+        Optional[PortalRateLimiter]: The limiter, or None if API_RATE_LIMIT_PER_SECOND is 0
+    """
+    def env_number(name, default, cast):
+        try:
+            return cast(os.environ.get(name, default))
+        except (ValueError, TypeError):
+            logger.warning(f"Invalid {name} value, using default of {default}")
+            return default
+    
+    rate = env_number('API_RATE_LIMIT_PER_SECOND', 5.0, float)
+    if rate <= 0:
+        return None
+    
+    return PortalRateLimiter(
+        state_path=os.environ.get('API_RATE_LIMIT_STATE', default_state_path('portal_rate_limit.json')),
+        rate=rate,
+        burst=env_number('API_RATE_LIMIT_BURST', 10, int),
+        daily_quota=env_number('API_DAILY_QUOTA', 10000, int),
+    )
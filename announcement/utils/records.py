@@ -0,0 +1,112 @@
+import sys
+import json
+import hashlib
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Dict, Optional
+
+# Fields with a small set of repeated values, interned so every record shares one string object
+INTERNED_FIELDS = frozenset({
+    'supt_biz_clsfc', 'supt_regin', 'pbanc_ntrp_nm', 'sprv_inst', 'biz_enyy', 'biz_trgt_age', 'rcrt_prgs_yn',
+})
+
+
+def parse_portal_date(value: Any) -> Optional[date]:
+    """
+    Parse a date from the public data portal (YYYYMMDD or YYYY-MM-DD)
+    
+    Args:
+        value (Any): Raw date value
+        
+    Returns:
+        Optional[date]: Parsed date, or None if the value is empty or invalid
+    """
+    if not value:
+        return None
+    if isinstance(value, date):
+        return value
+    
+    date_str = str(value).strip()
+    try:
+        # Check if the date is in YYYYMMDD format
+        if len(date_str) == 8 and date_str.isdigit():
+            return date(int(date_str[:4]), int(date_str[4:6]), int(date_str[6:8]))
+        return datetime.strptime(date_str[:10], "%Y-%m-%d").date()
+    except ValueError:
+        # If date conversion fails, leave as None
+        return None
+
+
+@dataclass(frozen=True)
+class AnnouncementRecord:
+    """
+    Normalized announcement from the public data portal API
+    
+    Built once when a response is parsed: text fields are never None, the reception dates are
+    parsed into date objects and frequently repeated strings (region, organization, ...) are
+    interned. __slots__ keeps each record free of a per-instance __dict__.
+    """
+    __slots__ = (
+        'pbanc_sn', 'biz_pbanc_nm', 'pbanc_ctnt', 'supt_biz_clsfc', 'pbanc_rcpt_bgng_dt', 'pbanc_rcpt_end_dt',
+        'aply_trgt_ctnt', 'aply_excl_trgt_ctnt', 'supt_regin', 'pbanc_ntrp_nm', 'sprv_inst', 'detl_pg_url',
+        'aply_trgt', 'biz_enyy', 'biz_trgt_age', 'rcrt_prgs_yn', 'intg_pbanc_biz_nm',
+    )
+    
+    pbanc_sn: str  # 공고일련번호
+    biz_pbanc_nm: str  # 사업공고명
+    pbanc_ctnt: str  # 공고내용
+    supt_biz_clsfc: str  # 지원사업분류
+    pbanc_rcpt_bgng_dt: Optional[date]  # 공고접수시작일시
+    pbanc_rcpt_end_dt: Optional[date]  # 공고접수종료일시
+    aply_trgt_ctnt: str  # 신청대상내용
+    aply_excl_trgt_ctnt: str  # 신청제외대상내용
+    supt_regin: str  # 지원지역
+    pbanc_ntrp_nm: str  # 공고기업명
+    sprv_inst: str  # 주관기관
+    detl_pg_url: str  # 상세페이지 URL
+    aply_trgt: str  # 신청대상
+    biz_enyy: str  # 사업업력
+    biz_trgt_age: str  # 사업대상연령
+    rcrt_prgs_yn: str  # 모집진행여부
+    intg_pbanc_biz_nm: str  # 통합공고사업명
+    
+    @classmethod
+    def from_api_item(cls, item: Dict[str, Any]) -> 'AnnouncementRecord':
+        """
+        Build a record from a raw API item
+        
+        Args:
+            item (Dict[str, Any]): Announcement as returned by the portal
+            
+        Returns:
+            AnnouncementRecord: Normalized record
+        """
+        values = {}
+        for name in cls.__slots__:
+            value = item.get(name)
+            if name in ('pbanc_rcpt_bgng_dt', 'pbanc_rcpt_end_dt'):
+                values[name] = parse_portal_date(value)
+                continue
+            
+            value = '' if value is None else str(value)
+            values[name] = sys.intern(value) if name in INTERNED_FIELDS else value
+        return cls(**values)
+    
+    def to_model_kwargs(self) -> Dict[str, Any]:
+        """
+        Return the record as keyword arguments for AnnouncementNew
+        
+        Returns:
+            Dict[str, Any]: Field values by model field name
+        """
+        return {name: getattr(self, name) for name in self.__slots__}
+    
+    def content_hash(self) -> str:
+        """
+        Return a hash of every field, used to detect announcements whose content changed on the portal
+        
+        Returns:
+            str: Hex digest of the record
+        """
+        text = json.dumps(self.to_model_kwargs(), ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
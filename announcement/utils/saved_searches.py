@@ -0,0 +1,137 @@
+import logging
+from typing import Dict, List
+
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from announcement.models import AnnouncementRaw, SavedSearch, SavedSearchMatch
+from .ai_utils import call_ai_model_for_filtering
+from .announcement_store import active_announcements, to_record
+from .circuit_breaker import AIProviderUnavailableError
+
+logger = logging.getLogger(__name__)
+
+# Number of announcements sent to the AI model per filtering call
+SAVED_SEARCH_BATCH_SIZE = 150
+
+
+def pending_announcements(saved_search: SavedSearch) -> QuerySet:
+    """
+    Return the active announcements of the local store a saved search has not evaluated yet
+    
+    These are the announcements matching its portal filters whose content changed after
+    its last_evaluated_at, oldest change first. The first run evaluates all of them.
+    """
+    queryset = active_announcements(saved_search.region, saved_search.startup_period, saved_search.target_age)
+    if saved_search.last_evaluated_at:
+        queryset = queryset.filter(content_updated_at__gt=saved_search.last_evaluated_at)
+    return queryset.order_by('content_updated_at', 'pbanc_sn')
+
+
+def active_matches(saved_search: SavedSearch) -> QuerySet:
+    """
+    Return the matches of a saved search whose announcement is still on the portal
+    
+    Matches of deactivated announcements are kept, since an announcement that reappears
+    unchanged is not evaluated again, but they are not shown.
+    """
+    return saved_search.matches.filter(announcement__is_active=True)
+
+
+def reset_saved_search(saved_search: SavedSearch) -> None:
+    """Forget the matches and watermark of a saved search, e.g. after its condition changed"""
+    saved_search.matches.all().delete()
+    saved_search.last_evaluated_at = None
+    saved_search.save(update_fields=['last_evaluated_at', 'updated_at'])
+
+
+def _evaluate_batch(saved_search: SavedSearch, rows: List[AnnouncementRaw], unanswered: List) -> int:
+    """
+    Filter one batch of stored announcements and record the verdicts; return the number of matches
+    
+    Announcements that no longer match, e.g. after their content changed, lose their earlier
+    match. Those without a verdict keep theirs until they are evaluated again.
+    """
+    unanswered_serial_numbers = set()
+    if saved_search.user_condition:
+        records = [to_record(row) for row in rows]
+        batch_unanswered = []
+        matched, _ = call_ai_model_for_filtering(records, saved_search.user_condition, saved_search.ai_choice,
+                                                 unanswered=batch_unanswered)
+        matched_serial_numbers = {item.pbanc_sn for item in matched}
+        unanswered_serial_numbers = {item.pbanc_sn for item in batch_unanswered}
+        unanswered.extend(batch_unanswered)
+    else:
+        # Without a condition, every announcement passing the portal filters matches
+        matched_serial_numbers = {row.pk for row in rows}
+    
+    saved_search.matches.filter(
+        announcement_id__in=[row.pk for row in rows
+                             if row.pk not in matched_serial_numbers and row.pk not in unanswered_serial_numbers]
+    ).delete()
+    SavedSearchMatch.objects.bulk_create(
+        [SavedSearchMatch(saved_search=saved_search, announcement=row)
+         for row in rows if row.pk in matched_serial_numbers],
+        ignore_conflicts=True,
+    )
+    return len(matched_serial_numbers)
+
+
+def run_saved_search(saved_search: SavedSearch) -> Dict[str, int]:
+    """
+    Evaluate a saved search against the announcements that changed since its last run
+    
+    Matches are recorded as they are found. The watermark only moves when every pending
+    announcement got a verdict, so announcements of failed AI calls are evaluated again on
+    the next run; verdicts already given come from the verdict cache then.
+    
+    Args:
+        saved_search (SavedSearch): Saved search to run
+    
+    Returns:
+        Dict[str, int]: Numbers of 'evaluated' announcements, 'matched' ones and 'unanswered'
+        ones left for the next run
+    """
+    evaluated = 0
+    matched = 0
+    unanswered = []
+    watermark = saved_search.last_evaluated_at
+    error = ''
+    
+    try:
+        batch = []
+        for row in pending_announcements(saved_search).iterator(chunk_size=500):
+            batch.append(row)
+            if len(batch) >= SAVED_SEARCH_BATCH_SIZE:
+                matched += _evaluate_batch(saved_search, batch, unanswered)
+                evaluated += len(batch)
+                watermark = batch[-1].content_updated_at
+                batch = []
+        if batch:
+            matched += _evaluate_batch(saved_search, batch, unanswered)
+            evaluated += len(batch)
+            watermark = batch[-1].content_updated_at
+    except (AIProviderUnavailableError, ValueError) as e:
+        # AI providers are down or not configured; keep the watermark and try again next run
+        logger.warning(f"Saved search {saved_search.pk} stopped: {str(e)}")
+        error = str(e)
+    
+    if unanswered and not error:
+        error = f"AI 응답을 받지 못한 공고 {len(unanswered)}건은 다음 실행에서 다시 판정합니다."
+    if not error:
+        saved_search.last_evaluated_at = watermark
+    saved_search.last_run_at = timezone.now()
+    saved_search.last_evaluated_count = evaluated
+    saved_search.last_match_count = matched
+    saved_search.last_error = error
+    saved_search.save()
+    
+    logger.info(f"Saved search {saved_search.pk} evaluated {evaluated} announcements, {matched} matched, "
+                f"{len(unanswered)} unanswered")
+    return {'evaluated': evaluated, 'matched': matched, 'unanswered': len(unanswered)}
+
+
+def run_saved_searches() -> Dict[int, Dict[str, int]]:
+    """Run every active saved search and return the statistics of each by ID"""
+    return {saved_search.pk: run_saved_search(saved_search)
+            for saved_search in SavedSearch.objects.filter(is_active=True)}
@@ -0,0 +1,60 @@
+import os
+import json
+import fcntl
+import logging
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator
+
+logger = logging.getLogger(__name__)
+
+
+def default_state_path(filename: str) -> str:
+    """
+    Return the default path of a state file shared by every process and container
+    
+    Files live in SASUM_STATE_DIR, by default var/state in the project directory. The
+    per-container temporary directory would give each container its own state and lose it
+    on restart; docker-compose mounts var/state as a volume shared by all services.
+    """
+    from django.conf import settings
+    directory = os.environ.get('SASUM_STATE_DIR', os.path.join(settings.BASE_DIR, 'var', 'state'))
+    return os.path.join(directory, filename)
+
+
+@contextmanager
+def locked_json_state(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Open a JSON state file shared by all worker processes under an exclusive file lock
+    
+    The decoded state dict is yielded to the caller and written back when the block exits
+    without an exception. The lock is held for the whole block, so keep it short.
+    
+    Args:
+        path (str): Path of the state file (created if missing)
+        
+    Yields:
+        Dict[str, Any]: Mutable state
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    with os.fdopen(fd, 'r+', encoding='utf-8') as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            raw = f.read()
+            try:
+                state = json.loads(raw) if raw.strip() else {}
+            except ValueError:
+                logger.warning(f"Corrupted state file {path}, starting from an empty state")
+                state = {}
+            
+            yield state
+            
+            f.seek(0)
+            f.truncate()
+            json.dump(state, f)
+            f.flush()
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
@@ -0,0 +1,149 @@
+import os
+import hashlib
+import logging
+import unicodedata
+from datetime import timedelta
+from typing import Dict, Iterable, List, Tuple
+
+from django.utils import timezone
+
+from announcement.models import AIVerdictCache
+
+logger = logging.getLogger(__name__)
+
+# (pbanc_sn, content_hash) identifying one announcement as it was sent to the model
+VerdictKey = Tuple[str, str]
+
+# Maximum number of serial numbers per IN (...) query
+LOOKUP_BATCH_SIZE = 1000
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, default))
+    except (ValueError, TypeError):
+        logger.warning(f"Invalid {name} value, using default of {default}")
+        return default
+
+
+def is_enabled() -> bool:
+    """Return whether the verdict cache is enabled (AI_VERDICT_CACHE_ENABLED)"""
+    return os.environ.get('AI_VERDICT_CACHE_ENABLED', 'true').lower() == 'true'
+
+
+def hash_condition(user_condition: str) -> str:
+    """
+    Hash a user condition after normalizing Unicode, case and whitespace
+    
+    Args:
+        user_condition (str): User's filtering criteria in natural language
+        
+    Returns:
+        str: Hex digest identifying the condition
+    """
+    normalized = ' '.join(unicodedata.normalize('NFC', user_condition).lower().split())
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+def lookup_verdicts(user_condition: str, model_name: str, keys: Iterable[VerdictKey]) -> Dict[VerdictKey, bool]:
+    """
+    Return the cached verdicts for the given announcements
+    
+    Entries older than AI_VERDICT_CACHE_TTL_DAYS are ignored, and the hits are marked as used
+    so the LRU eviction keeps them.
+    
+    Args:
+        user_condition (str): User's filtering criteria
+        model_name (str): AI model name
+        keys (Iterable[VerdictKey]): (pbanc_sn, content_hash) of each announcement
+        
+    Returns:
+        Dict[VerdictKey, bool]: Verdict (match or not) of every cached announcement
+    """
+    wanted = set(keys)
+    if not wanted:
+        return {}
+    
+    condition_hash = hash_condition(user_condition)
+    cutoff = timezone.now() - timedelta(days=_env_int('AI_VERDICT_CACHE_TTL_DAYS', 30))
+    serial_numbers = sorted({serial_number for serial_number, _ in wanted})
+    
+    verdicts = {}
+    hit_ids = []
+    for i in range(0, len(serial_numbers), LOOKUP_BATCH_SIZE):
+        rows = AIVerdictCache.objects.filter(
+            condition_hash=condition_hash,
+            model_name=model_name,
+            pbanc_sn__in=serial_numbers[i:i + LOOKUP_BATCH_SIZE],
+            created_at__gte=cutoff,
+        ).values_list('id', 'pbanc_sn', 'content_hash', 'is_match')
+        
+        for row_id, serial_number, content_hash, is_match in rows:
+            key = (serial_number, content_hash)
+            if key in wanted:
+                verdicts[key] = is_match
+                hit_ids.append(row_id)
+    
+    if hit_ids:
+        AIVerdictCache.objects.filter(id__in=hit_ids).update(last_used_at=timezone.now())
+    
+    logger.info(f"AI verdict cache: {len(verdicts)} hits, {len(wanted) - len(verdicts)} misses")
+    return verdicts
+
+
+def store_verdicts(user_condition: str, model_name: str, verdicts: Dict[VerdictKey, bool]) -> None:
+    """
+    Store verdicts returned by the model and evict old entries
+    
+    Existing entries with the same key, e.g. expired ones not evicted yet or verdicts of an
+    earlier batch job, are overwritten and their age is reset.
+    
+    Args:
+        user_condition (str): User's filtering criteria
+        model_name (str): AI model that produced the verdicts
+        verdicts (Dict[VerdictKey, bool]): Verdict of each announcement sent to the model
+    """
+    if not verdicts:
+        return
+    
+    condition_hash = hash_condition(user_condition)
+    AIVerdictCache.objects.bulk_create(
+        [
+            AIVerdictCache(
+                condition_hash=condition_hash,
+                model_name=model_name,
+                pbanc_sn=serial_number,
+                content_hash=content_hash,
+                is_match=is_match,
+            )
+            for (serial_number, content_hash), is_match in verdicts.items()
+        ],
+        batch_size=500,
+        update_conflicts=True,
+        unique_fields=['condition_hash', 'model_name', 'pbanc_sn', 'content_hash'],
+        update_fields=['is_match', 'created_at', 'last_used_at'],
+    )
+    evict_verdicts()
+
+
+def evict_verdicts() -> int:
+    """
+    Delete expired entries and the least recently used ones beyond AI_VERDICT_CACHE_MAX_ENTRIES
+    
+    Returns:
+        int: Number of deleted entries
+    """
+    cutoff = timezone.now() - timedelta(days=_env_int('AI_VERDICT_CACHE_TTL_DAYS', 30))
+    deleted, _ = AIVerdictCache.objects.filter(created_at__lt=cutoff).delete()
+    
+    max_entries = _env_int('AI_VERDICT_CACHE_MAX_ENTRIES', 100000)
+    excess = AIVerdictCache.objects.count() - max_entries
+    if max_entries > 0 and excess > 0:
+        stale_ids: List[int] = list(
+            AIVerdictCache.objects.order_by('last_used_at').values_list('id', flat=True)[:excess]
+        )
+        deleted += AIVerdictCache.objects.filter(id__in=stale_ids).delete()[0]
+    
+    if deleted:
+        logger.info(f"AI verdict cache: evicted {deleted} entries")
+    return deleted
@@ -2,18 +2,20 @@ from django.shortcuts import render, redirect
 from django.views import View
 from django.contrib import messages
 from django.db import transaction
-from django.http import HttpRequest, HttpResponse, JsonResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpRequest, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.urls import reverse
 import logging
 from django.utils import timezone
-from datetime import datetime
 from django.db.models import Q
 import json
 import requests
 from json.decoder import JSONDecodeError
 
-from .models import Announcement, AnnouncementNew
-from .utils.api_client import PublicDataAPIClient
-from .utils.ai_utils import call_ai_model_for_filtering
+from .models import Announcement, AnnouncementNew, PipelineJob
+from .utils.records import parse_portal_date
+from .utils.pipeline import enqueue_pipeline_job, job_status
+from .utils.event_stream import format_final_status, stream_job_events, stream_job_events_sync
 
 logger = logging.getLogger(__name__)
 
@@ -57,176 +59,98 @@ class NewAnnouncementView(View):
             
             # Set a flag to ensure results are not displayed
             context['hide_results'] = True
+        else:
+            # Show the progress or the results of a queued search
+            job_id = request.GET.get('job', '')
+            job = PipelineJob.objects.filter(pk=job_id).first() if job_id.isdigit() else None
+            if job:
+                self._add_job_results(request, job, context)
         
         return render(request, self.template_name, context)
 
     def post(self, request: HttpRequest) -> HttpResponse:
-        """Process the form submission, fetch new announcements and apply AI filtering"""
-        user_condition = request.POST.get('user_condition', '')
-        selected_ai_model = request.POST.get('selected_ai_model', 'openai-gpt-4o-mini')
+        """Queue the fetch/filter/save pipeline for the submitted search and show its progress"""
+        job = enqueue_pipeline_job(
+            user_condition=request.POST.get('user_condition', ''),
+            ai_choice=request.POST.get('selected_ai_model', 'openai-gpt-4o-mini'),
+            region=request.POST.get('region', ''),
+            startup_period=request.POST.get('startup_period', ''),
+            target_age=request.POST.get('target_age', ''),
+        )
         
-        # Get additional filter parameters
-        region = request.POST.get('region', '')
-        startup_period = request.POST.get('startup_period', '')
-        target_age = request.POST.get('target_age', '')
+        # Redirect so the page can be reloaded without resubmitting the form
+        return redirect(f"{reverse('announcement:new-announcement')}?job={job.pk}")
+
+    def _add_job_results(self, request: HttpRequest, job: PipelineJob, context: dict) -> None:
+        """Add the search parameters and, once the job has finished, the results of a pipeline job to the context"""
+        context.update({
+            'job': job,
+            'user_condition': job.user_condition,
+            'selected_ai_model': job.ai_choice,
+            'region': job.region,
+            'startup_period': job.startup_period,
+            'target_age': job.target_age,
+        })
         
-        # Available AI integrated models for dropdown (limited to 3 specific models)
-        ai_models = [
-            ('openai-gpt-4o-mini', 'OpenAI - GPT-4o Mini'),
-            ('gemini-2.0-flash-lite', 'Gemini - 2.0 Flash-Lite'),
-        ]
+        if job.status == 'failed':
+            messages.error(request, job.error)
+            return
+        if job.status != 'completed':
+            return
         
-        # Set is_processing flag to true initially
-        context = {
-            'ai_models': ai_models,
-            'user_condition': user_condition,
-            'selected_ai_model': selected_ai_model,
-            'region': region,
-            'startup_period': startup_period,
-            'target_age': target_age,
-            'is_processing': True,  # Flag to indicate processing is happening
-        }
+        for warning in job.warnings:
+            messages.warning(request, warning)
         
-        try:
-            # 1. Call the public data portal API
-            api_client = PublicDataAPIClient()
-            new_items = api_client.get_announcements(
-                page=1, 
-                per_page=50,
-                region=region,
-                startup_period=startup_period,
-                target_age=target_age
-            )
-            
-            if new_items is None:
-                messages.error(request, "API에서 데이터를 가져오지 못했습니다. 나중에 다시 시도해 주세요.")
-                return render(request, self.template_name, context)
-            
-            if not new_items:
-                messages.info(request, "API에서 새 공고를 찾을 수 없습니다.")
-                return render(request, self.template_name, context)
-            
-            # Count of total announcements from API
-            total_count = len(new_items)
-            
-            # 2. Apply AI filtering on the API results before saving
-            filtered_items = []
-            filtered_serial_numbers = []
-            
-            if user_condition:
-                try:
-                    # Convert API items to a format suitable for AI filtering
-                    api_items_for_ai = []
-                    for item in new_items:
-                        serial_number = item.get("pbanc_sn", "")
-                        if serial_number and not AnnouncementNew.objects.filter(pk=serial_number).exists():
-                            api_items_for_ai.append(item)
-                    
-                    # Apply AI filtering with the integrated model format
-                    filtered_items, filtered_serial_numbers = call_ai_model_for_filtering(
-                        api_items_for_ai, 
-                        user_condition,
-                        selected_ai_model
-                    )
-                except ValueError as e:
-                    # This is caught when API key is missing
-                    ai_platform = selected_ai_model.split('-')[0].upper()
-                    api_key_error_msg = f"{ai_platform}_API_KEY가 설정되지 않았습니다. .env 파일에 API 키를 추가해 주세요."
-                    messages.error(request, api_key_error_msg)
-                    # No filtering if AI API key is missing
-                    filtered_items = [item for item in new_items if item.get("pbanc_sn", "") and not AnnouncementNew.objects.filter(pk=item.get("pbanc_sn", "")).exists()]
-                    filtered_serial_numbers = [item.get("pbanc_sn", "") for item in filtered_items]
-            else:
-                # If no filtering condition, use all new announcements that don't exist in DB
-                filtered_items = [item for item in new_items if item.get("pbanc_sn", "") and not AnnouncementNew.objects.filter(pk=item.get("pbanc_sn", "")).exists()]
-                filtered_serial_numbers = [item.get("pbanc_sn", "") for item in filtered_items]
-            
-            # 3. Save only the filtered announcements to DB
-            saved_new_announcements = []
-            with transaction.atomic():
-                for item in filtered_items:
-                    serial_number = item.get("pbanc_sn", "")
-                    if not serial_number:
-                        continue
-                    
-                    # Convert date strings to date objects
-                    start_date = None
-                    end_date = None
-                    
-                    start_date_str = item.get("pbanc_rcpt_bgng_dt", "") or ""
-                    end_date_str = item.get("pbanc_rcpt_end_dt", "") or ""
-                    
-                    if start_date_str:
-                        try:
-                            # Check if the date is in YYYYMMDD format
-                            if len(start_date_str) == 8 and start_date_str.isdigit():
-                                # Convert YYYYMMDD to YYYY-MM-DD
-                                start_date_str = f"{start_date_str[:4]}-{start_date_str[4:6]}-{start_date_str[6:8]}"
-                            start_date = datetime.strptime(start_date_str, "%Y-%m-%d").date()
-                        except ValueError:
-                            # If date conversion fails, leave as None
-                            pass
-                    
-                    if end_date_str:
-                        try:
-                            # Check if the date is in YYYYMMDD format
-                            if len(end_date_str) == 8 and end_date_str.isdigit():
-                                # Convert YYYYMMDD to YYYY-MM-DD
-                                end_date_str = f"{end_date_str[:4]}-{end_date_str[4:6]}-{end_date_str[6:8]}"
-                            end_date = datetime.strptime(end_date_str, "%Y-%m-%d").date()
-                        except ValueError:
-                            # If date conversion fails, leave as None
-                            pass
-                            
-                    ann = AnnouncementNew(
-                        pbanc_sn=serial_number,
-                        biz_pbanc_nm=item.get("biz_pbanc_nm", "") or "",
-                        pbanc_ctnt=item.get("pbanc_ctnt", "") or "",
-                        supt_biz_clsfc=item.get("supt_biz_clsfc", "") or "",
-                        pbanc_rcpt_bgng_dt=start_date,
-                        pbanc_rcpt_end_dt=end_date,
-                        aply_trgt_ctnt=item.get("aply_trgt_ctnt", "") or "",
-                        aply_excl_trgt_ctnt=item.get("aply_excl_trgt_ctnt", "") or "",
-                        supt_regin=item.get("supt_regin", "") or "",
-                        pbanc_ntrp_nm=item.get("pbanc_ntrp_nm", "") or "",
-                        sprv_inst=item.get("sprv_inst", "") or "",
-                        detl_pg_url=item.get("detl_pg_url", "") or "",
-                        aply_trgt=item.get("aply_trgt", "") or "",
-                        biz_enyy=item.get("biz_enyy", "") or "",
-                        biz_trgt_age=item.get("biz_trgt_age", "") or "",
-                        intg_pbanc_biz_nm=item.get("intg_pbanc_biz_nm", "") or ""
-                    )
-                    ann.save()
-                    saved_new_announcements.append(ann)
-            
-            # Count of new saved announcements
-            new_count = len(saved_new_announcements)
-            
-            # Set non-resubmission flag in session
-            request.session['form_submitted'] = True
-            request.session['query_results'] = {
-                'filtered_serial_numbers': filtered_serial_numbers,
-                'total_count': total_count,
-                'new_count': new_count,
-                'filtered_count': len(saved_new_announcements),
-            }
-            
-            # Update context with results
-            context.update({
-                'filtered_announcements': saved_new_announcements,
-                'filtered_serial_numbers': filtered_serial_numbers,
-                'total_count': total_count,
-                'new_count': new_count,
-                'filtered_count': len(saved_new_announcements),
-                'is_processing': False,  # Processing is now complete
-            })
-            
-            return render(request, self.template_name, context)
-            
-        except Exception as e:
-            logger.exception("Error in NewAnnouncementView: %s", str(e))
-            messages.error(request, f"오류가 발생했습니다: {str(e)}")
-            return render(request, self.template_name, context)
+        if job.total_count == 0:
+            messages.info(request, "API에서 새 공고를 찾을 수 없습니다.")
+            return
+        
+        # Show the saved announcements in the order they were saved
+        saved_announcements = AnnouncementNew.objects.in_bulk(job.saved_serial_numbers)
+        filtered_announcements = [
+            saved_announcements[serial_number] for serial_number in job.saved_serial_numbers
+            if serial_number in saved_announcements
+        ]
+        context.update({
+            'filtered_announcements': filtered_announcements,
+            'filtered_serial_numbers': job.saved_serial_numbers,
+            'total_count': job.total_count,
+            'new_count': job.filtered_count,
+            'filtered_count': job.filtered_count,
+        })
+
+
+def pipeline_job_status(request: HttpRequest, job_id: int) -> JsonResponse:
+    """Report the stage and progress of a pipeline job"""
+    job = PipelineJob.objects.filter(pk=job_id).first()
+    if job is None:
+        return JsonResponse({'success': False, 'message': "해당 작업을 찾을 수 없습니다"}, status=404)
+    return JsonResponse(job_status(job))
+
+
+def pipeline_job_events(request: HttpRequest, job_id: int) -> HttpResponse:
+    """Stream the progress events of a pipeline job as server-sent events"""
+    job = PipelineJob.objects.filter(pk=job_id).first()
+    if job is None:
+        return JsonResponse({'success': False, 'message': "해당 작업을 찾을 수 없습니다"}, status=404)
+    
+    # A reconnecting EventSource sends the ID of the last event it received
+    last_event_id = request.headers.get('Last-Event-ID', '')
+    last_event_id = int(last_event_id) if last_event_id.isdigit() else 0
+    
+    if job.is_finished and not job.events.exists():
+        # Events of old jobs are pruned by the worker; report the final state instead
+        events = [format_final_status(job_status(job))]
+    elif isinstance(request, ASGIRequest):
+        # Under ASGI the stream waits on the event loop; WSGI servers need a blocking iterator
+        events = stream_job_events(job_id, last_event_id)
+    else:
+        events = stream_job_events_sync(job_id, last_event_id)
+    
+    response = StreamingHttpResponse(events, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Disable response buffering in nginx
+    return response
 
 
 class StoredAnnouncementView(View):
@@ -260,18 +184,7 @@ class StoredAnnouncementView(View):
         old_results = []
         for ann in old_queryset:
             # For old model, attempt to parse the date fields
-            end_date = None
-            if ann.pbanc_rcpt_end_dt:
-                try:
-                    # Check if the date is in YYYYMMDD format
-                    end_date_str = ann.pbanc_rcpt_end_dt
-                    if len(end_date_str) == 8 and end_date_str.isdigit():
-                        # Convert YYYYMMDD to YYYY-MM-DD
-                        end_date_str = f"{end_date_str[:4]}-{end_date_str[4:6]}-{end_date_str[6:8]}"
-                    end_date = datetime.strptime(end_date_str, "%Y-%m-%d").date()
-                except (ValueError, TypeError):
-                    # If date conversion fails, leave as None
-                    pass
+            end_date = parse_portal_date(ann.pbanc_rcpt_end_dt)
             
             # Calculate days remaining
             days_remaining = "-"